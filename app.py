@@ -0,0 +1,5 @@
+from dashboard.config import load_rounds
+from dashboard.page import run_rounds
+
+# rounds.json の全ラウンドを 1 つのサーバで配信（サイドバーで切り替え）
+run_rounds(load_rounds())
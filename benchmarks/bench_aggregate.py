@@ -0,0 +1,84 @@
+"""票数集計のベンチマーク（毎回全体を集計し直す旧方式 vs VoteAggregator の差分反映）
+
+途中の行を書き換えたときに差分反映の結果が集計し直した結果と一致することも確かめる
+（末尾付近の編集は次の更新で、それより前の編集も行数 / VERIFY_SCAN_ROWS 回の更新のうちに）。
+edited は末尾の行を書き換えたシートを受け取って集計し直す時間。
+
+    uv run python benchmarks/bench_aggregate.py
+"""
+import copy
+import math
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from dashboard.aggregate import VERIFY_SCAN_ROWS, VoteAggregator
+from dashboard.answers import COLORS, normalize_answers
+from synthetic import SPORT_CHOICES, synthetic_responses
+
+N_TEAMS = 32
+NEW_ROWS = 5
+
+
+def legacy_refresh(df_raw):
+    """旧 app_*.py と同じ: 整形してからドリンクごとに melt → value_counts"""
+    df = normalize_answers(df_raw)
+    for drink in SPORT_CHOICES:
+        melted = df.melt(id_vars='回答者', value_vars=COLORS, var_name='色', value_name='ドリンク')
+        melted[melted['ドリンク'] == drink]['色'].value_counts()
+
+
+def best_time(func, setup=lambda: None, repeat=7):
+    times = []
+    for _ in range(repeat):
+        arg = setup()
+        start = time.perf_counter()
+        func(arg)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def edit_row(df_raw, row):
+    """row 行目を、ほかの行にない班の回答に書き換えたコピー（後ろの行で上書きされないように）"""
+    edited = df_raw.copy()
+    edited.loc[row, '班'] = N_TEAMS + 1
+    edited.loc[row, f'回答 [{COLORS[0]}]'] = SPORT_CHOICES[-1]
+    return edited
+
+
+def check_edited_rows(n_rows, row, syncs):
+    """row 行目が書き換えられても、syncs 回の更新のうちに最初から集計したのと同じ票数・回答になること"""
+    df_raw = synthetic_responses(N_TEAMS, n_rows)
+    aggregator = VoteAggregator()
+    aggregator.sync(df_raw)
+    edited = edit_row(df_raw, row)
+    expected = VoteAggregator()
+    expected.sync(edited)
+    for _ in range(syncs):
+        aggregator.sync(edited)
+    assert aggregator.counts == expected.counts
+    assert aggregator.latest == expected.latest
+    assert aggregator.answers_frame().equals(expected.answers_frame())
+
+
+def main():
+    check_edited_rows(100, 50, syncs=1)
+    check_edited_rows(5000, 4990, syncs=1)
+    check_edited_rows(5000, 2500, syncs=math.ceil(5000 / VERIFY_SCAN_ROWS) + 1)
+    print(f"{'rows':>8} {'full [ms]':>10} {f'+{NEW_ROWS} rows [ms]':>14} {'edited [ms]':>12}")
+    for n_rows in (100, 1000, 10000, 100000):
+        df_raw = synthetic_responses(N_TEAMS, n_rows)
+        base = VoteAggregator()
+        base.sync(df_raw.iloc[:n_rows - NEW_ROWS])
+
+        full = best_time(lambda _: legacy_refresh(df_raw))
+        incremental = best_time(lambda agg: agg.sync(df_raw), setup=lambda: copy.deepcopy(base))
+        edited = edit_row(df_raw, n_rows - NEW_ROWS - 1)
+        rebuild = best_time(lambda agg: agg.sync(edited), setup=lambda: copy.deepcopy(base))
+        print(f"{n_rows:>8} {full * 1e3:>10.2f} {incremental * 1e3:>14.3f} {rebuild * 1e3:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""班分け（assign_r1_teams / assign_r2_teams）のベンチマーク（旧 .iloc 版 vs 配列版）
+
+    uv run python benchmarks/bench_assign.py [--legacy-max 5000]
+
+名簿を 200 人から 50,000 人まで増やし、実行時間・1 人あたりの時間と
+tracemalloc で測ったピークのメモリ確保量を表示する。旧版は遅いので
+--legacy-max 人までだけ測る（同じ乱数の下で結果が一致することも確かめる）。
+"""
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT), str(ROOT / "src")]
+
+from company_names import normalize_company_names
+from member_divide import assign_r1_teams, assign_r2_teams, create_member_ids
+from synthetic import synthetic_roster
+
+SIZES = (200, 1000, 5000, 20000, 50000)
+
+
+def legacy_assign_r1_teams(participants_df):
+    """member_divide.py にあった .iloc 版（R1）"""
+    # 社員と内定者を分ける
+    employees = participants_df[participants_df['内定者/社員'] == '社員'].copy()
+    candidates = participants_df[participants_df['内定者/社員'] == '内定者'].copy()
+    
+    # 各会社ごとにシャッフル
+    employees = employees.sample(frac=1, random_state=42).reset_index(drop=True)
+    candidates = candidates.sample(frac=1, random_state=42).reset_index(drop=True)
+    
+    # 会社ごとにグループ化
+    employees_by_company = {company: group.reset_index(drop=True) 
+                           for company, group in employees.groupby('company_abbr')}
+    candidates_by_company = {company: group.reset_index(drop=True) 
+                            for company, group in candidates.groupby('company_abbr')}
+    
+    r1_teams = []
+    team_id = 1
+    
+    # 各社の社員と内定者のインデックスを追跡
+    emp_indices = {company: 0 for company in employees_by_company}
+    cand_indices = {company: 0 for company in candidates_by_company}
+    
+    # 優先順位: 社員がいる会社から順に班を作る
+    companies_with_employees = list(employees_by_company.keys())
+    
+    # 社員を持つ班を作成
+    for company in companies_with_employees:
+        while emp_indices[company] < len(employees_by_company[company]):
+            team = {}
+            team['班ID'] = f'R1-{team_id:02d}'
+            team['社員'] = 1
+            team['members'] = []
+            
+            # 社員を追加
+            if emp_indices[company] < len(employees_by_company[company]):
+                team['members'].append(employees_by_company[company].iloc[emp_indices[company]]['member_id'])
+                emp_indices[company] += 1
+            
+            # 内定者を5名追加（できるだけ異なる会社から）
+            # 戦略: 主要会社から2名ずつ、残りは少数会社から
+            added_count = 0
+            
+            # まず現在の社員の会社から内定者を2名追加
+            for _ in range(2):
+                if cand_indices.get(company, 0) < len(candidates_by_company.get(company, [])):
+                    team['members'].append(candidates_by_company[company].iloc[cand_indices[company]]['member_id'])
+                    cand_indices[company] += 1
+                    added_count += 1
+            
+            # 他の会社から追加
+            other_companies = [c for c in candidates_by_company.keys() if c != company]
+            random.shuffle(other_companies)
+            
+            for other_company in other_companies:
+                if added_count >= 5:
+                    break
+                if cand_indices.get(other_company, 0) < len(candidates_by_company.get(other_company, [])):
+                    num_to_add = min(2, 5 - added_count)
+                    for _ in range(num_to_add):
+                        if cand_indices[other_company] < len(candidates_by_company[other_company]):
+                            team['members'].append(candidates_by_company[other_company].iloc[cand_indices[other_company]]['member_id'])
+                            cand_indices[other_company] += 1
+                            added_count += 1
+                            if added_count >= 5:
+                                break
+            
+            if added_count >= 5:
+                r1_teams.append(team)
+                team_id += 1
+    
+    # 社員がいない班（内定者のみ）
+    # 残った内定者を使って班を作成
+    remaining_candidates = []
+    for company in candidates_by_company:
+        while cand_indices.get(company, 0) < len(candidates_by_company[company]):
+            remaining_candidates.append(candidates_by_company[company].iloc[cand_indices[company]])
+            cand_indices[company] += 1
+    
+    # 6人ずつの班を作成
+    for i in range(0, len(remaining_candidates), 6):
+        if i + 6 <= len(remaining_candidates):
+            team = {}
+            team['班ID'] = f'R1-{team_id:02d}'
+            team['社員'] = 0
+            team['members'] = [remaining_candidates[j]['member_id'] for j in range(i, i + 6)]
+            r1_teams.append(team)
+            team_id += 1
+    
+    return r1_teams
+
+def legacy_assign_r2_teams(participants_df):
+    """member_divide.py にあった .iloc 版（R2）"""
+    r2_teams = []
+    
+    # 会社ごとにグループ化
+    for company, group in participants_df.groupby('company_abbr'):
+        group = group.sample(frac=1, random_state=42).reset_index(drop=True)
+        
+        # 社員を先に配置
+        employees = group[group['内定者/社員'] == '社員'].reset_index(drop=True)
+        candidates = group[group['内定者/社員'] == '内定者'].reset_index(drop=True)
+        
+        team_count = 1
+        
+        # 社員がいる班を作成（社員1名+内定者6名）
+        for i in range(len(employees)):
+            team = {}
+            team['班ID'] = f'R2-{company}{team_count}'
+            team['会社'] = company
+            team['members'] = [employees.iloc[i]['member_id']]
+            
+            # 内定者を追加
+            start_idx = i * 6
+            end_idx = min(start_idx + 6, len(candidates))
+            for j in range(start_idx, end_idx):
+                team['members'].append(candidates.iloc[j]['member_id'])
+            
+            r2_teams.append(team)
+            team_count += 1
+        
+        # 残った内定者のみの班を作成
+        remaining_start = len(employees) * 6
+        for i in range(remaining_start, len(candidates), 6):
+            team = {}
+            team['班ID'] = f'R2-{company}{team_count}'
+            team['会社'] = company
+            team['members'] = []
+            
+            end_idx = min(i + 6, len(candidates))
+            for j in range(i, end_idx):
+                team['members'].append(candidates.iloc[j]['member_id'])
+            
+            r2_teams.append(team)
+            team_count += 1
+    
+    return r2_teams
+
+
+def participants(n_members, seed=0):
+    df = synthetic_roster(n_members, seed=seed)
+    df['company_abbr'] = normalize_company_names(df['所属会社(内定先会社)'])
+    df['member_id'] = create_member_ids(df)
+    return df
+
+
+def measure(func, df):
+    """(結果, 時間 [s], ピークのメモリ確保量 [bytes])"""
+    random.seed(0)
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(df)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--legacy-max", type=int, default=5000, help="旧版を測る最大の人数")
+    args = parser.parse_args()
+
+    print(f"{'round':<5} {'members':>8} {'legacy [ms]':>12} {'array [ms]':>11} {'us/member':>10} "
+          f"{'legacy peak [KB]':>17} {'array peak [KB]':>16}")
+    for n_members in SIZES:
+        df = participants(n_members)
+        for name, new, old in (("R1", assign_r1_teams, legacy_assign_r1_teams),
+                               ("R2", assign_r2_teams, legacy_assign_r2_teams)):
+            # tracemalloc なしの時間と、ありのピークを別々に測る
+            random.seed(0)
+            start = time.perf_counter()
+            teams = new(df)
+            elapsed = time.perf_counter() - start
+            _, _, peak = measure(new, df)
+            legacy_ms = legacy_peak = "-"
+            if n_members <= args.legacy_max:
+                random.seed(0)
+                start = time.perf_counter()
+                assert old(df) == teams
+                legacy_ms = f"{(time.perf_counter() - start) * 1e3:.1f}"
+                legacy_peak = f"{measure(old, df)[2] / 1024:.0f}"
+            print(f"{name:<5} {n_members:>8} {legacy_ms:>12} {elapsed * 1e3:>11.1f} "
+                  f"{elapsed / n_members * 1e6:>10.2f} {legacy_peak:>17} {peak / 1024:>16.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""班分け結果の書き出しのベンチマーク（旧 ExcelWriter(openpyxl) + to_csv vs export_frames）
+
+名簿の人数を変えて、旧版（xlsx 3 シート + R1/R2 の CSV）と export_frames（xlsx + CSV、
+--parquet で Parquet も）の合計時間を比べ、export_frames のファイルごとの内訳を表示する。
+
+    uv run python benchmarks/bench_export.py [--members 1000 10000 50000] [--parquet]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT), str(ROOT / "src")]
+
+import pandas as pd
+
+from export import export_frames
+from member_divide import assign_r1_teams, assign_r2_teams, create_r1_output_df, create_r2_output_df
+from roster import Roster, build_roster_frame
+from synthetic import synthetic_roster
+
+
+def legacy_export(r1_df, r2_df, output_participants, output_dir):
+    """member_divide.main にあった書き出し"""
+    with pd.ExcelWriter(output_dir / '班分け結果.xlsx', engine='openpyxl') as writer:
+        r1_df.to_excel(writer, sheet_name='R1', index=False)
+        r2_df.to_excel(writer, sheet_name='R2', index=False)
+        output_participants.to_excel(writer, sheet_name='参加者一覧', index=False)
+    r1_df.to_csv(output_dir / 'R1_班分け結果.csv', index=False, encoding='utf-8-sig')
+    r2_df.to_csv(output_dir / 'R2_班分け結果.csv', index=False, encoding='utf-8-sig')
+
+
+def frames_for(n_members):
+    participants = Roster(build_roster_frame(synthetic_roster(n_members))).participants()
+    r1_df = create_r1_output_df(assign_r1_teams(participants, seed=0), participants)
+    r2_df = create_r2_output_df(assign_r2_teams(participants, seed=0), participants)
+    output_participants = participants[['Bridge ID', 'お名前(漢字)', '内定者/社員', 'company_abbr', 'member_id']]
+    return r1_df, r2_df, output_participants
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--members", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--parquet", action="store_true")
+    args = parser.parse_args()
+    formats = ('xlsx', 'csv', 'parquet') if args.parquet else ('xlsx', 'csv')
+
+    for n_members in args.members:
+        r1_df, r2_df, output_participants = frames_for(n_members)
+        with tempfile.TemporaryDirectory() as tmp:
+            legacy_dir, new_dir = Path(tmp) / 'legacy', Path(tmp) / 'new'
+            legacy_dir.mkdir()
+            start = time.perf_counter()
+            legacy_export(r1_df, r2_df, output_participants, legacy_dir)
+            legacy_time = time.perf_counter() - start
+            report = export_frames({'R1': r1_df, 'R2': r2_df, '参加者一覧': output_participants}, new_dir, formats)
+
+            # 中身が同じことを確かめる
+            for sheet, df in pd.read_excel(legacy_dir / '班分け結果.xlsx', sheet_name=None).items():
+                pd.testing.assert_frame_equal(df, pd.read_excel(new_dir / '班分け結果.xlsx', sheet_name=sheet))
+
+        print(f"\nmembers={n_members}  旧版 {legacy_time:.2f} 秒 → export_frames {report.attrs['合計時間[s]']:.2f} 秒")
+        print(report.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
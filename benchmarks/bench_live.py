@@ -0,0 +1,124 @@
+"""視聴者 50 人での配信コストの比較（3 秒ごとの自動リフレッシュ vs SSE の差分配信）
+
+    uv run python benchmarks/bench_live.py [--viewers 50] [--duration 20] [--changes-per-minute 30]
+
+- autorefresh: 視聴者ごとに 3 秒おきにスクリプト全体を再実行する方式。
+  1 回の再実行にかかる CPU 時間と送信する要素の大きさを AppTest で測り、
+  「視聴者数 × 20 回/分」に換算する（CPU 時間は AppTest 自体のオーバーヘッドを
+  含む。一方で現在の共有キャッシュ込みのコストなので、旧実装よりは軽い）。
+- live (SSE): dashboard.live のサーバを別プロセスで起動し、ダミーシートに
+  一定間隔で回答を追加しながら視聴者数分の SSE 接続を張って、全員の接続後の
+  サーバプロセスの CPU 時間と実際に送ったバイト数を測って 1 分あたりに換算する。
+"""
+import argparse
+import multiprocessing
+import sys
+import threading
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from dashboard import sheet_cache
+from dashboard.config import load_rounds
+from dashboard.fake_sheet import FakeSheetServer
+
+ROUND = "sport"
+AUTOREFRESH_SECONDS = 3
+
+
+def _walk(node):
+    yield node
+    children = getattr(node, "children", None)
+    if isinstance(children, dict):
+        for child in children.values():
+            yield from _walk(child)
+
+
+def measure_autorefresh(reruns=10):
+    """1 回の再実行の CPU 時間 [s] と送信要素のバイト数"""
+    from streamlit.testing.v1 import AppTest
+
+    fake = FakeSheetServer().start()
+    fake.start_simulation(load_rounds()[ROUND].choices, interval=3600, seed=0)
+    sheet_cache.SHEET_BASE_URL = fake.base_url
+    app = AppTest.from_file(str(ROOT / f"app_{ROUND}.py"), default_timeout=60)
+    app.run()
+
+    start = time.process_time()
+    for _ in range(reruns):
+        app.run()
+    cpu = (time.process_time() - start) / reruns
+    payload = sum(node.proto.ByteSize() for node in _walk(app._tree)
+                  if hasattr(getattr(node, "proto", None), "ByteSize"))
+    fake.stop()
+    return cpu, payload
+
+
+def _live_server(conn, changes_per_minute):
+    from dashboard.live import LiveServer
+    from dashboard.poller import sheet_source
+    from dashboard.sheet_cache import SheetCache
+
+    rounds = {ROUND: load_rounds()[ROUND]}
+    fake = FakeSheetServer().start()
+    fake.start_simulation(rounds[ROUND].choices, interval=60 / changes_per_minute, seed=0)
+    cache = SheetCache(ttl=0.5, base_url=fake.base_url)
+    server = LiveServer(rounds, port=0, poll_interval=1.0,
+                        source_factory=lambda cfg: sheet_source(cfg.sheet_id, cfg.gid, cache)).start()
+    conn.send(server.base_url)
+    # 視聴者の接続（初回のページと全体の状態の送信）が済んでから測る
+    conn.recv()
+    start, sent = time.process_time(), server.bytes_sent
+    conn.recv()
+    conn.send((time.process_time() - start, server.bytes_sent - sent))
+
+
+def measure_live(viewers, duration, changes_per_minute):
+    """サーバプロセスの CPU 時間 [s] と送信バイト数（duration 秒間）"""
+    ctx = multiprocessing.get_context("spawn")
+    parent, child = ctx.Pipe()
+    process = ctx.Process(target=_live_server, args=(child, changes_per_minute), daemon=True)
+    process.start()
+    base_url = parent.recv()
+
+    def viewer():
+        urllib.request.urlopen(f"{base_url}/{ROUND}").read()
+        with urllib.request.urlopen(f"{base_url}/events/{ROUND}", timeout=duration + 30) as stream:
+            for _ in stream:
+                pass
+
+    for _ in range(viewers):
+        threading.Thread(target=viewer, daemon=True).start()
+    time.sleep(2)
+    parent.send("start")
+    time.sleep(duration)
+    parent.send("stop")
+    cpu, sent = parent.recv()
+    process.terminate()
+    return cpu, sent
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--viewers", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=20.0, help="live の計測時間（秒）")
+    parser.add_argument("--changes-per-minute", type=float, default=30.0)
+    args = parser.parse_args()
+
+    # AppTest は __main__ を差し替えるので、子プロセスを使う live を先に測る
+    live_cpu, live_bytes = measure_live(args.viewers, args.duration, args.changes_per_minute)
+    rerun_cpu, rerun_bytes = measure_autorefresh()
+    reruns_per_minute = args.viewers * 60 / AUTOREFRESH_SECONDS
+    scale = 60 / args.duration
+
+    print(f"viewers={args.viewers}, answers/min={args.changes_per_minute:g}")
+    print(f"{'mode':<12} {'server CPU [s/min]':>19} {'sent [KB/min]':>14}")
+    print(f"{'autorefresh':<12} {rerun_cpu * reruns_per_minute:>19.2f} {rerun_bytes * reruns_per_minute / 1024:>14.0f}")
+    print(f"{'live (SSE)':<12} {live_cpu * scale:>19.2f} {live_bytes * scale / 1024:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""名簿の匿名化のベンチマーク（旧 list 版 vs ストリーミング版 vs pandas チャンク版、鍵付きの 1 プロセス版 vs 並列版）
+
+それぞれ別プロセスで動かし、処理速度（行/秒）とピークメモリ（最大 RSS）を比べる。
+行番号で仮名を決める 3 つ、鍵付きの 2 つがそれぞれ同じ出力になることも確かめる。
+並列版のピークメモリは親プロセスだけの値。
+
+    uv run python benchmarks/bench_mask.py [--rows 200000 500000]
+"""
+import argparse
+import csv
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT), str(ROOT / "src")]
+
+from mask import anonymize_csv_chunked, anonymize_csv_parallel, anonymize_stream, generate_random_email, generate_random_kana, \
+    generate_random_name
+
+VARIANTS = ['list', 'stream', 'pandas', 'keyed', 'parallel']
+KEY = b'benchmark'
+
+
+def legacy_anonymize_csv(input_path, output_path):
+    """mask.py にあった、全行を list に読み込んでから書き出す版"""
+    with open(input_path, encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    anonymized = []
+    for i, row in enumerate(rows):
+        new_row = row.copy()
+        if "メールアドレス" in row:
+            new_row["メールアドレス"] = generate_random_email(i)
+        if "お名前(漢字)" in row:
+            new_row["お名前(漢字)"] = generate_random_name(i)
+        if "お名前(フリガナ)" in row:
+            new_row["お名前(フリガナ)"] = generate_random_kana(i)
+        anonymized.append(new_row)
+    with open(output_path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=anonymized[0].keys())
+        writer.writeheader()
+        writer.writerows(anonymized)
+    return len(anonymized)
+
+
+def run_variant(variant, input_path, output_path):
+    if variant == 'list':
+        return legacy_anonymize_csv(input_path, output_path)
+    if variant in ('stream', 'keyed'):
+        with open(input_path, encoding='utf-8-sig', newline='') as infile, \
+                open(output_path, "w", encoding="utf-8-sig", newline="") as outfile:
+            return anonymize_stream(infile, outfile, key=KEY if variant == 'keyed' else None)
+    if variant == 'parallel':
+        return anonymize_csv_parallel(input_path, output_path, KEY, chunk_bytes=4 * 1024 * 1024)
+    return anonymize_csv_chunked(input_path, output_path)
+
+
+def worker(variant, input_path, output_path):
+    """子プロセス側: 1 回だけ実行して件数・時間・最大 RSS を JSON で返す"""
+    if variant == 'pandas':
+        import pandas  # noqa: F401  import の時間は処理速度に含めない
+    start = time.perf_counter()
+    rows = run_variant(variant, input_path, output_path)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({'rows': rows, 'seconds': elapsed, 'max_rss_mb': max_rss_mb()}))
+
+
+def max_rss_mb():
+    # ru_maxrss は exec 前の親プロセス（pandas 読み込み済み）の分が残るので、Linux では VmHWM を使う
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[50000, 200000])
+    parser.add_argument("--worker", nargs=3, metavar=("VARIANT", "INPUT", "OUTPUT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        worker(*args.worker)
+        return
+    # 子プロセスのメモリに pandas を含めないよう、ここで読む
+    from synthetic import write_roster_csv
+
+    print(f"{'rows':>8} {'size [MB]':>10} {'variant':>9} {'rows/s':>10} {'max RSS [MB]':>13}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in args.rows:
+            input_path = Path(tmp) / f"roster_{n_rows}.csv"
+            write_roster_csv(input_path, n_rows)
+            size = input_path.stat().st_size / 1e6
+            outputs = {}
+            for variant in VARIANTS:
+                output_path = Path(tmp) / f"out_{variant}_{n_rows}.csv"
+                result = subprocess.run(
+                    [sys.executable, __file__, "--worker", variant, str(input_path), str(output_path)],
+                    check=True, capture_output=True, text=True)
+                stats = json.loads(result.stdout)
+                assert stats['rows'] == n_rows
+                outputs[variant] = output_path.read_bytes()
+                print(f"{n_rows:>8} {size:>10.1f} {variant:>9} {stats['rows'] / stats['seconds']:>10.0f} "
+                      f"{stats['max_rss_mb']:>13.1f}")
+            assert outputs['list'] == outputs['stream'] == outputs['pandas']
+            assert outputs['keyed'] == outputs['parallel']
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""メンバーID生成のベンチマーク（旧 apply + defaultdict 版 vs create_member_ids）
+
+    uv run python benchmarks/bench_member_id.py [--rows 100000]
+"""
+import argparse
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT), str(ROOT / "src")]
+
+from company_names import normalize_company_names
+from member_divide import create_member_ids
+from synthetic import synthetic_roster
+
+
+def legacy_create_member_id(row, company_counts):
+    """member_divide.py にあった 1 行ずつの版"""
+    company = row['company_abbr']
+    status = row['内定者/社員']
+    key = f"{company}_{status}"
+    company_counts[key] += 1
+    count = company_counts[key]
+    return f"{company}_{status}_{count:04d}"
+
+
+def best_of(func, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return result, min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args()
+
+    df = synthetic_roster(args.rows)
+    df['company_abbr'] = normalize_company_names(df['所属会社(内定先会社)'])
+
+    counts = defaultdict(int)
+    start = time.perf_counter()
+    old = df.apply(lambda row: legacy_create_member_id(row, counts), axis=1)
+    old_time = time.perf_counter() - start
+    new, new_time = best_of(lambda: create_member_ids(df))
+    assert old.tolist() == new.tolist()
+
+    print(f"rows={args.rows}")
+    print(f"{'apply [ms]':>11} {'vectorized [ms]':>16} {'speedup':>8}")
+    print(f"{old_time * 1e3:>11.0f} {new_time * 1e3:>16.1f} {old_time / new_time:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""複数ラウンドの班分けの再会ペア数と実行時間（別々に作る vs まとめて最適化）
+
+    uv run python benchmarks/bench_multi_round.py [--members 1000] [--rules mixed,company,mixed,mixed,mixed]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT), str(ROOT / "src")]
+
+import pandas as pd
+
+from company_names import normalize_company_names
+from member_divide import create_member_ids
+from multi_round import compare_schedules
+from synthetic import synthetic_roster
+from team_optimizer import r1_report
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--members", type=int, default=1000)
+    parser.add_argument("--rules", default="mixed,company,mixed,mixed,mixed")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    df = synthetic_roster(args.members, seed=args.seed)
+    df['company_abbr'] = normalize_company_names(df['所属会社(内定先会社)'])
+    df['member_id'] = create_member_ids(df)
+    rules = tuple(args.rules.split(","))
+
+    rounds, report = compare_schedules(df, rules=rules, seed=args.seed)
+    print(f"members={args.members}, rules={args.rules}")
+    print(pd.DataFrame(report).T.to_string())
+    # mixed ラウンドの会社数が落ちていないこと
+    for (name, teams), rule in zip(rounds.items(), rules):
+        if rule == 'mixed':
+            result = r1_report(teams, df)
+            print(f"{name}: 会社数合計 {result['会社数合計']} / 上限 {result['上限']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Pivot テーブル生成のマイクロベンチマーク（旧ループ版 vs build_color_pivot）
+
+    uv run python benchmarks/bench_pivot.py
+"""
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pandas as pd
+
+from dashboard.pivot import build_color_pivot
+from synthetic import SPORT_CHOICES, synthetic_answers
+
+
+def legacy_pivot(df, choices):
+    """app_*.py にあった 3 重ループ版"""
+    df_pivot = pd.DataFrame({'回答者': df['回答者']})
+    for drink in choices:
+        color_list = []
+        for i in range(len(df)):
+            matched_colors = []
+            for color in ['ピンク', 'ブルー', 'グリーン', 'レッド']:
+                if df.loc[i, color] == drink:
+                    matched_colors.append(color)
+            color_list.append('・'.join(matched_colors) if matched_colors else '')
+        df_pivot[drink] = color_list
+    return df_pivot
+
+
+def best_of(func, repeat=5):
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def main():
+    print(f"{'rows':>7} {'legacy [ms]':>12} {'vectorized [ms]':>16} {'speedup':>8}")
+    for n_rows in (32, 500, 5000):
+        df = synthetic_answers(n_rows)
+        assert legacy_pivot(df, SPORT_CHOICES).equals(build_color_pivot(df, SPORT_CHOICES))
+        new = best_of(lambda: build_color_pivot(df, SPORT_CHOICES))
+        old = best_of(lambda: legacy_pivot(df, SPORT_CHOICES), repeat=3)
+        print(f"{n_rows:>7} {old * 1e3:>12.2f} {new * 1e3:>16.3f} {old / new:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
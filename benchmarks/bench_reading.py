@@ -0,0 +1,60 @@
+"""50 音順の並べ替え（読み仮名 + 比較キー）のベンチマーク
+
+1 回目（キャッシュなし）、2 回目以降（ディスクのキャッシュを読み込む / 同じプロセスで繰り返す）の時間を比べる。
+名簿のフリガナを使う場合と、使わずに変換する場合（pykakasi がなければかなをそろえるだけ）の両方を測る。
+
+    uv run python benchmarks/bench_reading.py [--members 10000]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT), str(ROOT / "src")]
+
+import pandas as pd
+
+import reading
+from roster import Roster, build_roster_frame
+from synthetic import synthetic_roster
+
+
+def sort_members(members, roster, cache_dir):
+    df = pd.DataFrame({'メンバー名': members})
+    df['読み仮名'] = reading.readings(df['メンバー名'], roster, cache_dir=cache_dir)
+    return df.sort_values(by='読み仮名', key=lambda values: reading.collation_keys(values, cache_dir=cache_dir),
+                          kind='stable')
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--members", type=int, default=10000)
+    args = parser.parse_args()
+
+    roster = Roster(build_roster_frame(synthetic_roster(args.members)))
+    members = roster.df['お名前(漢字)'].sample(frac=1, random_state=0).reset_index(drop=True)
+    # 索引は名簿を読み込んだときに 1 回だけ作られるので、計測の外で作っておく
+    roster.map('name', members.head(1), 'お名前(フリガナ)')
+
+    print(f"members={args.members} converter={reading.converter_version()}")
+    print(f"{'':>12} {'1回目 [ms]':>11} {'ディスク [ms]':>13} {'メモリ [ms]':>12}")
+    for label, source in (('フリガナ列', roster), ('変換', None)):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            reading._caches.clear()
+            cold = timed(lambda: sort_members(members, source, cache_dir))
+            reading._caches.clear()
+            disk = timed(lambda: sort_members(members, source, cache_dir))
+            memory = min(timed(lambda: sort_members(members, source, cache_dir)) for _ in range(5))
+        print(f"{label:>12} {cold:>11.1f} {disk:>13.1f} {memory:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
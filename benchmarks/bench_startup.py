@@ -0,0 +1,108 @@
+"""起動時間と再実行ごとのヘッダー画像のコストのベンチマーク
+
+- import: 新しいプロセスで dashboard.page を読み込む時間（Altair は最初にグラフを作るまで読まない）
+- header: st.image に渡す前後の処理（ファイル読み込み・縮小・再エンコード）の時間と、
+  ブラウザに送られる画像の大きさ。旧版は assets/header.png のパスをそのまま渡していた
+- app: AppTest で app_sport.py を初回実行する時間と、再実行の render 段階の p50
+  （シートには繋がらない設定で動かすので、ダミーデータの経路）
+
+    uv run python benchmarks/bench_startup.py [--reruns 10]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+IMPORT_SNIPPET = """
+import sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+
+def import_time(module, repeat=3):
+    """新しいプロセスで module（"a, b" で複数）を読み込む時間 [s]（最小値）"""
+    times = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET.format(root=str(ROOT), module=module)],
+                             capture_output=True, text=True, check=True).stdout
+        times.append(float(out.strip().splitlines()[-1]))
+    return min(times)
+
+
+def st_image_cost(image, repeat=5):
+    """st.image(image) が画像を配信用に整える時間 [s] と、整えた後のバイト数"""
+    from streamlit.elements.lib.image_utils import _ensure_image_size_and_format, _validate_image_format_string
+    from streamlit.elements.lib.layout_utils import LayoutConfig
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        data = Path(image).read_bytes() if isinstance(image, Path) else image
+        image_format = _validate_image_format_string(data, "auto")
+        served = _ensure_image_size_and_format(data, LayoutConfig(width="stretch"), image_format)
+        times.append(time.perf_counter() - start)
+    return min(times), len(served)
+
+
+def measure_app(reruns):
+    """(初回実行の時間 [s], 再実行の render p50 [ms], header p50 [ms])"""
+    from streamlit.testing.v1 import AppTest
+
+    from dashboard.metrics import get_metrics
+
+    start = time.perf_counter()
+    app = AppTest.from_file(str(ROOT / "app_sport.py"), default_timeout=60)
+    app.run()
+    first = time.perf_counter() - start
+    metrics = get_metrics()
+    metrics.reset()
+    for _ in range(reruns):
+        app.run()
+    p50 = metrics.summary().set_index("段階")["p50[ms]"]
+    return first, p50["render"], p50.get("header", 0.0)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reruns", type=int, default=10)
+    args = parser.parse_args()
+    # シートには繋がず、すぐに失敗させてダミーデータで描画する
+    os.environ.setdefault("SHEET_BASE_URL", "http://127.0.0.1:9")
+
+    from dashboard.assets import ASSETS_DIR, HEADER_IMAGE, header_image, streamlit_header_image
+
+    page = import_time('dashboard.page')
+    with_altair = import_time('dashboard.page, altair')
+    print("import")
+    print(f"  dashboard.page {page * 1e3:8.0f} ms"
+          f"  （altair の分 {(with_altair - page) * 1e3:.0f} ms は最初のグラフを作るまで遅らせる）")
+
+    print("header（1 回の再実行あたり）")
+    original = ASSETS_DIR / HEADER_IMAGE
+    legacy_time, legacy_size = st_image_cost(original)
+    start = time.perf_counter()
+    header = streamlit_header_image()
+    build_time = time.perf_counter() - start
+    new_time, new_size = st_image_cost(header.body)
+    print(f"  旧 st.image(パス)  {legacy_time * 1e3:8.1f} ms  {legacy_size / 1024:6.0f} KB"
+          f"  （元ファイル {original.stat().st_size / 1024:.0f} KB）")
+    print(f"  st.image(バイト列) {new_time * 1e3:8.1f} ms  {new_size / 1024:6.0f} KB"
+          f"  （作成は起動時に 1 回 {build_time * 1e3:.0f} ms）")
+    live = header_image()
+    print(f"  ライブ更新ページ   {live.name}  {len(live.body) / 1024:.0f} KB（2 回目以降はブラウザのキャッシュ）")
+
+    first, render, header_stage = measure_app(args.reruns)
+    print("app_sport.py")
+    print(f"  初回実行 {first:.2f} s  再実行 render p50 {render:.0f} ms（うちヘッダー {header_stage:.1f} ms）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""集計テーブル HTML 生成のベンチマーク（旧 iterrows + += 版 vs 行キャッシュ版）
+
+    uv run python benchmarks/bench_table_html.py
+
+cold は行キャッシュが空の状態、1 row changed は 1 班だけ回答が変わった状態。
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from dashboard import table_html
+from dashboard.pivot import build_color_pivot
+from synthetic import SPORT_CHOICES, synthetic_answers
+
+BG_MAP = {"ピンク": "#fc81ac", "ブルー": "#5ddaf0", "グリーン": "#72C045", "レッド": "#d92c06"}
+ROW_HEIGHT_PX = 18
+
+
+def legacy_html(df, first_col_w=100, col_w=140):
+    """app_*.py にあった実装"""
+    html = "<table class='compact-table'>"
+    html += "<colgroup>"
+    html += f"<col style='width:{first_col_w}px' />"
+    for _ in range(4):
+        html += f"<col style='width:{col_w}px' />"
+    html += "</colgroup><thead><tr>"
+    for col in df.columns:
+        html += f"<th>{col}</th>"
+    html += "</tr></thead><tbody>"
+    for _, row in df.iterrows():
+        html += "<tr>"
+        for col in df.columns:
+            val = row[col]
+            if col == "回答者":
+                html += f"<td>{val}</td>"
+            else:
+                if val == "":
+                    html += "<td></td>"
+                else:
+                    colors = val.split("・")
+                    bg_colors = [BG_MAP[c] for c in colors if c in BG_MAP]
+                    gradient = ", ".join(bg_colors)
+                    bg_style = f"background: linear-gradient(90deg, {gradient});"
+                    html += f"<td style='{bg_style} height:{ROW_HEIGHT_PX}px;'></td>"
+        html += "</tr>"
+    html += "</tbody></table>"
+    return html
+
+
+def render(df):
+    return table_html.df_to_colored_html_with_colgroup(df, BG_MAP, row_height=ROW_HEIGHT_PX)
+
+
+def clear_caches():
+    table_html._row_html.cache_clear()
+    table_html._cell_html.cache_clear()
+
+
+def timed(func, setup=lambda: None, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        setup()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    print(f"{'rows':>6} {'legacy [ms]':>12} {'cold [ms]':>10} {'1 row changed [ms]':>19}")
+    for n_rows in (32, 500, 5000):
+        pivot = build_color_pivot(synthetic_answers(n_rows), SPORT_CHOICES)
+        changed = build_color_pivot(synthetic_answers(n_rows), SPORT_CHOICES)
+        changed.iloc[0, 1:] = ['ピンク', 'ブルー', 'グリーン', 'レッド']
+        assert legacy_html(pivot) == render(pivot)
+
+        legacy = timed(lambda: legacy_html(pivot), repeat=3)
+        cold = timed(lambda: render(pivot), setup=clear_caches)
+
+        def warm_up():
+            clear_caches()
+            render(pivot)
+        warm = timed(lambda: render(changed), setup=warm_up)
+        print(f"{n_rows:>6} {legacy * 1e3:>12.2f} {cold * 1e3:>10.2f} {warm * 1e3:>19.3f}")
+
+
+if __name__ == "__main__":
+    main()
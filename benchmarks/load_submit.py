@@ -0,0 +1,109 @@
+"""回答受付サーバの負荷試験（全班が同じ瞬間に回答を送る）
+
+    uv run python benchmarks/load_submit.py [--teams 32] [--bursts 5]
+
+一時ファイルのストアで dashboard.submit_server を起動し、ストアを読むポーラーも
+同じプロセスに立てておく。各バーストで全班が一斉に POST し、
+
+- 応答時間（p50 / p95 / 最大）と全件の応答が返るまでの時間
+- 最初の送信から、ポーラーのスナップショットに全班の回答が載るまでの時間
+
+を表示する。クライアントも同じプロセスなので、応答時間はその分だけ悲観的になる。
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import tempfile
+import time
+from dataclasses import replace
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from dashboard.answers import COLORS
+from dashboard.config import load_rounds
+from dashboard.poller import get_poller
+from dashboard.store import ResponseStore, store_source
+from dashboard.submit_server import SubmitServer
+
+ROUND = "sport"
+
+
+async def post(host, port, path, payload):
+    """1 班分の送信（接続から応答まで）にかかった時間 [s] とステータス"""
+    start = time.perf_counter()
+    reader, writer = await asyncio.open_connection(host, port)
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    writer.write(f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1") + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    await reader.read()
+    writer.close()
+    return time.perf_counter() - start, status
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+async def burst(server, cfg, n_teams, rng):
+    host, port = server.base_url.rsplit("//", 1)[1].split(":")
+    payloads = [
+        {"班": ban, "answers": {color: rng.choice(cfg.choices) for color in COLORS}}
+        for ban in range(1, n_teams + 1)
+    ]
+    start = time.perf_counter()
+    results = await asyncio.gather(*(post(host, int(port), f"/submit/{cfg.key}", p) for p in payloads))
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--teams", type=int, default=32)
+    parser.add_argument("--bursts", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    cfg = replace(load_rounds()[ROUND], source="local", teams=args.teams)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ResponseStore(Path(tmp) / "responses.sqlite3")
+        # ポーリング間隔は長くしておき、反映が「受付時に起こされた分」だけで起きることを確かめる
+        poller = get_poller(cfg.poller_key, store_source(store, cfg.key), interval=60)
+        server = SubmitServer({cfg.key: cfg}, store, port=0).start()
+        rng = random.Random(args.seed)
+
+        print(f"teams={args.teams}, bursts={args.bursts}")
+        print(f"{'burst':>5} {'ok':>5} {'p50 [ms]':>9} {'p95 [ms]':>9} {'max [ms]':>9} "
+              f"{'all [ms]':>9} {'visible [ms]':>13}")
+        for i in range(args.bursts):
+            version = poller.version
+            start = time.perf_counter()
+            elapsed, results = asyncio.run(burst(server, cfg, args.teams, rng))
+            # 全班の回答がポーラーのスナップショットに載るまで待つ
+            snapshot = poller.snapshot()
+            while snapshot is None or snapshot.version == version or len(snapshot.df) < args.teams:
+                snapshot = poller.wait_for_change(snapshot.version if snapshot else version, timeout=10)
+            visible = time.perf_counter() - start
+            latencies = [latency for latency, _ in results]
+            ok = sum(status == 200 for _, status in results)
+            print(f"{i + 1:>5} {ok:>5} {percentile(latencies, 0.5) * 1000:>9.1f} "
+                  f"{percentile(latencies, 0.95) * 1000:>9.1f} {max(latencies) * 1000:>9.1f} "
+                  f"{elapsed * 1000:>9.1f} {visible * 1000:>13.1f}")
+
+        stats = server.stats
+        print(f"accepted={stats['accepted']}, rejected={stats['rejected']}, "
+              f"commits={stats['commits']}, max_batch={stats['max_batch']}, "
+              f"rows={len(store.history(cfg.key))}")
+        server.stop()
+        poller.stop()
+        poller.join()
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""ダッシュボードと班分けのベンチマークをまとめて回し、結果を JSON に保存する
+
+合成データ（synthetic.py の回答シート・名簿）で、ピボット・票数集計・グラフの準備・
+HTML テーブル・班分け（R1 / R2）・R1 の出力表・名簿の匿名化を規模を変えて測る。
+結果は benchmarks/results/<コミット>.json（--output で変更）に保存するので、
+コミット間の比較は手元でファイル同士を突き合わせればよい。
+
+    uv run python benchmarks/run_suite.py [--quick] [--only pivot assign_r1] [--memory]
+    uv run python benchmarks/run_suite.py --baseline benchmarks/results/abc1234.json
+    uv run python benchmarks/run_suite.py --compare old.json new.json [--threshold 1.2]
+
+各ケースは 1 回空回ししてから --repeat 回以上（速いものは合計 0.2 秒になるまで、1 ケース --budget 秒まで）測り、
+最小・中央値・最大を記録する。--memory を付けると tracemalloc のピークも 1 回測る。
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT), str(ROOT / "src")]
+
+import numpy as np
+import pandas as pd
+
+from dashboard import table_html
+from dashboard.aggregate import VoteAggregator
+from dashboard.answers import normalize_answers
+from dashboard.charts import chart_data, make_choice_chart
+from dashboard.pivot import build_color_pivot
+from mask import anonymize_csv
+from member_divide import assign_r1_teams, assign_r2_teams, create_r1_output_df
+from roster import Roster, build_roster_frame
+from synthetic import ROSTER_DECLINE_RATIO, SPORT_CHOICES, synthetic_answers, synthetic_responses, \
+    synthetic_roster, write_roster_csv
+
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+BG_MAP = {"ピンク": "#fc81ac", "ブルー": "#5ddaf0", "グリーン": "#72C045", "レッド": "#d92c06"}
+# 班の再回答の件数（班の数に対する倍率）
+RESUBMIT_FACTOR = 3
+# 速いケースを繰り返す合計時間の下限 [s]
+MIN_TIME = 0.2
+
+
+def _clear_table_caches():
+    table_html._row_html.cache_clear()
+    table_html._cell_html.cache_clear()
+
+
+def _participants(n_members):
+    roster = synthetic_roster(n_members, decline_ratio=ROSTER_DECLINE_RATIO)
+    return Roster(build_roster_frame(roster)).participants()
+
+
+# 各ケースは 規模 -> (測る関数, 毎回の前処理) を返す。前処理の時間は含めない
+def case_pivot(n_teams, tmp):
+    df = synthetic_answers(n_teams)
+    return lambda: build_color_pivot(df, SPORT_CHOICES), None
+
+
+def case_aggregate(n_teams, tmp):
+    """回答シート全体（班の数 + 再回答）を整形して票数表にする（初回の読み込み）"""
+    df_raw = synthetic_responses(n_teams, n_teams * (1 + RESUBMIT_FACTOR))
+
+    def run():
+        aggregator = VoteAggregator()
+        aggregator.sync(df_raw)
+        return normalize_answers(df_raw), aggregator.count_table(SPORT_CHOICES)
+    return run, None
+
+
+def case_chart_prep(n_teams, tmp):
+    """票数表 → 縦持ち → 選択肢ごとの Vega-Lite spec（spec のキャッシュは通さない）"""
+    aggregator = VoteAggregator()
+    aggregator.sync(synthetic_responses(n_teams, n_teams * (1 + RESUBMIT_FACTOR)))
+    vote_counts = aggregator.count_table(SPORT_CHOICES)
+
+    def run():
+        data = chart_data(vote_counts)
+        return {choice: make_choice_chart(data, choice, BG_MAP).to_dict() for choice in SPORT_CHOICES}
+    return run, None
+
+
+def case_table_html(n_teams, tmp):
+    """行キャッシュが空の状態からの HTML テーブル"""
+    pivot = build_color_pivot(synthetic_answers(n_teams), SPORT_CHOICES)
+    return lambda: table_html.df_to_colored_html_with_colgroup(pivot, BG_MAP), _clear_table_caches
+
+
+def case_assign_r1(n_members, tmp):
+    participants = _participants(n_members)
+    return lambda: assign_r1_teams(participants, seed=0), None
+
+
+def case_assign_r2(n_members, tmp):
+    participants = _participants(n_members)
+    return lambda: assign_r2_teams(participants, seed=0), None
+
+
+def case_create_r1_output(n_members, tmp):
+    participants = _participants(n_members)
+    teams = assign_r1_teams(participants, seed=0)
+    return lambda: create_r1_output_df(teams, participants), None
+
+
+def case_anonymize_csv(n_rows, tmp):
+    input_path, output_path = Path(tmp) / f"roster_{n_rows}.csv", Path(tmp) / f"masked_{n_rows}.csv"
+    write_roster_csv(input_path, n_rows, decline_ratio=ROSTER_DECLINE_RATIO)
+    return lambda: anonymize_csv(input_path, output_path), None
+
+
+# ケース名 -> (関数, 規模の単位, 規模)。--quick では先頭の 2 つだけ
+CASES = {
+    'pivot': (case_pivot, 'teams', (32, 500, 5000)),
+    'aggregate': (case_aggregate, 'teams', (32, 500, 5000)),
+    'chart_prep': (case_chart_prep, 'teams', (32, 500, 5000)),
+    'table_html': (case_table_html, 'teams', (32, 500, 5000)),
+    'assign_r1': (case_assign_r1, 'members', (200, 1000, 5000, 20000)),
+    'assign_r2': (case_assign_r2, 'members', (200, 1000, 5000, 20000)),
+    'create_r1_output': (case_create_r1_output, 'members', (200, 1000, 5000, 20000)),
+    'anonymize_csv': (case_anonymize_csv, 'rows', (1000, 10000, 100000)),
+}
+
+
+def measure(func, setup, repeat, budget, memory):
+    """1 回空回ししてから測る。{'runs', 'min_ms', 'median_ms', 'max_ms'(, 'peak_kb')}"""
+    def once():
+        if setup:
+            setup()
+        random.seed(0)
+        np.random.seed(0)
+        # anonymize_csv などの進捗表示は捨てる
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func()
+            return time.perf_counter() - start
+
+    once()
+    times = []
+    # 速いケースは合計 MIN_TIME 秒になるまで回数を増やし、遅いケースは budget 秒で打ち切る
+    while not times or (sum(times) < budget and (len(times) < repeat or sum(times) < MIN_TIME)):
+        times.append(once())
+    result = {
+        'runs': len(times),
+        'min_ms': round(min(times) * 1e3, 4),
+        'median_ms': round(statistics.median(times) * 1e3, 4),
+        'max_ms': round(max(times) * 1e3, 4),
+    }
+    if memory:
+        if setup:
+            setup()
+        tracemalloc.start()
+        with contextlib.redirect_stdout(io.StringIO()):
+            func()
+        result['peak_kb'] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        tracemalloc.stop()
+    return result
+
+
+def _git(*args):
+    try:
+        return subprocess.run(['git', *args], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    """結果を比べるときに確かめたい実行環境"""
+    import altair
+
+    status = _git('status', '--porcelain', '--untracked-files=no')
+    return {
+        'commit': _git('rev-parse', '--short', 'HEAD'),
+        'dirty': bool(status) if status is not None else None,
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'altair': altair.__version__,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpus': _cpu_count(),
+    }
+
+
+def _cpu_count():
+    return len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count()
+
+
+def run_suite(names, quick=False, repeat=5, budget=2.0, memory=False):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in names:
+            case, unit, scales = CASES[name]
+            for scale in scales[:2] if quick else scales:
+                func, setup = case(scale, tmp)
+                result = {'case': name, 'unit': unit, 'scale': scale, **measure(func, setup, repeat, budget, memory)}
+                results.append(result)
+                peak = f" {result['peak_kb']:>10.0f}" if memory else ""
+                print(f"{name:<17} {unit:>8} {scale:>7} {result['median_ms']:>12.3f} {result['min_ms']:>10.3f}"
+                      f" {result['runs']:>5}{peak}", flush=True)
+    return results
+
+
+def compare(old, new, threshold):
+    """同じケース・規模の中央値を比べ、threshold 倍より遅くなったものの数を返す"""
+    old_results = {(r['case'], r['scale']): r for r in old['results']}
+    print(f"\n{old['environment'].get('commit')} → {new['environment'].get('commit')}")
+    print(f"{'case':<17} {'scale':>7} {'old [ms]':>10} {'new [ms]':>10} {'ratio':>7}")
+    regressions = 0
+    for r in new['results']:
+        base = old_results.get((r['case'], r['scale']))
+        if base is None:
+            continue
+        ratio = r['median_ms'] / base['median_ms'] if base['median_ms'] else float('inf')
+        mark = ""
+        if ratio > threshold:
+            mark = " !"
+            regressions += 1
+        print(f"{r['case']:<17} {r['scale']:>7} {base['median_ms']:>10.3f} {r['median_ms']:>10.3f} "
+              f"{ratio:>6.2f}x{mark}")
+    print(f"{threshold} 倍より遅くなったもの: {regressions} 件")
+    return regressions
+
+
+def _load(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ベンチマークをまとめて回して JSON に保存する")
+    parser.add_argument("--only", nargs="+", choices=list(CASES), help="測るケース（既定は全部）")
+    parser.add_argument("--quick", action="store_true", help="各ケースの小さい 2 つの規模だけ測る")
+    parser.add_argument("--repeat", type=int, default=5, help="1 ケースを測る最小の回数")
+    parser.add_argument("--budget", type=float, default=2.0, help="1 ケースにかける時間の目安 [s]")
+    parser.add_argument("--memory", action="store_true", help="tracemalloc のピークも測る（その分遅い）")
+    parser.add_argument("--output", type=Path, help="結果の JSON（既定は benchmarks/results/<コミット>.json）")
+    parser.add_argument("--baseline", type=Path, help="測ったあとにこの JSON と比べる")
+    parser.add_argument("--compare", type=Path, nargs=2, metavar=("OLD", "NEW"), help="測らずに 2 つの JSON を比べる")
+    parser.add_argument("--threshold", type=float, default=1.2, help="遅くなったとみなす中央値の倍率")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(1 if compare(_load(args.compare[0]), _load(args.compare[1]), args.threshold) else 0)
+
+    env = environment()
+    print(f"commit={env['commit']}{' (未コミットの変更あり)' if env['dirty'] else ''} "
+          f"python={env['python']} pandas={env['pandas']} cpus={env['cpus']}")
+    print(f"{'case':<17} {'unit':>8} {'scale':>7} {'median [ms]':>12} {'min [ms]':>10} {'runs':>5}"
+          + (f" {'peak [KB]':>10}" if args.memory else ""))
+    report = {
+        'environment': env,
+        'settings': {'quick': args.quick, 'repeat': args.repeat, 'budget': args.budget},
+        'results': run_suite(args.only or list(CASES), args.quick, args.repeat, args.budget, args.memory),
+    }
+
+    output = args.output or RESULTS_DIR / f"{env['commit'] or 'unknown'}{'-dirty' if env['dirty'] else ''}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=1) + "\n", encoding='utf-8')
+    print(f"→ {output}")
+
+    if args.baseline:
+        sys.exit(1 if compare(_load(args.baseline), report, args.threshold) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""ベンチマーク用の合成データ"""
+import numpy as np
+import pandas as pd
+
+from dashboard.answers import COLORS
+
+SPORT_CHOICES = ['ポカリ', 'アクエリ', 'だから', 'キリンラブスポーツ']
+
+
+def synthetic_answers(n_teams, choices=SPORT_CHOICES, seed=0):
+    """班ごとに 4 色へ選択肢を割り当てた回答表（normalize_answers 後の形）
+
+    実際のフォームと同じく、同じ選択肢を複数の色に付けた回答も含む。
+    """
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(len(choices), size=(n_teams, len(COLORS)))
+    values = np.asarray(choices, dtype=object)[picks]
+    return pd.DataFrame({
+        '回答者': [f'{i}班' for i in range(1, n_teams + 1)],
+        **{color: values[:, j] for j, color in enumerate(COLORS)},
+    })
+
+
+def synthetic_responses(n_teams, n_rows, choices=SPORT_CHOICES, seed=0):
+    """フォーム回答シート（生データ）。n_rows - n_teams 件は既存の班の再回答"""
+    rng = np.random.default_rng(seed)
+    bans = np.concatenate([rng.permutation(n_teams) + 1, rng.integers(1, n_teams + 1, size=max(n_rows - n_teams, 0))])[:n_rows]
+    values = np.asarray(choices, dtype=object)[rng.integers(len(choices), size=(n_rows, len(COLORS)))]
+    start = pd.Timestamp('2025-11-16 13:00:00')
+    return pd.DataFrame({
+        'タイムスタンプ': [(start + pd.Timedelta(seconds=i)).strftime('%Y/%m/%d %H:%M:%S') for i in range(n_rows)],
+        '班': bans,
+        **{f'回答 [{color}]': values[:, j] for j, color in enumerate(COLORS)},
+    })
+
+
+# 名簿の「所属会社(内定先会社)」の表記と、参加者に占めるおおよその割合
+ROSTER_COMPANIES = {
+    'ソニー株式会社(SEC)': 0.40,
+    'ソニーセミコンダクタソリューションズ株式会社(SSS)': 0.20,
+    'ソニーグループ株式会社(SGC)': 0.15,
+    'ソニー・インタラクティブエンタテインメント(SIE)': 0.10,
+    'その他': 0.10,
+    'まだ決まってない': 0.05,
+}
+ROSTER_EMPLOYEE_RATIO = 0.12
+# 実際の名簿で「参加」以外になっている人のおおよその割合
+ROSTER_DECLINE_RATIO = 0.15
+
+
+def synthetic_roster(n_members, seed=0, employee_ratio=ROSTER_EMPLOYEE_RATIO, decline_ratio=0.0):
+    """名簿一覧_*.csv と同じ列を持つ名簿（decline_ratio の割合で「不参加」が混ざる。既定は全員「参加」）"""
+    rng = np.random.default_rng(seed)
+    companies = np.asarray(list(ROSTER_COMPANIES), dtype=object)
+    p = np.asarray(list(ROSTER_COMPANIES.values()))
+    status = np.where(rng.random(n_members) < employee_ratio, '社員', '内定者')
+    df = pd.DataFrame({
+        'Bridge ID': [f'{i:04d}' for i in range(1, n_members + 1)],
+        'お名前(漢字)': [f'参加者{i}' for i in range(1, n_members + 1)],
+        'お名前(フリガナ)': [f'サンカシャ{i}' for i in range(1, n_members + 1)],
+        '所属会社(内定先会社)': companies[rng.choice(len(companies), size=n_members, p=p)],
+        '内定者/社員': status,
+        'Bridge2026の参加可否': '参加',
+    })
+    if decline_ratio:
+        df.loc[rng.random(n_members) < decline_ratio, 'Bridge2026の参加可否'] = '不参加'
+    return df
+
+
+def write_roster_csv(path, n_members, seed=0, decline_ratio=0.0):
+    """匿名化前の名簿 CSV（メールアドレス・備考の列も付ける）を書く"""
+    df = synthetic_roster(n_members, seed=seed, decline_ratio=decline_ratio)
+    df.insert(1, 'メールアドレス', [f"member{i}@example.co.jp" for i in range(n_members)])
+    df['備考'] = '特になし'
+    df.to_csv(path, index=False, encoding='utf-8')
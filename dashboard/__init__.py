@@ -0,0 +1 @@
+"""利き〇〇ダッシュボードの共通処理（データ取得・集計・描画）"""
@@ -0,0 +1,150 @@
+"""フォーム回答の増分集計
+
+シートは追記のみなので、前回以降に増えた行だけを見て
+「班ごとの最新回答」と「選択肢×色の票数」を差分更新する。
+班が回答し直した場合は古い回答の票を引いてから新しい回答の票を足すので、
+``drop_duplicates(subset=['回答者'], keep='last')`` した表を集計したのと同じ結果になる。
+
+途中の行の編集は、集計済みの行ごとのハッシュ（追記されたときに 1 回だけ計算）と見比べて検知する。
+毎回見比べるのは末尾の VERIFY_TAIL_ROWS 行と、先頭から順番に VERIFY_SCAN_ROWS 行ずつの
+一定の行数だけなので、1 回の更新のコストは増えた行数に比例する（シート全体は見ない）。
+編集された行は、末尾付近ならすぐに、それより前でも全体を 1 周するまで
+（行数 / VERIFY_SCAN_ROWS 回の更新のうち）に見つかり、そこで全体を集計し直す。
+"""
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from dashboard.answers import COLORS
+
+# 毎回編集を確かめる末尾の行数と、それとは別に先頭から順番に確かめる行数
+VERIFY_TAIL_ROWS = 32
+VERIFY_SCAN_ROWS = 256
+
+
+def _team_keys(bans):
+    """班の列を「n班」のキーにする（空欄や整数でない値は None）
+
+    空欄の行があると pandas は列を float にするので、1.0 も 1班 として扱う
+    """
+    numbers = pd.to_numeric(pd.Series(bans, dtype=object), errors='coerce').tolist()
+    return [f"{int(n)}班" if pd.notna(n) and float(n).is_integer() else None for n in numbers]
+
+
+def _team_order(team):
+    """班番号順に並べるキー（番号として読めないものは後ろに文字列順）"""
+    number = team[:-1] if team.endswith('班') else team
+    return (0, int(number), '') if number.isdigit() else (1, 0, team)
+
+
+def _row_hashes(df):
+    return pd.util.hash_pandas_object(df, index=False, categorize=False).to_numpy()
+
+
+def _answer_value(value):
+    return None if pd.isna(value) else value
+
+
+class VoteAggregator:
+    """班ごとの最新回答と、(選択肢, 色) ごとの票数を保持する"""
+
+    def __init__(self, colors=COLORS):
+        self.colors = list(colors)
+        self.latest = {}
+        self.counts = Counter()
+        self.rows_seen = 0
+        # 集計済みの行のハッシュ（先頭 rows_seen 個が有効。追記のたびにコピーしないよう余裕を持って確保）
+        self._row_hashes = np.empty(0, dtype=np.uint64)
+        self._scan_from = 0
+
+    def sync(self, df_raw):
+        """回答シート全体を受け取り、前回以降に追記された行だけを反映する
+
+        返り値は最新回答が変わった班のリスト。行の削除や途中の行の編集を
+        検知したときは全体を集計し直す。
+        """
+        if self.rows_seen and (len(df_raw) < self.rows_seen or self._edited(df_raw)):
+            return self._rebuild(df_raw)
+
+        new_rows = df_raw.iloc[self.rows_seen:]
+        if new_rows.empty:
+            return []
+        changed = self._apply(
+            _team_keys(new_rows['班'].values),
+            zip(*(new_rows[f'回答 [{color}]'].tolist() for color in self.colors)),
+        )
+        self._append_hashes(_row_hashes(new_rows))
+        return changed
+
+    def _edited(self, df_raw):
+        """集計済みの行のうち、末尾と今回の巡回分に書き換えられた行があるか"""
+        tail = np.arange(max(0, self.rows_seen - VERIFY_TAIL_ROWS), self.rows_seen)
+        scan = np.arange(self._scan_from, min(self._scan_from + VERIFY_SCAN_ROWS, self.rows_seen))
+        self._scan_from = scan[-1] + 1 if len(scan) and scan[-1] + 1 < self.rows_seen else 0
+        positions = np.union1d(tail, scan)
+        return not np.array_equal(_row_hashes(df_raw.iloc[positions]), self._row_hashes[positions])
+
+    def _append_hashes(self, hashes):
+        end = self.rows_seen + len(hashes)
+        if end > len(self._row_hashes):
+            grown = np.empty(max(end, 2 * len(self._row_hashes)), dtype=np.uint64)
+            grown[:self.rows_seen] = self._row_hashes[:self.rows_seen]
+            self._row_hashes = grown
+        self._row_hashes[self.rows_seen:end] = hashes
+        self.rows_seen = end
+
+    def apply_answers(self, df):
+        """「回答者 + 4色」の表（normalize_answers の形）を反映する"""
+        return self._apply(df['回答者'].values, zip(*(df[color].values for color in self.colors)))
+
+    def count_table(self, choices):
+        """選択肢×色の票数表"""
+        return pd.DataFrame(
+            [[self.counts[(choice, color)] for color in self.colors] for choice in choices],
+            index=list(choices), columns=self.colors,
+        )
+
+    def answers_frame(self):
+        """班ごとの最新回答を班番号順に並べた表（normalize_answers と同じ形）"""
+        teams = sorted(self.latest, key=_team_order)
+        return pd.DataFrame({
+            '回答者': teams,
+            **{color: [self.latest[team][j] for team in teams] for j, color in enumerate(self.colors)},
+        })
+
+    def _apply(self, teams, answers):
+        changed = []
+        for team, answer in zip(teams, answers):
+            if team is None:
+                continue  # 班が空欄・数字でない行は数えない
+            answer = tuple(map(_answer_value, answer))
+            old = self.latest.get(team)
+            if old == answer:
+                continue
+            if old is not None:
+                for color, value in zip(self.colors, old):
+                    self.counts[(value, color)] -= 1
+            for color, value in zip(self.colors, answer):
+                self.counts[(value, color)] += 1
+            self.latest[team] = answer
+            changed.append(team)
+        return changed
+
+    def _rebuild(self, df_raw):
+        old_latest = self.latest
+        self.latest = {}
+        self.counts = Counter()
+        self.rows_seen = 0
+        self._row_hashes = np.empty(0, dtype=np.uint64)
+        self._scan_from = 0
+        self.sync(df_raw)
+        return sorted(team for team in old_latest.keys() | self.latest.keys()
+                      if old_latest.get(team) != self.latest.get(team))
+
+
+def count_votes(df, choices, colors=COLORS):
+    """「回答者 + 4色」の表から選択肢×色の票数表を作る（ダミーデータ用）"""
+    aggregator = VoteAggregator(colors)
+    aggregator.apply_answers(df)
+    return aggregator.count_table(choices)
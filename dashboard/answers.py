@@ -0,0 +1,38 @@
+"""フォーム回答シートを班ごとの回答表に整形する"""
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+COLORS = ['ピンク', 'ブルー', 'グリーン', 'レッド']
+ANSWER_COLUMNS = ['回答者'] + COLORS
+
+
+def normalize_answers(df_raw):
+    """回答シートから「回答者 + 4色」の表を作る（班ごとに最新の回答のみ、班番号順）"""
+    # CSVの「班」列を「回答者」として使用（「班」を付ける）
+    df = pd.DataFrame({
+        "回答者": [f"{ban}班" for ban in df_raw['班'].values],
+        **{color: df_raw[f'回答 [{color}]'].values for color in COLORS},
+    })
+    # 重複した班がある場合は最新の回答を残す
+    df = df.drop_duplicates(subset=['回答者'], keep='last').reset_index(drop=True)
+    # 班番号でソート（数値順）
+    df = df.sort_values('回答者', key=lambda x: x.str.replace('班', '').astype(int)).reset_index(drop=True)
+    return df
+
+
+def dummy_answers(choices, n_teams=32):
+    """シートを読めないとき用のランダムな回答表"""
+    assignments = [np.random.choice(choices, size=4, replace=False) for _ in range(n_teams)]
+    return pd.DataFrame({
+        "回答者": [f'{i}班' for i in range(1, n_teams + 1)],
+        **{color: [a[j] for a in assignments] for j, color in enumerate(COLORS)},
+    })
+
+
+def answers_digest(df):
+    """回答表の内容から変更検知用のハッシュを作る"""
+    hashed = pd.util.hash_pandas_object(df[ANSWER_COLUMNS], index=False)
+    return hashlib.sha1(hashed.values.tobytes()).hexdigest()
+
@@ -0,0 +1,160 @@
+"""ヘッダー画像などの静的ファイル（縮小・圧縮した版を 1 回だけ作ってメモリに持つ）
+
+assets/header.png（約 1.5 MB、幅 2976px）を毎回ディスクから読んでそのまま渡していたのを、
+表示幅に縮小して圧縮した版にする。
+
+- ライブ更新サーバ用は WebP（約 50 KB）。/assets/<名前>-<ハッシュ>.webp として配信し、
+  内容が変われば URL も変わるので、ブラウザには 1 年キャッシュしてよいと伝える
+- Streamlit 用は JPEG（透過があれば PNG）で幅 1460px 以下。st.image はそれ以外の形式や
+  それより大きい画像を再実行のたびに縮小・再エンコードするので、そのまま渡せる形にしておく
+- 作った版は元の画像の内容と設定から決めたハッシュをファイル名に入れてリポジトリ直下の .asset_cache/ に保存し、
+  プロセスではメモリに持つ（元の画像が変わったときだけ作り直す）
+- Pillow がない、または変換できないときは元のファイルをそのまま使う
+
+    uv run python -m dashboard.assets    # 事前に作っておく（デプロイ時など）
+"""
+import argparse
+import hashlib
+import io
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+ASSETS_DIR = Path(__file__).resolve().parent.parent / "assets"
+# ASSETS_DIR と同じくリポジトリ直下に置く（どこから起動しても同じキャッシュを使う）
+CACHE_DIR = Path(os.environ.get("ASSET_CACHE_DIR", ASSETS_DIR.parent / ".asset_cache"))
+HEADER_IMAGE = "header.png"
+# 縮小後の最大幅（ワイド表示の画面幅の 1.2 倍程度）と圧縮の品質
+IMAGE_MAX_WIDTH = int(os.environ.get("ASSET_IMAGE_WIDTH", "1600"))
+IMAGE_QUALITY = 80
+# st.image が手を加えずに配信する最大幅（2 × 730px）
+STREAMLIT_MAX_WIDTH = 1460
+# URL に内容のハッシュが入っているので、同じ URL の中身は変わらない
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+_SUFFIXES = {"WEBP": ".webp", "JPEG": ".jpg", "PNG": ".png"}
+_CONTENT_TYPES = {".webp": "image/webp", ".png": "image/png", ".jpg": "image/jpeg", ".jpeg": "image/jpeg"}
+
+
+@dataclass(frozen=True)
+class Asset:
+    """配信する 1 ファイル分（name は URL に使うハッシュ入りのファイル名）"""
+    name: str
+    body: bytes
+    content_type: str
+    etag: str
+    original_size: int
+
+
+def _has_alpha(image):
+    return image.mode in ("RGBA", "LA", "PA") and image.getchannel("A").getextrema()[0] < 255
+
+
+def _encode(data, max_width, image_format, quality):
+    """縮小して image_format にした (バイト列, 形式)。Pillow がない・書けないときは (None, None)
+
+    JPEG を指定しても透過がある画像は PNG にする
+    """
+    try:
+        from PIL import Image  # 初めて画像を作るときだけ読む
+    except ImportError:
+        return None, None
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            if image.width > max_width:
+                image = image.resize((max_width, round(image.height * max_width / image.width)), Image.LANCZOS)
+            if image_format == "JPEG":
+                if _has_alpha(image):
+                    image_format = "PNG"
+                else:
+                    image = image.convert("RGB")
+            options = {"PNG": {"optimize": True}, "WEBP": {"quality": quality, "method": 4}}.get(
+                image_format, {"quality": quality})
+            buffer = io.BytesIO()
+            image.save(buffer, image_format, **options)
+    except (OSError, KeyError, ValueError):
+        return None, None
+    return buffer.getvalue(), image_format
+
+
+def _cached(cache_dir, prefix):
+    """.asset_cache/<prefix>.* にある作成済みのファイル（なければ (None, None)）"""
+    for suffix in _SUFFIXES.values():
+        try:
+            return (Path(cache_dir) / f"{prefix}{suffix}").read_bytes(), suffix
+        except OSError:
+            pass
+    return None, None
+
+
+@lru_cache(maxsize=16)
+def _build(path, mtime_ns, max_width, image_format, quality, cache_dir):
+    data = path.read_bytes()
+    h = hashlib.sha256(data)
+    h.update(f"|{max_width}|{image_format}|{quality}".encode())
+    digest = h.hexdigest()[:16]
+    body, suffix = _cached(cache_dir, f"{path.stem}-{digest}")
+    if body is None:
+        body, written_format = _encode(data, max_width, image_format, quality)
+        if body is not None:
+            suffix = _SUFFIXES[written_format]
+            cached = Path(cache_dir) / f"{path.stem}-{digest}{suffix}"
+            try:
+                cached.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = cached.with_name(cached.name + ".tmp")
+                tmp_path.write_bytes(body)
+                os.replace(tmp_path, cached)
+            except OSError:
+                pass  # 書けなくてもメモリには持つ
+    if body is None or len(body) >= len(data):
+        # 変換できない、または小さくならないときは元のまま
+        body, suffix = data, path.suffix.lower()
+    return Asset(
+        name=f"{path.stem}-{digest}{suffix}",
+        body=body,
+        content_type=_CONTENT_TYPES.get(suffix, "application/octet-stream"),
+        etag=f'"{digest}"',
+        original_size=len(data),
+    )
+
+
+def optimized_image(name, max_width=IMAGE_MAX_WIDTH, image_format="WEBP", quality=IMAGE_QUALITY,
+                    assets_dir=ASSETS_DIR, cache_dir=CACHE_DIR):
+    """assets/<name> を max_width まで縮小して image_format（WEBP / JPEG / PNG）にした Asset
+
+    ファイルがなければ None
+    """
+    path = Path(assets_dir) / name
+    try:
+        mtime_ns = path.stat().st_mtime_ns
+    except OSError:
+        return None
+    return _build(path, mtime_ns, max_width, image_format.upper(), quality, str(cache_dir))
+
+
+def header_image():
+    """ライブ更新ページ用のヘッダー画像（WebP。assets/header.png がなければ None）"""
+    return optimized_image(HEADER_IMAGE)
+
+
+def streamlit_header_image():
+    """st.image にそのまま渡せるヘッダー画像（assets/header.png がなければ None）"""
+    return optimized_image(HEADER_IMAGE, max_width=STREAMLIT_MAX_WIDTH, image_format="JPEG")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ヘッダー画像の縮小・圧縮版を作っておく")
+    parser.add_argument("names", nargs="*", default=[HEADER_IMAGE], help="assets/ の中のファイル名")
+    args = parser.parse_args()
+    for name in args.names:
+        for max_width, image_format in ((IMAGE_MAX_WIDTH, "WEBP"), (STREAMLIT_MAX_WIDTH, "JPEG")):
+            asset = optimized_image(name, max_width=max_width, image_format=image_format)
+            if asset is None:
+                print(f"⚠️ {ASSETS_DIR / name} がありません")
+                break
+            print(f"✅ {name}: {asset.original_size / 1024:.0f} KB → {asset.name} {len(asset.body) / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""選択肢ごとの色別票数グラフ（Altair / Vega-Lite）
+
+票数の縦持ちデータはスナップショットごとに 1 回だけ作り、4 つのグラフ
+（またはファセット 1 枚）をそこから組み立てる。組み立てた Vega-Lite の
+spec はスナップショットのハッシュをキーに覚えておき、回答が変わらない限り
+Altair での組み立て・検証・JSON 化をやり直さない。
+
+Altair は読み込みに 0.3 秒ほどかかるので、最初に spec を組み立てるときに読む
+（ページの他の部分の表示や、spec がキャッシュにあるときは読まずに済む）。
+"""
+import threading
+from collections import OrderedDict
+
+from dashboard.answers import COLORS
+
+SPEC_CACHE_SIZE = 32
+
+
+def chart_data(vote_counts):
+    """選択肢×色の票数表を「選択肢・色・票数」の縦持ちにする（票のある組だけ）"""
+    data = (
+        vote_counts.rename_axis(index='選択肢', columns='色')
+        .stack()
+        .rename('票数')
+        .reset_index()
+    )
+    return data[data['票数'] > 0].reset_index(drop=True)
+
+
+def _bars(data, bg_map, max_votes):
+    import altair as alt
+
+    return (
+        alt.Chart(data)
+        .mark_bar(cornerRadiusTopLeft=5, cornerRadiusTopRight=5)
+        .encode(
+            x=alt.X('色:N', sort=COLORS, title=None),
+            y=alt.Y('票数:Q', scale=alt.Scale(domain=[0, max_votes * 1.25])),
+            color=alt.Color('色:N',
+                            scale=alt.Scale(domain=list(bg_map.keys()), range=list(bg_map.values())),
+                            legend=None),
+            tooltip=['色', '票数']
+        )
+    )
+
+
+def make_choice_chart(data, choice, bg_map):
+    """1 つの選択肢の色別票数グラフ"""
+    counts = data[data['選択肢'] == choice][['色', '票数']]
+    return _bars(counts, bg_map, counts['票数'].max()).properties(title=choice, height=400)
+
+
+def make_faceted_chart(data, choices, bg_map, columns=2):
+    """全選択肢を 1 枚にまとめたファセットグラフ（縦軸は共通）"""
+    import altair as alt
+
+    return (
+        _bars(data, bg_map, data['票数'].max())
+        .properties(height=400)
+        .facet(facet=alt.Facet('選択肢:N', sort=list(choices), title=None), columns=columns)
+    )
+
+
+class _SpecCache:
+    def __init__(self, maxsize=SPEC_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._specs = OrderedDict()
+
+    def get_or_build(self, key, build):
+        with self._lock:
+            if key in self._specs:
+                self._specs.move_to_end(key)
+                return self._specs[key]
+        spec = build()
+        with self._lock:
+            self._specs[key] = spec
+            while len(self._specs) > self.maxsize:
+                self._specs.popitem(last=False)
+        return spec
+
+
+_spec_cache = _SpecCache()
+
+
+def chart_specs(digest, vote_counts, choices, bg_map):
+    """選択肢ごとの Vega-Lite spec（digest が同じなら前回の spec を返す）"""
+    key = ('choices', digest, tuple(choices), tuple(bg_map.items()))
+
+    def build():
+        data = chart_data(vote_counts)
+        return {choice: make_choice_chart(data, choice, bg_map).to_dict() for choice in choices}
+    return _spec_cache.get_or_build(key, build)
+
+
+def faceted_chart_spec(digest, vote_counts, choices, bg_map, columns=2):
+    """ファセットグラフの Vega-Lite spec（digest が同じなら前回の spec を返す）"""
+    key = ('facet', digest, tuple(choices), tuple(bg_map.items()), columns)
+
+    def build():
+        return make_faceted_chart(chart_data(vote_counts), choices, bg_map, columns).to_dict()
+    return _spec_cache.get_or_build(key, build)
@@ -0,0 +1,100 @@
+"""ラウンド（利きスポドリ・利きお茶 …）ごとの設定
+
+設定は rounds.json（DASHBOARD_ROUNDS で差し替え可）にまとめてあり、
+新しいラウンドを増やすときは rounds に 1 件足すだけでよい。
+"""
+import json
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+from dashboard.answers import COLORS
+from dashboard.store import RESPONSE_STORE
+
+ROUNDS_PATH = Path(os.environ.get(
+    "DASHBOARD_ROUNDS", Path(__file__).resolve().parent.parent / "rounds.json"
+))
+
+_REQUIRED = ("key", "name", "title", "subtitle", "result_label", "footer", "choices", "sheet_id", "gid")
+
+
+@dataclass(frozen=True)
+class RoundConfig:
+    """1 ラウンド分の表示内容と回答シート"""
+    key: str
+    name: str
+    title: str
+    subtitle: str
+    result_label: str
+    footer: str
+    choices: tuple
+    sheet_id: str
+    gid: str
+    # 色名 -> 塗りつぶし色
+    bg_map: dict
+    # True にすると 4 つの棒グラフを 1 枚のファセットグラフで表示
+    faceted_chart: bool = False
+    # 回答の入手先: "sheet"（Google フォーム → シート）か "local"（dashboard.submit_server）
+    source: str = "sheet"
+    # 班の数（回答受付サーバでの班番号チェック用）
+    teams: int = 32
+
+    @property
+    def poller_key(self):
+        return f"sheet:{self.sheet_id}:{self.gid}"
+
+
+def parse_rounds(data, response_store=RESPONSE_STORE):
+    """設定の dict から {key: RoundConfig} を作る（表示順は設定ファイルの順）
+
+    source=local のラウンドは回答をストアから読むので、response_store がなければここで弾く
+    """
+    bg_map = dict(data.get("colors", {}))
+    missing_colors = [color for color in COLORS if color not in bg_map]
+    if missing_colors:
+        raise ValueError(f"colors に色の指定がありません: {missing_colors}")
+
+    rounds = {}
+    for entry in data.get("rounds", []):
+        missing = [name for name in _REQUIRED if name not in entry]
+        if missing:
+            raise ValueError(f"ラウンド設定に必要な項目がありません: {missing} ({entry.get('key', '?')})")
+        if entry["key"] in rounds:
+            raise ValueError(f"ラウンドの key が重複しています: {entry['key']}")
+        if not entry["choices"]:
+            raise ValueError(f"choices が空です: {entry['key']}")
+        rounds[entry["key"]] = RoundConfig(
+            key=entry["key"],
+            name=entry["name"],
+            title=entry["title"],
+            subtitle=entry["subtitle"],
+            result_label=entry["result_label"],
+            footer=entry["footer"],
+            choices=tuple(entry["choices"]),
+            sheet_id=entry["sheet_id"],
+            gid=str(entry["gid"]),
+            bg_map={**bg_map, **entry.get("colors", {})},
+            faceted_chart=bool(entry.get("faceted_chart", False)),
+            source=entry.get("source", "sheet"),
+            teams=int(entry.get("teams", 32)),
+        )
+        if rounds[entry["key"]].source not in ("sheet", "local"):
+            raise ValueError(f"source は sheet か local を指定してください: {entry['key']}")
+        if rounds[entry["key"]].source == "local" and not response_store:
+            raise ValueError(f"source=local のラウンド {entry['key']} には RESPONSE_STORE の指定が必要です")
+    if not rounds:
+        raise ValueError("rounds が 1 件もありません")
+    return rounds
+
+
+@lru_cache(maxsize=8)
+def _load(path, mtime_ns, response_store):
+    with open(path, encoding="utf-8") as f:
+        return parse_rounds(json.load(f), response_store)
+
+
+def load_rounds(path=ROUNDS_PATH, response_store=RESPONSE_STORE):
+    """設定ファイルを読む（ファイルが更新されるまでは前回の結果を返す）"""
+    path = Path(path)
+    return _load(path, path.stat().st_mtime_ns, response_store)
@@ -0,0 +1,145 @@
+"""Google Sheets の CSV エクスポートを真似るローカル HTTP サーバ
+
+本番のシートを使わずにキャッシュや自動更新の動作を確認するためのもの。
+
+    python -m dashboard.fake_sheet data/responses.csv --port 8765
+    SHEET_BASE_URL=http://127.0.0.1:8765 uv run streamlit run app_sport.py
+
+CSV ファイルはリクエストごとに読み直すので、ファイルを書き換えれば
+新しい回答が届いたのと同じ状態になる。CSV の代わりに ``--simulate sport`` を
+指定すると、rounds.json の選択肢でランダムな回答を一定間隔で追加し続ける。
+"""
+import argparse
+import hashlib
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from dashboard.answers import COLORS
+from dashboard.config import load_rounds
+
+CSV_HEADER = "タイムスタンプ,班," + ",".join(f"回答 [{color}]" for color in COLORS) + "\n"
+
+
+class FakeSheetServer:
+    """CSV を返すだけの HTTP サーバ（ETag 対応・障害の再現用フラグ付き）"""
+
+    def __init__(self, csv_text="", csv_path=None, host="127.0.0.1", port=0):
+        self.csv_text = csv_text
+        self.csv_path = Path(csv_path) if csv_path else None
+        # True にすると 503 を返す（シート障害の再現用）
+        self.fail = False
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def set_csv(self, csv_text):
+        self.csv_text = csv_text
+
+    def submit(self, ban, answers):
+        """班の回答を 1 行追加する（フォーム送信の代わり）"""
+        timestamp = time.strftime("%Y/%m/%d %H:%M:%S")
+        with self._lock:
+            text = self.csv_text or CSV_HEADER
+            self.csv_text = text + f"{timestamp},{ban}," + ",".join(answers) + "\n"
+
+    def start_simulation(self, choices, n_teams=32, interval=2.0, seed=None):
+        """interval 秒ごとにランダムな班がランダムな回答を送り続けるスレッドを起動する"""
+        rng = random.Random(seed)
+
+        def run():
+            while True:
+                self.submit(rng.randint(1, n_teams), [rng.choice(choices) for _ in COLORS])
+                time.sleep(interval)
+        threading.Thread(target=run, daemon=True).start()
+        return self
+
+    def body(self):
+        if self.csv_path is not None:
+            return self.csv_path.read_bytes()
+        return self.csv_text.encode("utf-8")
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with server._lock:
+                    server.request_count += 1
+                if server.fail:
+                    self.send_error(503)
+                    return
+                body = server.body()
+                # range=開始行:終了行（1 始まり）で行範囲を切り出す
+                row_range = parse_qs(urlparse(self.path).query).get("range")
+                if row_range:
+                    start, end = (int(n) for n in row_range[0].split(":"))
+                    lines = body.decode("utf-8").splitlines(keepends=True)
+                    body = "".join(lines[start - 1:end]).encode("utf-8")
+                etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/csv; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Google Sheets CSV エクスポートのスタンドイン")
+    parser.add_argument("csv_path", nargs="?", help="返す CSV ファイル（フォームの回答シートと同じ列構成）")
+    parser.add_argument("--simulate", metavar="ROUND", help="CSV の代わりに指定ラウンドのランダムな回答を追加し続ける")
+    parser.add_argument("--teams", type=int, default=32)
+    parser.add_argument("--interval", type=float, default=2.0, help="--simulate の回答間隔（秒）")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    if not args.csv_path and not args.simulate:
+        parser.error("csv_path か --simulate のどちらかを指定してください")
+
+    server = FakeSheetServer(csv_path=args.csv_path, host=args.host, port=args.port)
+    if args.simulate:
+        server.start_simulation(load_rounds()[args.simulate].choices, args.teams, args.interval)
+    print(f"📄 {args.csv_path or args.simulate} を {server.base_url} で配信します（Ctrl+C で終了）")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+"""差分だけを送るライブ更新モード（Server-Sent Events）
+
+Streamlit の自動リフレッシュでは視聴者ごとにスクリプト全体が再実行され、
+回答が変わっていなくても画面全体が送られる。このモードでは回答が
+変わったときだけ「変わった班の行と最新の票数」を小さな JSON で配信し、
+ブラウザ側でテーブルと棒グラフをその場で書き換える。
+
+    uv run python -m dashboard.live --port 8600
+    # → http://127.0.0.1:8600/sport, http://127.0.0.1:8600/tea
+
+配信する JSON はバージョンごとに 1 回だけ作り、全視聴者で使い回す。
+"""
+import argparse
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from html import escape
+
+from dashboard.answers import COLORS
+from dashboard.assets import CACHE_CONTROL, header_image
+from dashboard.config import load_rounds
+from dashboard.metrics import get_metrics, timed
+from dashboard.pivot import build_color_pivot
+from dashboard.poller import SHEET_POLL_INTERVAL, get_poller, round_source
+
+KEEPALIVE_SECONDS = 15
+
+
+def _encode(event, payload):
+    data = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+    return f"event: {event}\ndata: {data}\n\n".encode("utf-8")
+
+
+class LiveBoard:
+    """1 ラウンド分の配信メッセージ（バージョンごとに作ってキャッシュする）"""
+
+    def __init__(self, cfg, poller):
+        self.cfg = cfg
+        self.poller = poller
+        self._lock = threading.Lock()
+        self._state = (None, None)
+        self._delta = (None, None)
+
+    def _rows(self, df):
+        pivot = build_color_pivot(df, self.cfg.choices)
+        return {row[0]: list(row[1:]) for row in pivot.itertuples(index=False)}
+
+    def _counts(self, snapshot):
+        return snapshot.count_table(self.cfg.choices).values.tolist()
+
+    def state_message(self, snapshot):
+        """接続直後に送る全体の状態"""
+        with self._lock:
+            version, message = self._state
+            if version == snapshot.version:
+                return message
+        with timed("live_state"):
+            message = _encode("state", {
+                "version": snapshot.version,
+                "rows": self._rows(snapshot.df),
+                "counts": self._counts(snapshot),
+            })
+        with self._lock:
+            self._state = (snapshot.version, message)
+        return message
+
+    def delta_message(self, snapshot):
+        """直前のバージョンからの差分（変わった班の行と最新の票数）"""
+        with self._lock:
+            version, message = self._delta
+            if version == snapshot.version:
+                return message
+        with timed("live_delta"):
+            changed = snapshot.df[snapshot.df['回答者'].isin(snapshot.changed)]
+            rows = self._rows(changed)
+            message = _encode("delta", {
+                "version": snapshot.version,
+                # 消えた班（シートから行が削除された場合）は null
+                "rows": {team: rows.get(team) for team in snapshot.changed},
+                "counts": self._counts(snapshot),
+            })
+        with self._lock:
+            self._delta = (snapshot.version, message)
+        return message
+
+    def stream(self, write):
+        """1 視聴者分の配信ループ（接続が切れるまで戻らない）"""
+        snapshot = self.poller.snapshot() or self.poller.wait_for_change(0)
+        write(self.state_message(snapshot))
+        version = snapshot.version
+        while True:
+            snapshot = self.poller.wait_for_change(version, timeout=KEEPALIVE_SECONDS)
+            if snapshot is None or snapshot.version == version:
+                write(b": keepalive\n\n")
+                continue
+            if snapshot.version == version + 1:
+                write(self.delta_message(snapshot))
+            else:
+                # 取りこぼしたバージョンがあるときは全体を送り直す
+                write(self.state_message(snapshot))
+            version = snapshot.version
+
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="ja"><head><meta charset="utf-8"><title>{name}</title>
+<style>
+body {{ background:#f0faff; font-family:"Helvetica Neue",Arial,sans-serif; margin:0 16px; }}
+.header-image {{ display:block; width:100%; height:auto; }}
+.header-title {{ font-size:36px; font-weight:900; text-align:center; color:#1e88e5; margin:10px 0 4px 0; font-family:"Trebuchet MS",sans-serif; text-shadow:1px 2px #b3e5fc; }}
+.sub-text {{ text-align:center; font-size:18px; margin-bottom:12px; color:#555; }}
+.layout {{ display:grid; grid-template-columns:1.2fr 2.3fr; gap:16px; }}
+.drink-card {{ border-radius:12px; background:#ffffffcc; padding:12px; margin-top:14px; box-shadow:0 4px 10px rgba(130,200,255,0.25); }}
+.compact-table {{ border-collapse:collapse; width:100%; table-layout:fixed; font-size:12px; }}
+.compact-table th {{ position:sticky; top:0; background:rgba(255,255,255,0.95); padding:4px 2px; white-space:nowrap; overflow:hidden; text-overflow:ellipsis; }}
+.compact-table td {{ padding:4px 2px; height:18px; border-bottom:1px solid rgba(0,0,0,0.03); }}
+.charts {{ display:grid; grid-template-columns:1fr 1fr; gap:12px; }}
+.chart h3 {{ margin:4px 0; font-size:16px; }}
+.bars {{ display:flex; align-items:flex-end; gap:10px; height:320px; border-bottom:1px solid #ccc; }}
+.bar {{ flex:1; border-radius:5px 5px 0 0; transition:height .4s; position:relative; }}
+.bar span {{ position:absolute; top:-18px; width:100%; text-align:center; font-size:12px; }}
+.labels {{ display:flex; gap:10px; font-size:12px; }} .labels div {{ flex:1; text-align:center; }}
+.footer {{ text-align:center; color:#888; font-size:12px; }}
+</style></head><body>
+{header}<h1 class="header-title">{title}</h1><p class="sub-text">{subtitle}</p>
+<div class="layout">
+  <div class="drink-card"><div>🧾 集計結果</div><table class="compact-table"><thead><tr id="head"></tr></thead><tbody id="rows"></tbody></table></div>
+  <div class="drink-card"><div>{result_label}</div><div class="charts" id="charts"></div></div>
+</div>
+<p class="footer">{footer}</p>
+<script>
+const CHOICES = {choices}, COLORS = {colors}, BG = {bg_map};
+const head = document.getElementById("head"), body = document.getElementById("rows"), charts = document.getElementById("charts");
+head.innerHTML = "<th>回答者</th>" + CHOICES.map(c => "<th></th>").join("");
+CHOICES.forEach((c, i) => head.children[i + 1].textContent = c);
+const bars = CHOICES.map(choice => {{
+  const card = document.createElement("div"); card.className = "chart";
+  card.innerHTML = "<h3></h3><div class='bars'></div><div class='labels'></div>";
+  card.querySelector("h3").textContent = choice;
+  const row = COLORS.map(color => {{
+    const bar = document.createElement("div"); bar.className = "bar"; bar.style.background = BG[color];
+    bar.appendChild(document.createElement("span")); card.querySelector(".bars").appendChild(bar);
+    const label = document.createElement("div"); label.textContent = color; card.querySelector(".labels").appendChild(label);
+    return bar;
+  }});
+  charts.appendChild(card); return row;
+}});
+const teamNo = team => parseInt(team, 10);
+function cell(td, value) {{
+  const colors = value ? value.split("・").filter(c => c in BG).map(c => BG[c]) : [];
+  td.style.background = colors.length ? "linear-gradient(90deg, " + colors.join(", ") + ")" : "";
+}}
+function patchRow(team, cells) {{
+  let tr = document.getElementById("team-" + team);
+  if (cells === null) {{ if (tr) tr.remove(); return; }}
+  if (!tr) {{
+    tr = document.createElement("tr"); tr.id = "team-" + team;
+    tr.innerHTML = "<td></td>" + CHOICES.map(() => "<td></td>").join("");
+    tr.firstChild.textContent = team;
+    const next = [...body.children].find(r => teamNo(r.firstChild.textContent) > teamNo(team));
+    body.insertBefore(tr, next || null);
+  }}
+  cells.forEach((value, i) => cell(tr.children[i + 1], value));
+}}
+function patchCounts(counts) {{
+  counts.forEach((row, i) => {{
+    const max = Math.max(1, ...row) * 1.25;
+    row.forEach((n, j) => {{
+      bars[i][j].style.height = (n / max * 100) + "%";
+      bars[i][j].firstChild.textContent = n || "";
+    }});
+  }});
+}}
+const source = new EventSource("/events/{key}");
+source.addEventListener("state", e => {{
+  const msg = JSON.parse(e.data); body.innerHTML = "";
+  Object.entries(msg.rows).forEach(([team, cells]) => patchRow(team, cells));
+  patchCounts(msg.counts);
+}});
+source.addEventListener("delta", e => {{
+  const msg = JSON.parse(e.data);
+  Object.entries(msg.rows).forEach(([team, cells]) => patchRow(team, cells));
+  patchCounts(msg.counts);
+}});
+</script></body></html>
+"""
+
+
+def render_page(cfg, header=None):
+    def js(value):
+        return json.dumps(value, ensure_ascii=False).replace("</", "<\\/")
+    # ヘッダー画像は内容のハッシュ入りの URL で参照し、ブラウザにキャッシュさせる
+    header_html = f'<img class="header-image" src="/assets/{escape(header.name)}" alt="">' if header else ""
+    return PAGE_TEMPLATE.format(
+        header=header_html, key=escape(cfg.key), name=escape(cfg.name), title=escape(cfg.title),
+        subtitle=escape(cfg.subtitle), result_label=escape(cfg.result_label), footer=escape(cfg.footer),
+        choices=js(list(cfg.choices)), colors=js(COLORS), bg_map=js(cfg.bg_map),
+    ).encode("utf-8")
+
+
+class LiveServer:
+    """全ラウンドのライブページと SSE を配信する HTTP サーバ"""
+
+    def __init__(self, rounds, host="127.0.0.1", port=8600, source_factory=None,
+                 poll_interval=SHEET_POLL_INTERVAL):
+        source_factory = source_factory or round_source
+        self.boards = {
+            key: LiveBoard(cfg, get_poller(cfg.poller_key, source_factory(cfg), poll_interval))
+            for key, cfg in rounds.items()
+        }
+        header = header_image()
+        self.assets = {header.name: header} if header is not None else {}
+        self.pages = {key: render_page(cfg, header) for key, cfg in rounds.items()}
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def serve_forever(self):
+        self._httpd.serve_forever()
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _count(self, n):
+        with self._lock:
+            self.bytes_sent += n
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                parts = self.path.strip("/").split("/")
+                if len(parts) == 2 and parts[0] == "events" and parts[1] in server.boards:
+                    self._events(server.boards[parts[1]])
+                elif len(parts) == 2 and parts[0] == "assets" and parts[1] in server.assets:
+                    self._send_asset(server.assets[parts[1]])
+                elif parts == ["metrics"]:
+                    body = get_metrics().prometheus_text().encode("utf-8")
+                    self._send(200, "text/plain; version=0.0.4; charset=utf-8", body)
+                elif len(parts) == 1 and parts[0] in server.pages:
+                    self._send(200, "text/html; charset=utf-8", server.pages[parts[0]])
+                elif parts == [""]:
+                    links = "".join(
+                        f"<li><a href='/{escape(key)}'>{escape(board.cfg.name)}</a></li>"
+                        for key, board in server.boards.items()
+                    )
+                    self._send(200, "text/html; charset=utf-8", f"<ul>{links}</ul>".encode("utf-8"))
+                else:
+                    self.send_error(404)
+
+            def _send(self, status, content_type, body):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                server._count(len(body))
+
+            def _send_asset(self, asset):
+                if self.headers.get("If-None-Match") == asset.etag:
+                    self.send_response(304)
+                    self.send_header("ETag", asset.etag)
+                    self.send_header("Cache-Control", CACHE_CONTROL)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", asset.content_type)
+                self.send_header("Content-Length", str(len(asset.body)))
+                self.send_header("ETag", asset.etag)
+                self.send_header("Cache-Control", CACHE_CONTROL)
+                self.end_headers()
+                self.wfile.write(asset.body)
+                server._count(len(asset.body))
+
+            def _events(self, board):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+
+                def write(message):
+                    self.wfile.write(message)
+                    self.wfile.flush()
+                    server._count(len(message))
+                try:
+                    board.stream(write)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="回答が変わったときだけ差分を配信するライブ更新サーバ")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    args = parser.parse_args()
+
+    try:
+        rounds = load_rounds()
+    except ValueError as e:
+        sys.exit(f"⚠️ {e}")
+    server = LiveServer(rounds, host=args.host, port=args.port)
+    print(f"📡 {server.base_url}/ でライブ更新ページを配信します（Ctrl+C で終了）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""処理段階ごとの所要時間の計測
+
+シートの取得・集計・ピボット・HTML テーブル・グラフなど、段階ごとの所要時間を
+プロセス全体で集め、直近 METRICS_WINDOW 回分の p50 / p95 を出す。
+どこで詰まっているかを、画面の隠しパネル（?admin=...）や /metrics（Prometheus の
+テキスト形式）で確認できる。計測結果の一部は構造化ログ（JSON 1 行）にも出す。
+ログは dashboard パッケージのロガーから標準エラーに出る（レベルは DASHBOARD_LOG_LEVEL、既定 INFO）。
+
+    with timed("pivot"):
+        df_pivot = build_color_pivot(df, cfg.choices)
+
+    @timed("fetch")
+    def fetch(): ...
+"""
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import ContextDecorator
+
+import pandas as pd
+
+METRICS_WINDOW = int(os.environ.get("METRICS_WINDOW", "500"))
+# 計測 1 回ごとにログへ出す確率（0 なら出さない、1 なら毎回）
+METRICS_LOG_SAMPLE = float(os.environ.get("METRICS_LOG_SAMPLE", "0.01"))
+QUANTILES = (0.5, 0.95)
+# dashboard.* のログを出すレベル（WARNING にすると計測のログは出ない）
+DASHBOARD_LOG_LEVEL = os.environ.get("DASHBOARD_LOG_LEVEL", "INFO").upper()
+
+logger = logging.getLogger(__name__)
+
+
+def configure_logging(level=DASHBOARD_LOG_LEVEL):
+    """dashboard パッケージのロガーに標準エラーへのハンドラを付ける（付いていれば level だけ変える）
+
+    Streamlit もライブ更新サーバもルートロガーを設定しないので、何もしないと INFO のログは捨てられる
+    """
+    package_logger = logging.getLogger(__name__.rpartition(".")[0])
+    package_logger.setLevel(level)
+    if not package_logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+        package_logger.addHandler(handler)
+        # ルートロガーにもハンドラがあると 2 回出るので上には流さない
+        package_logger.propagate = False
+
+
+configure_logging()
+
+
+def log_event(event, sample=METRICS_LOG_SAMPLE, **fields):
+    """sample の確率で、event と fields を JSON 1 行のログにする"""
+    if sample >= 1 or (sample > 0 and random.random() < sample):
+        logger.info(json.dumps({"event": event, **fields}, ensure_ascii=False, default=str))
+
+
+def quantile(values, q):
+    """values の q 分位点（最近傍。空なら 0）"""
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+class StageStats:
+    """1 段階分の計測（累計と、直近 window 回分の所要時間）"""
+
+    def __init__(self, window=METRICS_WINDOW):
+        self.count = 0
+        self.total = 0.0
+        self.recent = deque(maxlen=window)
+
+
+class _Timer(ContextDecorator):
+    def __init__(self, metrics, stage, fields):
+        self.metrics = metrics
+        self.stage = stage
+        self.fields = fields
+
+    def _recreate_cm(self):
+        # デコレータとして使うときは呼び出しごとに別の計測にする（スレッドから同時に呼ばれてもよいように）
+        return _Timer(self.metrics, self.stage, self.fields)
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self._start
+        self.metrics.observe(self.stage, seconds)
+        log_event("stage", stage=self.stage, ms=round(seconds * 1e3, 3), error=exc_type is not None, **self.fields)
+        return False
+
+
+class Metrics:
+    """段階名 -> StageStats（スレッドから同時に記録してよい）"""
+
+    def __init__(self, window=METRICS_WINDOW):
+        self.window = window
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            stats = self._stages.get(stage)
+            if stats is None:
+                stats = self._stages[stage] = StageStats(self.window)
+            stats.count += 1
+            stats.total += seconds
+            stats.recent.append(seconds)
+
+    def timed(self, stage, **fields):
+        """with 文でもデコレータでも使える計測（fields はサンプルしたログにだけ載る）"""
+        return _Timer(self, stage, fields)
+
+    def _copy(self):
+        with self._lock:
+            return {stage: (stats.count, stats.total, list(stats.recent)) for stage, stats in self._stages.items()}
+
+    def summary(self):
+        """段階ごとの回数・p50・p95・最大・直近（ミリ秒）の表"""
+        rows = []
+        for stage, (count, total, recent) in sorted(self._copy().items()):
+            rows.append({
+                "段階": stage,
+                "回数": count,
+                "p50[ms]": round(quantile(recent, 0.5) * 1e3, 2),
+                "p95[ms]": round(quantile(recent, 0.95) * 1e3, 2),
+                "最大[ms]": round(max(recent, default=0.0) * 1e3, 2),
+                "直近[ms]": round((recent[-1] if recent else 0.0) * 1e3, 2),
+            })
+        return pd.DataFrame(rows, columns=["段階", "回数", "p50[ms]", "p95[ms]", "最大[ms]", "直近[ms]"])
+
+    def prometheus_text(self):
+        """Prometheus のテキスト形式（summary 型。分位点は直近 window 回分から計算）"""
+        lines = [
+            "# HELP dashboard_stage_seconds Time spent in each dashboard stage.",
+            "# TYPE dashboard_stage_seconds summary",
+        ]
+        for stage, (count, total, recent) in sorted(self._copy().items()):
+            label = stage.replace("\\", "\\\\").replace('"', '\\"')
+            for q in QUANTILES:
+                lines.append(f'dashboard_stage_seconds{{stage="{label}",quantile="{q}"}} {quantile(recent, q):.6f}')
+            lines.append(f'dashboard_stage_seconds_sum{{stage="{label}"}} {total:.6f}')
+            lines.append(f'dashboard_stage_seconds_count{{stage="{label}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+
+
+_metrics = Metrics()
+
+
+def get_metrics():
+    """プロセスで 1 つの計測"""
+    return _metrics
+
+
+def timed(stage, **fields):
+    """get_metrics().timed(stage) の省略形"""
+    return _metrics.timed(stage, **fields)
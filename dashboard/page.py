@@ -0,0 +1,204 @@
+"""1 ラウンド分のダッシュボード画面（全ラウンド共通）
+
+取得・集計・描画の処理とキャッシュは全ラウンドで共有し、ラウンドごとの
+違い（タイトル・選択肢・シート）は RoundConfig で受け取る。
+"""
+import os
+import re
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+from dashboard.aggregate import count_votes
+from dashboard.answers import answers_digest, dummy_answers
+from dashboard.assets import streamlit_header_image
+from dashboard.charts import chart_specs, faceted_chart_spec
+from dashboard.metrics import get_metrics, log_event, timed
+from dashboard.pivot import build_color_pivot
+from dashboard.poller import get_poller, round_source
+from dashboard.table_html import df_to_colored_html_with_colgroup
+
+# -----------------------
+# 設定（調整ポイント）
+# -----------------------
+COMPONENT_HEIGHT = 1000
+ROW_HEIGHT_PX = 18
+FONT_SIZE_PX = 12
+CELL_PADDING_V = 4
+CELL_PADDING_H = 2
+COLUMN_WIDTH_PX = 140
+FIRST_COL_WIDTH_PX = 100
+# -----------------------
+
+# ?admin=<この値> を付けて開くと計測パネルを表示する（設定していなければパネルは出さない）
+DASHBOARD_ADMIN_KEY = os.environ.get("DASHBOARD_ADMIN_KEY")
+
+# 🎨 共通 CSS
+PAGE_CSS = f"""
+<style>
+body {{ background: #f0faff; }}
+.header-title {{ font-size:36px; font-weight:900; text-align:center; color:#1e88e5; margin:10px 0 4px 0; font-family:"Trebuchet MS",sans-serif; text-shadow:1px 2px #b3e5fc; }}
+.sub-text {{ text-align:center; font-size:18px; margin-bottom:12px; color:#555; }}
+.drink-card {{ border-radius:12px; background:#ffffffcc; backdrop-filter: blur(6px); padding:12px; margin-top:14px; box-shadow:0 4px 10px rgba(130,200,255,0.25); }}
+.compact-table {{
+  border-collapse: collapse;
+  width:100%;
+  table-layout: fixed;
+  font-size:{FONT_SIZE_PX}px;
+  font-family: "Helvetica Neue", Arial, sans-serif;
+  border: 1px solid rgba(0,0,0,0.06);
+}}
+.compact-table th {{
+  position: sticky;
+  top:0;
+  background: rgba(255,255,255,0.95);
+  z-index:2;
+  font-weight:700;
+  padding:{CELL_PADDING_V}px {CELL_PADDING_H}px;
+  white-space: nowrap;
+  overflow:hidden;
+  text-overflow:ellipsis;
+  border-bottom:1px solid rgba(0,0,0,0.06);
+}}
+.compact-table tr {{ height: {ROW_HEIGHT_PX}px; }}
+.compact-table td {{
+  padding:{CELL_PADDING_V}px {CELL_PADDING_H}px;
+  overflow:hidden;
+  text-overflow:ellipsis;
+  white-space: nowrap;
+  vertical-align:middle;
+  border-bottom:1px solid rgba(0,0,0,0.03);
+}}
+.compact-table tbody tr:hover {{ background: rgba(224,247,250,0.6); }}
+</style>
+"""
+# 再実行のたびに送るので、空白を詰めたものを 1 回だけ作っておく
+PAGE_CSS = re.sub(r"\s*([{};:,])\s*", r"\1", re.sub(r"\s+", " ", PAGE_CSS)).strip()
+
+
+# 🔄 回答が変わったときだけページ全体を再描画
+@st.fragment(run_every=1)
+def watch_answers(poller, version):
+    if poller.version != version:
+        st.rerun()
+
+
+def render_compact_table(df, bg_map, component_height=COMPONENT_HEIGHT):
+    with timed("table_html"):
+        html_table = df_to_colored_html_with_colgroup(df, bg_map, FIRST_COL_WIDTH_PX, COLUMN_WIDTH_PX, ROW_HEIGHT_PX)
+    wrapper = f"<div class='compact-wrapper'>{html_table}</div>"
+    components.html(wrapper, height=component_height, scrolling=False)
+
+
+def render_admin_panel():
+    """段階ごとの所要時間（隠しパネル）"""
+    metrics = get_metrics()
+    with st.expander("⏱ 処理時間（直近の p50 / p95）", expanded=True):
+        st.dataframe(metrics.summary(), hide_index=True)
+        st.code(metrics.prometheus_text(), language="text")
+
+
+def render_round(cfg):
+    """ラウンド 1 つ分の画面を描画する"""
+    with timed("render", round=cfg.key):
+        _render_round(cfg)
+    if DASHBOARD_ADMIN_KEY and st.query_params.get("admin") == DASHBOARD_ADMIN_KEY:
+        render_admin_panel()
+
+
+def _render_round(cfg):
+    st.markdown(PAGE_CSS, unsafe_allow_html=True)
+
+    # ヘッダー画像（任意）。st.image が作り直さずに済む大きさ・形式のものを 1 回だけ作って使い回す
+    with timed("header"):
+        header = streamlit_header_image()
+        if header is not None:
+            st.image(header.body, width="stretch")
+
+    # タイトル
+    st.markdown(f"<h1 class='header-title'>{cfg.title}</h1>", unsafe_allow_html=True)
+    st.markdown(f"<p class='sub-text'>{cfg.subtitle}</p>", unsafe_allow_html=True)
+
+    # -----------------------
+    # データ読み込み
+    # -----------------------
+    # シートの取得・整形はサーバ全体で 1 本のポーラーが行い、各セッションは共有スナップショットを読むだけ
+    poller = get_poller(cfg.poller_key, round_source(cfg))
+    snapshot = poller.snapshot()
+    if snapshot is not None:
+        version = snapshot.version
+        if poller.last_error is not None:
+            st.warning(f"Google Sheetsの更新に失敗したため、前回取得したデータを表示しています: {poller.last_error}")
+        df = snapshot.df
+        data_digest = snapshot.digest
+        vote_counts = snapshot.count_table(cfg.choices)
+    else:
+        # 一度も読み込めていない場合はダミーデータ
+        st.warning(f"Google Sheetsからの読み込みに失敗しました: {poller.last_error}")
+        version = 0
+        df = dummy_answers(cfg.choices)
+        data_digest = answers_digest(df)
+        vote_counts = count_votes(df, cfg.choices)
+
+    # 表示しているスナップショットの版を渡す（読み直すとその間に出た更新を見逃す）
+    watch_answers(poller, version)
+
+    log_event("rerun", round=cfg.key, version=version, rows=len(df), stale=poller.last_error is not None)
+
+    # Pivotテーブル（選択肢別・色表示）
+    with timed("pivot"):
+        df_pivot = build_color_pivot(df, cfg.choices)
+
+    # -----------------------
+    # レイアウト
+    # -----------------------
+    col1, col2 = st.columns([1.2, 2.3])
+
+    with col1:
+        st.markdown("<div class='drink-card'>", unsafe_allow_html=True)
+        st.write("🧾 集計結果")
+        render_compact_table(df_pivot, cfg.bg_map)
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    with col2:
+        st.markdown("<div class='drink-card'>", unsafe_allow_html=True)
+        st.write(cfg.result_label)
+
+        # グラフ用の集計と Vega-Lite spec は回答が変わったときだけ作り直す
+        with timed("charts"):
+            if cfg.faceted_chart:
+                st.vega_lite_chart(faceted_chart_spec(data_digest, vote_counts, cfg.choices, cfg.bg_map),
+                                   use_container_width=True)
+            else:
+                specs = chart_specs(data_digest, vote_counts, cfg.choices, cfg.bg_map)
+                sub1, sub2 = st.columns(2)
+                with sub1:
+                    for choice in cfg.choices[0::2]:
+                        st.vega_lite_chart(specs[choice], use_container_width=True)
+                with sub2:
+                    for choice in cfg.choices[1::2]:
+                        st.vega_lite_chart(specs[choice], use_container_width=True)
+
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    # -----------------------
+    # フッター
+    # -----------------------
+    st.success("🌟 新しい回答が届くと自動でページを更新します 🌟")
+    st.markdown(f"<p style='text-align:center;color:#888;font-size:12px;'>{cfg.footer}</p>", unsafe_allow_html=True)
+
+
+def _round_page(cfg):
+    def page():
+        render_round(cfg)
+    page.__name__ = f"round_{cfg.key}"
+    return page
+
+
+def run_rounds(rounds):
+    """全ラウンドを 1 つの Streamlit サーバでページとして切り替えられるようにする"""
+    pages = [
+        st.Page(_round_page(cfg), title=cfg.name, url_path=cfg.key, default=(i == 0))
+        for i, cfg in enumerate(rounds.values())
+    ]
+    st.navigation(pages).run()
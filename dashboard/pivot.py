@@ -0,0 +1,27 @@
+"""ドリンク（お茶）ごとに、その回答が付いた色を並べた Pivot テーブル"""
+import numpy as np
+import pandas as pd
+
+from dashboard.answers import COLORS
+
+
+def build_color_pivot(df, choices, colors=COLORS):
+    """回答表から「回答者 + 選択肢ごとの一致色（'ピンク・レッド' など）」の表を作る
+
+    色ごとの一致を N×色数 の真偽行列で求め、一致パターンをビット列として
+    2**色数 通りの表示文字列に引き当てるので、行数に対してループしない。
+    """
+    colors = list(colors)
+    values = df[colors].to_numpy()
+    # 一致パターン（ビット列）→ '・' 区切りの色名
+    weights = 1 << np.arange(len(colors))
+    labels = np.array([
+        '・'.join(color for bit, color in enumerate(colors) if code >> bit & 1)
+        for code in range(1 << len(colors))
+    ], dtype=object)
+
+    pivot = {'回答者': df['回答者'].to_numpy()}
+    for choice in choices:
+        codes = (values == choice) @ weights
+        pivot[choice] = labels[codes]
+    return pd.DataFrame(pivot)
@@ -0,0 +1,224 @@
+"""サーバプロセスに 1 本だけ立てる回答シートの取り込みスレッド
+
+各セッションがシートを取得・整形するのではなく、バックグラウンドの
+ポーラーが自分のスケジュールでシートを読み、前回と回答が変わったときだけ
+新しいスナップショットを公開する。セッションは共有スナップショットを
+読むだけなので、視聴者が N 人いても取得 1 回・整形 1 回で済む。
+集計は VoteAggregator が追記された行だけを差分反映する。
+
+    poller = get_poller(f"sheet:{SHEET_ID}:{GID}", sheet_source(SHEET_ID, GID))
+    snapshot = poller.snapshot()      # 共有スナップショット（書き換えないこと）
+    poller.version                    # 回答が変わるたびに 1 増える
+"""
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import MappingProxyType
+
+import pandas as pd
+
+from dashboard.aggregate import VoteAggregator
+from dashboard.answers import COLORS, answers_digest
+from dashboard.metrics import timed
+from dashboard.sheet_cache import get_sheet_cache
+from dashboard.store import RESPONSE_STORE, SheetCollector, get_store, store_source
+
+SHEET_POLL_INTERVAL = float(os.environ.get("SHEET_POLL_INTERVAL", "2"))
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class AnswerSnapshot:
+    """整形済みの回答表（全セッションで共有するので書き換えないこと）"""
+    version: int
+    df: pd.DataFrame
+    digest: str
+    updated_at: float
+    # 前回のスナップショットから回答が変わった班
+    changed: tuple = ()
+    # (選択肢, 色) -> 票数
+    counts: MappingProxyType = field(default_factory=lambda: MappingProxyType({}))
+
+    def count_table(self, choices, colors=COLORS):
+        """選択肢×色の票数表"""
+        return pd.DataFrame(
+            [[self.counts.get((choice, color), 0) for color in colors] for choice in choices],
+            index=list(choices), columns=colors,
+        )
+
+
+def sheet_source(sheet_id, gid, cache=None):
+    """Google Sheets（または SHEET_BASE_URL のスタンドイン）から読むソース"""
+    def fetch():
+        snapshot = (cache or get_sheet_cache()).get(sheet_id, gid)
+        if snapshot.error is not None:
+            # 古いスナップショットは採用せず、ポーラー側で前回の回答表を使い続ける
+            raise snapshot.error
+        return snapshot.df
+    return fetch
+
+
+def csv_source(path):
+    """ローカルの CSV を読むソース（更新時刻が変わったときだけ読み直す）"""
+    path = Path(path)
+    state = {"mtime": None, "df": None}
+
+    def fetch():
+        mtime = path.stat().st_mtime_ns
+        if mtime != state["mtime"]:
+            state["df"] = pd.read_csv(path)
+            state["mtime"] = mtime
+        return state["df"]
+    return fetch
+
+
+def round_source(cfg):
+    """ラウンドの回答ソース（RESPONSE_STORE が指定されていればローカルストア経由）"""
+    if cfg.source == "local":
+        # 回答受付サーバ（dashboard.submit_server）がストアに直接書き込むラウンド
+        if not RESPONSE_STORE:
+            raise ValueError(f"source=local のラウンド {cfg.key} には RESPONSE_STORE の指定が必要です")
+        return store_source(get_store(RESPONSE_STORE), cfg.key)
+    if RESPONSE_STORE:
+        store = get_store(RESPONSE_STORE)
+        collector = SheetCollector(store, cfg.key, cfg.sheet_id, cfg.gid)
+        return store_source(store, cfg.key, collector)
+    return sheet_source(cfg.sheet_id, cfg.gid)
+
+
+class SheetPoller(threading.Thread):
+    """ソースを定期的に読み、回答が変わったときだけスナップショットを差し替える"""
+
+    def __init__(self, fetch, interval=SHEET_POLL_INTERVAL, name="sheet-poller"):
+        super().__init__(name=name, daemon=True)
+        self.fetch = fetch
+        self.interval = interval
+        self.last_error = None
+        self.aggregator = VoteAggregator()
+        self._snapshot = None
+        self._last_raw = None
+        self._changed = threading.Condition()
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+
+    @property
+    def version(self):
+        snapshot = self._snapshot
+        return snapshot.version if snapshot is not None else 0
+
+    def snapshot(self):
+        """最新のスナップショット（まだ一度も読めていなければ None）"""
+        return self._snapshot
+
+    def wait_for_change(self, version, timeout=None):
+        """version より新しいスナップショットが出るまで待って返す"""
+        with self._changed:
+            self._changed.wait_for(lambda: self.version > version, timeout)
+        return self._snapshot
+
+    def poll_once(self):
+        """1 回だけ読みに行き、回答が変わっていれば公開する（公開したら True）
+
+        取得・集計のどこで失敗しても例外は外に出さず、last_error に残して前回の回答を出し続ける
+        """
+        try:
+            with timed("fetch"):
+                raw = self.fetch()
+        except Exception as e:
+            # 取得の失敗（503 など）では集計済みの状態はそのまま使える
+            self.last_error = e
+            logger.warning("回答シートの取得に失敗しました: %s", e)
+            return False
+        # キャッシュが同じ DataFrame を返したときは整形もしない
+        if raw is self._last_raw:
+            self.last_error = None
+            return False
+
+        try:
+            snapshot = self._aggregate(raw)
+        except Exception as e:
+            self.last_error = e
+            # 集計の途中で失敗したかもしれないので、次は最初から集計し直す
+            self.aggregator = VoteAggregator()
+            self._last_raw = None
+            logger.warning("回答の集計に失敗しました: %s", e)
+            return False
+        self.last_error = None
+        if snapshot is None:
+            return False
+        with self._changed:
+            self._snapshot = snapshot
+            self._changed.notify_all()
+        logger.info("回答を更新しました (version=%d, 変更: %s)", snapshot.version, "・".join(snapshot.changed))
+        return True
+
+    def _aggregate(self, raw):
+        """集計して、回答が変わっていれば新しいスナップショットを返す（変わらなければ None）"""
+        with timed("aggregate"):
+            changed = self.aggregator.sync(raw)
+            self._last_raw = raw
+            previous = self._snapshot
+            if previous is not None and not changed:
+                return None
+
+            df = self.aggregator.answers_frame()
+            digest = answers_digest(df)
+            # 集計し直した直後などで、公開済みの回答と中身が同じなら版を上げない
+            if previous is not None and previous.digest == digest:
+                return None
+            return AnswerSnapshot(
+                version=self.version + 1,
+                df=df,
+                digest=digest,
+                updated_at=time.time(),
+                # 同じ班が何行も回答し直していても 1 回だけ（順番はそのまま）
+                changed=tuple(dict.fromkeys(changed)),
+                counts=MappingProxyType(dict(self.aggregator.counts)),
+            )
+
+    def run(self):
+        while not self._stop_event.is_set():
+            # 読みに行く直前に下ろす（読んでいる間に来た wake() は残り、次の wait がすぐ返る）
+            self._wake_event.clear()
+            try:
+                self.poll_once()
+            except Exception:
+                # poll_once は例外を出さないはずだが、スレッドが止まると二度と更新されないので念のため
+                logger.exception("ポーラーで想定外のエラーが発生しました")
+            self._wake_event.wait(self.interval)
+
+    def wake(self):
+        """次の周期を待たずにすぐ読みに行かせる（新しい回答を受け付けたとき用）"""
+        self._wake_event.set()
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake_event.set()
+
+
+_pollers = {}
+_pollers_lock = threading.Lock()
+
+
+def get_poller(key, fetch, interval=SHEET_POLL_INTERVAL):
+    """key ごとにプロセスで 1 つだけのポーラーを返す（初回は同期で 1 回読んでから起動）"""
+    with _pollers_lock:
+        poller = _pollers.get(key)
+        if poller is None:
+            poller = SheetPoller(fetch, interval=interval, name=f"sheet-poller[{key}]")
+            poller.poll_once()
+            poller.start()
+            _pollers[key] = poller
+        return poller
+
+
+def wake_poller(key):
+    """key のポーラーがこのプロセスにあれば、すぐ読みに行かせる"""
+    with _pollers_lock:
+        poller = _pollers.get(key)
+    if poller is not None:
+        poller.wake()
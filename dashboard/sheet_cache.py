@@ -0,0 +1,212 @@
+"""Google Sheets の CSV 取得をプロセス全体で共有するキャッシュ
+
+全セッションの自動リフレッシュがそれぞれ ``pd.read_csv(SHEET_URL)`` を
+実行すると、シートへのアクセスが視聴者数に比例して増えてしまう。
+ここでは SHEET_ID/GID ごとに 1 つのスナップショットを保持し、
+
+- TTL 内はダウンロードせずにキャッシュを返す
+- 同時に来たリクエストは 1 回の取得にまとめる
+- ETag / Last-Modified による条件付き取得と、内容が同じなら再パースしない
+- 取得に失敗したときは前回成功したスナップショットを返す
+
+ようにしている。
+"""
+import hashlib
+import io
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from dataclasses import dataclass, replace
+
+import pandas as pd
+
+# ローカルの HTTP スタンドイン（dashboard/fake_sheet.py）に向けるときは
+# SHEET_BASE_URL=http://127.0.0.1:8765 のように指定する
+SHEET_BASE_URL = os.environ.get("SHEET_BASE_URL", "https://docs.google.com")
+SHEET_CACHE_TTL = float(os.environ.get("SHEET_CACHE_TTL", "3"))
+SHEET_FETCH_TIMEOUT = float(os.environ.get("SHEET_FETCH_TIMEOUT", "10"))
+
+
+class SheetFetchError(RuntimeError):
+    """シートの取得に失敗し、返せるスナップショットもない"""
+
+
+@dataclass(frozen=True)
+class SheetSnapshot:
+    """取得済みシートの内容（全セッションで共有するので書き換えないこと）"""
+    df: pd.DataFrame
+    digest: str
+    fetched_at: float
+    # 最新の取得に失敗して古いスナップショットを返している場合はその例外
+    error: Exception = None
+
+
+class _Entry:
+    def __init__(self):
+        self.snapshot = None
+        self.expires_at = 0.0
+        self.etag = None
+        self.last_modified = None
+        self.inflight = None
+        self.last_error = None
+
+
+def sheet_csv_url(sheet_id, gid, base_url=None, rows=None):
+    """CSV エクスポート用の URL を作る（rows=(開始行, 終了行) で行範囲を指定）"""
+    base = (base_url or SHEET_BASE_URL).rstrip("/")
+    url = f"{base}/spreadsheets/d/{sheet_id}/export?format=csv&gid={gid}"
+    if rows is not None:
+        url += f"&range={rows[0]}:{rows[1]}"
+    return url
+
+
+class SheetCache:
+    """SHEET_ID/GID ごとに CSV スナップショットを保持するキャッシュ"""
+
+    def __init__(self, ttl=SHEET_CACHE_TTL, timeout=SHEET_FETCH_TIMEOUT, base_url=None):
+        self.ttl = ttl
+        self.timeout = timeout
+        self.base_url = base_url
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "fetches": 0,
+            "not_modified": 0,
+            "unchanged": 0,
+            "errors": 0,
+            "stale_served": 0,
+            "fetch_seconds_total": 0.0,
+            "fetch_seconds_last": 0.0,
+            "fetch_seconds_max": 0.0,
+        }
+
+    def get(self, sheet_id, gid):
+        """シートのスナップショットを返す（必要なときだけ取得する）"""
+        key = (sheet_id, str(gid))
+        with self._lock:
+            entry = self._entries.setdefault(key, _Entry())
+            if entry.snapshot is not None and time.monotonic() < entry.expires_at:
+                self._stats["hits"] += 1
+                return self._current(entry)
+            if entry.inflight is not None:
+                # 他のセッションが取得中なのでその結果を待つ
+                self._stats["coalesced"] += 1
+                event = entry.inflight
+                leader = False
+            else:
+                self._stats["misses"] += 1
+                event = entry.inflight = threading.Event()
+                leader = True
+
+        if leader:
+            try:
+                self._refresh(key, entry)
+            finally:
+                with self._lock:
+                    entry.inflight = None
+                event.set()
+        else:
+            event.wait(self.timeout)
+
+        with self._lock:
+            if entry.snapshot is None:
+                raise SheetFetchError(f"シートを取得できませんでした: {entry.last_error}")
+            return self._current(entry)
+
+    def invalidate(self, sheet_id=None, gid=None):
+        """キャッシュの有効期限を切る（引数なしなら全シート）"""
+        with self._lock:
+            for (sid, g), entry in self._entries.items():
+                if sheet_id is None or (sid == sheet_id and (gid is None or g == str(gid))):
+                    entry.expires_at = 0.0
+
+    def stats(self):
+        """ヒット/ミス数と取得レイテンシの集計を返す"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["fetch_seconds_avg"] = (
+            stats["fetch_seconds_total"] / stats["fetches"] if stats["fetches"] else 0.0
+        )
+        return stats
+
+    def _current(self, entry):
+        if entry.last_error is None:
+            return entry.snapshot
+        self._stats["stale_served"] += 1
+        return replace(entry.snapshot, error=entry.last_error)
+
+    def _refresh(self, key, entry):
+        url = sheet_csv_url(*key, base_url=self.base_url)
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+
+        start = time.perf_counter()
+        body = None
+        error = None
+        try:
+            request = urllib.request.Request(url, headers=headers)
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                body = response.read()
+                etag = response.headers.get("ETag")
+                last_modified = response.headers.get("Last-Modified")
+        except urllib.error.HTTPError as e:
+            if e.code != 304:
+                error = e
+        except Exception as e:
+            error = e
+        elapsed = time.perf_counter() - start
+
+        # パースは内容が変わったときだけ行う
+        snapshot = None
+        if body is not None:
+            digest = hashlib.sha1(body).hexdigest()
+            if entry.snapshot is None or entry.snapshot.digest != digest:
+                try:
+                    df = pd.read_csv(io.BytesIO(body))
+                    snapshot = SheetSnapshot(df=df, digest=digest, fetched_at=time.time())
+                except Exception as e:
+                    error = e
+
+        with self._lock:
+            self._stats["fetches"] += 1
+            self._stats["fetch_seconds_total"] += elapsed
+            self._stats["fetch_seconds_last"] = elapsed
+            self._stats["fetch_seconds_max"] = max(self._stats["fetch_seconds_max"], elapsed)
+            # 失敗時も TTL の間は再取得しない（障害中にシートを叩き続けないため）
+            entry.expires_at = time.monotonic() + self.ttl
+            if error is not None:
+                self._stats["errors"] += 1
+                entry.last_error = error
+                return
+            entry.last_error = None
+            if body is None:
+                self._stats["not_modified"] += 1
+                return
+            entry.etag = etag
+            entry.last_modified = last_modified
+            if snapshot is None:
+                self._stats["unchanged"] += 1
+                entry.snapshot = replace(entry.snapshot, fetched_at=time.time())
+            else:
+                entry.snapshot = snapshot
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_sheet_cache():
+    """プロセス全体で共有するキャッシュを返す"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = SheetCache()
+        return _default_cache
@@ -0,0 +1,221 @@
+"""フォーム回答をローカルに追記保存するストア（SQLite / WAL モード）
+
+毎回シート全体をダウンロードし直す代わりに、コレクターが「前回保存した
+行（ウォーターマーク）より後ろ」だけをシートから取ってきて追記する。
+班ごとの最新回答は別テーブルで保持しているので、ダッシュボードは
+班の数だけの行を読めばよい。ネットワークが切れても保存済みの行は残るので、
+復旧後は続きの行から取り直すだけで済み、イベント後の分析には全履歴が残る。
+
+    RESPONSE_STORE=data/responses.sqlite3 uv run streamlit run app.py
+    uv run python -m dashboard.store data/responses.sqlite3 sport --csv sport_history.csv
+"""
+import argparse
+import csv
+import io
+import logging
+import os
+import sqlite3
+import threading
+import urllib.request
+
+import pandas as pd
+
+from dashboard.answers import COLORS
+from dashboard.sheet_cache import SHEET_FETCH_TIMEOUT, sheet_csv_url
+
+RESPONSE_STORE = os.environ.get("RESPONSE_STORE")
+COLLECT_BATCH_ROWS = 500
+
+logger = logging.getLogger(__name__)
+
+_ANSWER_COLUMNS = [f"answer_{i}" for i in range(len(COLORS))]
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS responses (
+    round_key TEXT NOT NULL,
+    row_no INTEGER NOT NULL,
+    submitted_at TEXT,
+    ban TEXT NOT NULL,
+    {", ".join(f"{column} TEXT" for column in _ANSWER_COLUMNS)},
+    PRIMARY KEY (round_key, row_no)
+);
+CREATE INDEX IF NOT EXISTS responses_by_ban ON responses (round_key, ban, row_no);
+CREATE INDEX IF NOT EXISTS responses_by_time ON responses (round_key, submitted_at);
+CREATE TABLE IF NOT EXISTS latest (
+    round_key TEXT NOT NULL,
+    ban TEXT NOT NULL,
+    row_no INTEGER NOT NULL,
+    submitted_at TEXT,
+    {", ".join(f"{column} TEXT" for column in _ANSWER_COLUMNS)},
+    PRIMARY KEY (round_key, ban)
+);
+"""
+
+
+class ResponseStore:
+    """ラウンドごとの回答履歴と、班ごとの最新回答"""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def watermark(self, round_key):
+        """保存済みの最後の行番号（まだ何もなければ 0）"""
+        with self._lock:
+            (row_no,) = self._conn.execute(
+                "SELECT COALESCE(MAX(row_no), 0) FROM responses WHERE round_key = ?", (round_key,)
+            ).fetchone()
+        return row_no
+
+    def append(self, round_key, rows):
+        """(行番号, 送信時刻, 班, 4色の回答...) の行を追記する（保存済みの行番号は無視）
+
+        班が空欄の行は履歴にだけ残し、班ごとの最新回答には入れない
+        """
+        with self._lock, self._conn:
+            return self._insert(round_key, rows)
+
+    def append_submissions(self, round_key, submissions):
+        """ローカルで受け付けた (送信時刻, 班, 4色の回答...) に行番号を振って 1 トランザクションで追記する"""
+        with self._lock, self._conn:
+            (last,) = self._conn.execute(
+                "SELECT COALESCE(MAX(row_no), 1) FROM responses WHERE round_key = ?", (round_key,)
+            ).fetchone()
+            rows = [(last + 1 + i, *submission) for i, submission in enumerate(submissions)]
+            self._insert(round_key, rows)
+        return [row[0] for row in rows]
+
+    def _insert(self, round_key, rows):
+        columns = ", ".join(_ANSWER_COLUMNS)
+        placeholders = ", ".join("?" * (4 + len(_ANSWER_COLUMNS)))
+        updates = ", ".join(f"{column} = excluded.{column}" for column in _ANSWER_COLUMNS)
+        rows = [(round_key, *row) for row in rows]
+        before = self._conn.total_changes
+        self._conn.executemany(
+            f"INSERT OR IGNORE INTO responses (round_key, row_no, submitted_at, ban, {columns}) "
+            f"VALUES ({placeholders})", rows)
+        inserted = self._conn.total_changes - before
+        self._conn.executemany(
+            f"INSERT INTO latest (round_key, row_no, submitted_at, ban, {columns}) VALUES ({placeholders}) "
+            f"ON CONFLICT (round_key, ban) DO UPDATE SET row_no = excluded.row_no, "
+            f"submitted_at = excluded.submitted_at, {updates} WHERE excluded.row_no > latest.row_no",
+            [row for row in rows if row[3] != ""])
+        return inserted
+
+    def latest_raw(self, round_key):
+        """班ごとの最新回答を、回答シートと同じ列名・送信順で返す"""
+        return self._query(f"SELECT submitted_at, ban, {', '.join(_ANSWER_COLUMNS)} FROM latest "
+                           "WHERE round_key = ? ORDER BY row_no", round_key)
+
+    def history(self, round_key):
+        """全回答の履歴（送信順）"""
+        return self._query(f"SELECT submitted_at, ban, {', '.join(_ANSWER_COLUMNS)} FROM responses "
+                           "WHERE round_key = ? ORDER BY row_no", round_key)
+
+    def _query(self, sql, round_key):
+        with self._lock:
+            rows = self._conn.execute(sql, (round_key,)).fetchall()
+        return pd.DataFrame(rows, columns=["タイムスタンプ", "班"] + [f"回答 [{color}]" for color in COLORS])
+
+
+class SheetCollector:
+    """シートのウォーターマークより後ろの行だけを取得してストアに追記する"""
+
+    def __init__(self, store, round_key, sheet_id, gid, batch_rows=COLLECT_BATCH_ROWS,
+                 timeout=SHEET_FETCH_TIMEOUT, base_url=None):
+        self.store = store
+        self.round_key = round_key
+        self.sheet_id = sheet_id
+        self.gid = gid
+        self.batch_rows = batch_rows
+        self.timeout = timeout
+        self.base_url = base_url
+        self._positions = None
+
+    def _fetch_rows(self, start, end):
+        url = sheet_csv_url(self.sheet_id, self.gid, base_url=self.base_url, rows=(start, end))
+        with urllib.request.urlopen(url, timeout=self.timeout) as response:
+            text = response.read().decode("utf-8-sig")
+        return list(csv.reader(io.StringIO(text)))
+
+    def collect_once(self):
+        """新しい行を取り込み、追記した行数を返す"""
+        if self._positions is None:
+            header = self._fetch_rows(1, 1)[0]
+            names = ["タイムスタンプ", "班"] + [f"回答 [{color}]" for color in COLORS]
+            self._positions = [header.index(name) for name in names]
+
+        total = 0
+        while True:
+            # シートの 1 行目はヘッダーなので、回答は 2 行目から
+            start = max(self.store.watermark(self.round_key), 1) + 1
+            lines = self._fetch_rows(start, start + self.batch_rows - 1)
+            rows = []
+            for offset, line in enumerate(lines):
+                values = [line[i] if i < len(line) else "" for i in self._positions]
+                if not any(values):
+                    # 範囲末尾の空行（まだ回答がない行）
+                    break
+                if values[1] == "":
+                    # 班が空欄の回答も履歴には残し、ウォーターマークを進める（ここで止まると後ろの行を取り込めない）
+                    logger.warning("班が空欄の回答があります（%s の %d 行目）", self.round_key, start + offset)
+                rows.append((start + offset, *values))
+            if not rows:
+                return total
+            total += self.store.append(self.round_key, rows)
+            if len(rows) < self.batch_rows:
+                return total
+
+
+def store_source(store, round_key, collector=None):
+    """ストアの最新回答を読むポーラー用ソース（collector があれば先に新しい行を取り込む）"""
+    state = {"watermark": None, "df": None}
+
+    def fetch():
+        if collector is not None:
+            collector.collect_once()
+        watermark = store.watermark(round_key)
+        if watermark != state["watermark"]:
+            state["df"] = store.latest_raw(round_key)
+            state["watermark"] = watermark
+        return state["df"]
+    return fetch
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(path=RESPONSE_STORE):
+    """パスごとにプロセスで 1 つだけのストアを返す"""
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = ResponseStore(path)
+        return _stores[path]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="保存済みの回答履歴を書き出す")
+    parser.add_argument("path", help="ストアの SQLite ファイル")
+    parser.add_argument("round_key")
+    parser.add_argument("--csv", help="書き出し先（省略時は標準出力）")
+    args = parser.parse_args()
+
+    history = ResponseStore(args.path).history(args.round_key)
+    if args.csv:
+        history.to_csv(args.csv, index=False, encoding="utf-8-sig")
+        print(f"✅ {len(history)} 件の回答を {args.csv} に書き出しました。")
+    else:
+        print(history.to_csv(index=False), end="")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+"""Google フォームの代わりに班の回答をその場で受け付ける回答受付サーバ（asyncio）
+
+フォーム → シート → ポーリングの経路では反映まで数秒かかり、外部サービスなので
+負荷試験もできない。rounds.json で ``"source": "local"`` にしたラウンドは
+このサーバが回答を受け付け、ローカルストア（dashboard.store）に書き込んで
+同じプロセスのポーラーをすぐに起こす。
+
+    RESPONSE_STORE=data/responses.sqlite3 uv run python -m dashboard.submit_server --port 8700 --live-port 8600
+    # → 回答フォーム http://127.0.0.1:8700/sport 、ライブ画面 http://127.0.0.1:8600/sport
+
+    POST /submit/<ラウンド>  {"班": 3, "answers": {"ピンク": "ポカリ", "ブルー": "だから", ...}}
+
+全班が同じ 1 秒に送ってきても SQLite の書き込みが詰まらないよう、
+書き込み中に届いた回答はまとめて 1 トランザクションで追記する（グループコミット）。
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import threading
+from datetime import datetime
+from html import escape
+
+from dashboard.answers import COLORS
+from dashboard.config import load_rounds
+from dashboard.metrics import get_metrics, timed
+from dashboard.poller import SHEET_POLL_INTERVAL, round_source, wake_poller
+from dashboard.store import RESPONSE_STORE, get_store, store_source
+
+MAX_BODY_BYTES = 16 * 1024
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 500: "Internal Server Error"}
+
+logger = logging.getLogger(__name__)
+
+
+class SubmissionError(ValueError):
+    """回答の内容がラウンドの設定と合わない"""
+
+
+def validate_submission(cfg, payload):
+    """回答を検査して (班番号, 4色の回答) を返す"""
+    if not isinstance(payload, dict):
+        raise SubmissionError("JSON オブジェクトで送ってください")
+    ban = payload.get("班")
+    if isinstance(ban, str) and ban.strip().isdigit():
+        ban = int(ban)
+    if isinstance(ban, bool) or not isinstance(ban, int) or not 1 <= ban <= cfg.teams:
+        raise SubmissionError(f"班は 1〜{cfg.teams} の番号で指定してください")
+    answers = payload.get("answers")
+    if not isinstance(answers, dict):
+        raise SubmissionError("answers に色ごとの回答を指定してください")
+    unknown = [color for color in answers if color not in COLORS]
+    if unknown:
+        raise SubmissionError(f"知らない色です: {unknown}")
+    missing = [color for color in COLORS if color not in answers]
+    if missing:
+        raise SubmissionError(f"回答がない色があります: {missing}")
+    invalid = [answers[color] for color in COLORS if answers[color] not in cfg.choices]
+    if invalid:
+        raise SubmissionError(f"選択肢にない回答です: {invalid}")
+    return ban, tuple(answers[color] for color in COLORS)
+
+
+FORM_TEMPLATE = """<!DOCTYPE html>
+<html lang="ja"><head><meta charset="utf-8"><meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{name} 回答フォーム</title>
+<style>
+body {{ background:#f0faff; font-family:"Helvetica Neue",Arial,sans-serif; max-width:420px; margin:0 auto; padding:16px; }}
+h1 {{ font-size:24px; color:#1e88e5; text-align:center; }}
+label {{ display:block; margin:12px 0 4px 0; font-weight:bold; }}
+select, button {{ width:100%; font-size:18px; padding:8px; }}
+button {{ margin-top:20px; background:#1e88e5; color:#fff; border:none; border-radius:8px; }}
+#result {{ text-align:center; margin-top:12px; }}
+</style></head><body>
+<h1>{title}</h1>
+<form id="form">
+<label>班</label><select name="班">{teams}</select>
+{colors}
+<button type="submit">送信</button>
+</form>
+<p id="result"></p>
+<script>
+document.getElementById("form").addEventListener("submit", async e => {{
+  e.preventDefault();
+  const form = new FormData(e.target), answers = {{}};
+  {color_names}.forEach(color => answers[color] = form.get(color));
+  const response = await fetch("/submit/{key}", {{
+    method: "POST", headers: {{"Content-Type": "application/json"}},
+    body: JSON.stringify({{"班": Number(form.get("班")), answers}}),
+  }});
+  const result = await response.json();
+  document.getElementById("result").textContent = response.ok ? "✅ 送信しました" : "⚠️ " + result.error;
+}});
+</script></body></html>
+"""
+
+
+def render_form(cfg):
+    options = "".join(f"<option>{escape(choice)}</option>" for choice in cfg.choices)
+    colors = "".join(
+        f"<label>{escape(color)}</label><select name=\"{escape(color)}\">{options}</select>" for color in COLORS
+    )
+    teams = "".join(f"<option value='{i}'>{i}班</option>" for i in range(1, cfg.teams + 1))
+    return FORM_TEMPLATE.format(
+        key=escape(cfg.key), name=escape(cfg.name), title=escape(cfg.title), teams=teams, colors=colors,
+        color_names=json.dumps(COLORS, ensure_ascii=False),
+    ).encode("utf-8")
+
+
+class SubmitServer:
+    """source=local のラウンドの回答を受け付けてストアに書き込む HTTP サーバ"""
+
+    def __init__(self, rounds, store, host="127.0.0.1", port=8700):
+        self.rounds = {key: cfg for key, cfg in rounds.items() if cfg.source == "local"}
+        if not self.rounds:
+            raise ValueError('回答を受け付けるラウンドがありません（rounds.json で "source": "local" を指定）')
+        self.store = store
+        self.host = host
+        self.port = port
+        self.forms = {key: render_form(cfg) for key, cfg in self.rounds.items()}
+        self.stats = {"accepted": 0, "rejected": 0, "failed": 0, "commits": 0, "max_batch": 0}
+        self._server = None
+        self._queue = None
+        self._loop = None
+        self._started = threading.Event()
+
+    @property
+    def base_url(self):
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def serve(self):
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        writer = asyncio.ensure_future(self._writer())
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, backlog=1024)
+        self._started.set()
+        try:
+            async with self._server:
+                await self._server.serve_forever()
+        finally:
+            writer.cancel()
+
+    def start(self):
+        """別スレッドのイベントループで起動する（ライブ更新サーバと同じプロセスで使う場合など）"""
+        threading.Thread(target=asyncio.run, args=(self._serve_quietly(),), daemon=True).start()
+        self._started.wait()
+        return self
+
+    async def _serve_quietly(self):
+        try:
+            await self.serve()
+        except asyncio.CancelledError:
+            pass
+
+    def stop(self):
+        # close() で serve_forever() がキャンセルされてイベントループが終わる
+        self._loop.call_soon_threadsafe(self._server.close)
+
+    async def _writer(self):
+        """溜まっている回答をまとめて 1 トランザクションで書き込み、ポーラーを起こす"""
+        while True:
+            batch = [await self._queue.get()]
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            by_round = {}
+            for round_key, row, future in batch:
+                by_round.setdefault(round_key, []).append((row, future))
+            for round_key, items in by_round.items():
+                try:
+                    with timed("store_commit", round=round_key, rows=len(items)):
+                        row_nos = await self._loop.run_in_executor(
+                            None, self.store.append_submissions, round_key, [row for row, _ in items])
+                except Exception as e:
+                    # ストアに書けなかった（ロック中・読み取り専用など）。待っている回答にだけ失敗を返して次のバッチへ
+                    logger.warning("回答を保存できませんでした (%s, %d 件): %s", round_key, len(items), e)
+                    for _, future in items:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                for (_, future), row_no in zip(items, row_nos):
+                    if not future.done():
+                        future.set_result(row_no)
+                wake_poller(self.rounds[round_key].poller_key)
+                self.stats["commits"] += 1
+            self.stats["max_batch"] = max(self.stats["max_batch"], len(batch))
+
+    async def submit(self, cfg, payload):
+        """回答を検査してストアに書き込み、振られた行番号を返す"""
+        ban, answers = validate_submission(cfg, payload)
+        submitted_at = datetime.now().strftime("%Y/%m/%d %H:%M:%S")
+        future = self._loop.create_future()
+        await self._queue.put((cfg.key, (submitted_at, str(ban), *answers), future))
+        return await future
+
+    async def _route(self, method, path, body):
+        parts = path.split("?", 1)[0].strip("/").split("/")
+        if len(parts) == 2 and parts[0] == "submit" and parts[1] in self.rounds:
+            if method != "POST":
+                return 405, {"error": "POST で送ってください"}
+            try:
+                row_no = await self.submit(self.rounds[parts[1]], json.loads(body.decode("utf-8")))
+            except (SubmissionError, UnicodeDecodeError, json.JSONDecodeError) as e:
+                self.stats["rejected"] += 1
+                return 400, {"error": str(e)}
+            except Exception as e:
+                # 接続を黙って切らず、保存できなかったことを返す（再送してもらう）
+                self.stats["failed"] += 1
+                return 500, {"error": f"回答を保存できませんでした: {e}"}
+            self.stats["accepted"] += 1
+            return 200, {"ok": True, "row_no": row_no}
+        if method == "GET" and parts == ["metrics"]:
+            return 200, get_metrics().prometheus_text()
+        if method == "GET" and len(parts) == 1 and parts[0] in self.forms:
+            return 200, self.forms[parts[0]]
+        if method == "GET" and parts == [""]:
+            links = "".join(f"<li><a href='/{escape(key)}'>{escape(cfg.name)}</a></li>"
+                            for key, cfg in self.rounds.items())
+            return 200, f"<ul>{links}</ul>".encode("utf-8")
+        return 404, {"error": "見つかりません"}
+
+    async def _handle(self, reader, writer):
+        """1 接続分の処理（keep-alive で続けて送ってきたリクエストも順に処理する）"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY_BYTES:
+                    writer.write(self._response(413, {"error": "回答が大きすぎます"}, keep_alive=False))
+                    await writer.drain()
+                    break
+                body = await reader.readexactly(length) if length else b""
+                status, payload = await self._route(method, path, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(self._response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _response(status, payload, keep_alive):
+        if isinstance(payload, bytes):
+            body, content_type = payload, "text/html; charset=utf-8"
+        elif isinstance(payload, str):
+            body, content_type = payload.encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            content_type = "application/json; charset=utf-8"
+        head = (f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        return head.encode("latin-1") + body
+
+
+def main():
+    parser = argparse.ArgumentParser(description="班の回答を受け付けてローカルストアに書き込む回答受付サーバ")
+    parser.add_argument("--store", default=RESPONSE_STORE, help="ストアの SQLite ファイル（既定は RESPONSE_STORE）")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8700)
+    parser.add_argument("--live-port", type=int, help="指定するとライブ更新サーバも同じプロセスで起動する")
+    args = parser.parse_args()
+    if not args.store:
+        parser.error("--store か RESPONSE_STORE でストアのファイルを指定してください")
+
+    store = get_store(args.store)
+    try:
+        rounds = load_rounds(response_store=args.store)
+        server = SubmitServer(rounds, store, host=args.host, port=args.port)
+    except ValueError as e:
+        # 設定の誤りはトレースバックではなく 1 行で知らせる
+        sys.exit(f"⚠️ {e}")
+    if args.live_port is not None:
+        from dashboard.live import LiveServer
+
+        def source_factory(cfg):
+            return store_source(store, cfg.key) if cfg.source == "local" else round_source(cfg)
+        live = LiveServer(rounds, host=args.host, port=args.live_port, source_factory=source_factory,
+                          poll_interval=SHEET_POLL_INTERVAL).start()
+        print(f"📡 {live.base_url}/ でライブ更新ページを配信します")
+    print(f"📝 http://{args.host}:{args.port}/ で回答を受け付けます（Ctrl+C で終了）")
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""集計テーブル（色の塗りつぶしセル）の HTML 生成
+
+行ごとの ``<tr>`` 断片を行の内容をキーにキャッシュしておき、回答が変わった
+班の行だけを作り直す。グラデーションの CSS も色の組み合わせごとに 1 回だけ作る。
+値はすべて HTML エスケープする。
+"""
+from functools import lru_cache
+from html import escape
+
+ROW_CACHE_SIZE = 20000
+
+
+@lru_cache(maxsize=1024)
+def _cell_html(value, bg_items, row_height):
+    """'ピンク・レッド' のようなセル値から塗りつぶしセルを作る"""
+    if value == "":
+        return "<td></td>"
+    bg_map = dict(bg_items)
+    gradient = ", ".join(bg_map[c] for c in value.split("・") if c in bg_map)
+    bg_style = escape(f"background: linear-gradient(90deg, {gradient});", quote=True)
+    return f"<td style='{bg_style} height:{row_height}px;'></td>"
+
+
+@lru_cache(maxsize=ROW_CACHE_SIZE)
+def _row_html(values, bg_items, row_height):
+    label, *cells = values
+    return "".join([
+        "<tr><td>", escape(str(label)), "</td>",
+        *(_cell_html(value, bg_items, row_height) for value in cells),
+        "</tr>",
+    ])
+
+
+def df_to_colored_html_with_colgroup(df, bg_map, first_col_w=100, col_w=140, row_height=18):
+    """Pivot テーブルを塗りつぶしセルの HTML テーブルにする（1 列目は回答者）"""
+    bg_items = tuple(bg_map.items())
+    columns = list(df.columns)
+    parts = [
+        "<table class='compact-table'><colgroup>",
+        f"<col style='width:{first_col_w}px' />",
+        f"<col style='width:{col_w}px' />" * (len(columns) - 1),
+        "</colgroup><thead><tr>",
+        *(f"<th>{escape(str(col))}</th>" for col in columns),
+        "</tr></thead><tbody>",
+    ]
+    for values in zip(*(df[col].tolist() for col in columns)):
+        parts.append(_row_html(values, bg_items, row_height))
+    parts.append("</tbody></table>")
+    return "".join(parts)
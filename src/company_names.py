@@ -0,0 +1,61 @@
+"""所属会社名 → 略称（SEC / SGC / SSS / SIE / 未定）の変換
+
+member_divide.py と notebook でばらばらだった判定を 1 つの別名表にまとめたもの。
+別名表は 1 本の正規表現にコンパイルし、名簿の列を変換するときは
+ユニークな会社名だけを判定して全行に展開する。欠損値や文字列以外は「未定」。
+"""
+import re
+
+import pandas as pd
+
+# (略称, 含まれていればその会社とみなす文字列, 完全一致でその会社とみなす文字列)
+# 複数当てはまるときは上にあるものを優先する
+COMPANY_ALIASES = [
+    ('SSS', ['ソニーセミコンダクタソリューションズ'], ['SSS']),
+    ('SGC', ['ソニーグループ'], ['SGC']),
+    ('SIE', ['ソニー・インタラクティブエンタテインメント'], ['SIE']),
+    ('SEC', ['ソニー株式会社'], ['SEC']),
+]
+# どれにも当てはまらない場合（「その他」「まだ決まってない」など）
+UNDECIDED = '未定'
+
+
+def compile_aliases(aliases=COMPANY_ALIASES):
+    """別名表を 1 本の正規表現と、グループ番号 → 略称の対応にする
+
+    各別名を先頭からの先読み (?=...) にして並べ、直後の空グループで
+    どれが当たったかを見分ける。選択肢は左から順に試されるので、
+    文字列中の位置に関係なく別名表の上にあるものが優先される。
+    """
+    parts, companies = [], []
+    for abbr, contains, equals in aliases:
+        for text in contains:
+            parts.append(rf"(?=[\s\S]*?{re.escape(text)})()")
+            companies.append(abbr)
+        for text in equals:
+            parts.append(rf"(?={re.escape(text)}\Z)()")
+            companies.append(abbr)
+    return re.compile("|".join(parts) or r"(?!)"), companies
+
+
+_DEFAULT = compile_aliases()
+
+
+def _abbr(compiled, value):
+    pattern, companies = compiled
+    match = pattern.match(value) if isinstance(value, str) else None
+    return companies[match.lastindex - 1] if match else UNDECIDED
+
+
+def company_abbr(value, aliases=None):
+    """会社名 1 件を略称に変換"""
+    return _abbr(_DEFAULT if aliases is None else compile_aliases(aliases), value)
+
+
+def normalize_company_names(values, aliases=None):
+    """会社名の列をまとめて略称に変換（判定はユニークな値だけ）"""
+    compiled = _DEFAULT if aliases is None else compile_aliases(aliases)
+    codes, uniques = pd.factorize(values)
+    # 欠損（コード -1）は末尾の「未定」を引く
+    labels = pd.array([_abbr(compiled, value) for value in uniques] + [UNDECIDED], dtype=str)
+    return pd.Series(labels.take(codes), index=getattr(values, 'index', None))
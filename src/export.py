@@ -0,0 +1,109 @@
+"""班分け結果の書き出し（xlsx / CSV / Parquet をまとめて並列に）
+
+member_divide.main で ExcelWriter(openpyxl) と to_csv を別々に呼んでいたのをまとめたもの。
+表（シート名 -> DataFrame）を 1 回受け取り、指定された形式のファイルをスレッドで同時に書き、
+ファイルごとの時間とサイズを返す。
+
+- xlsx: 全シートを 1 ファイルに。xlsxwriter があれば constant_memory モード、
+  なければ openpyxl の write_only モードで 1 行ずつ書く（どちらもセルを全部メモリに持たない）
+- CSV / Parquet: シートごとに 1 ファイル（<シート名>_<basename>.csv）。Parquet は pyarrow が必要
+
+    report = export_frames({'R1': r1_df, 'R2': r2_df}, 'out', formats=('xlsx', 'csv', 'parquet'))
+"""
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+try:
+    import pyarrow  # noqa: F401  Parquet の書き出しに使う
+except ImportError:
+    pyarrow = None
+
+FORMATS = ('xlsx', 'csv', 'parquet')
+DEFAULT_FORMATS = ('xlsx', 'csv')
+
+
+def _rows(df):
+    """ヘッダー → 各行の値（欠損は None、numpy の数値は Python の数値）"""
+    yield list(df.columns)
+    columns = [df[column].astype(object).tolist() for column in df.columns]
+    for row in zip(*columns):
+        yield [None if isinstance(value, float) and math.isnan(value) or value is pd.NA else value
+               for value in row]
+
+
+def write_xlsx(frames, path):
+    """全シートを 1 つの xlsx に 1 行ずつ書く"""
+    if xlsxwriter is not None:
+        workbook = xlsxwriter.Workbook(str(path), {'constant_memory': True})
+        for sheet, df in frames.items():
+            worksheet = workbook.add_worksheet(sheet)
+            for i, row in enumerate(_rows(df)):
+                worksheet.write_row(i, 0, row)
+        workbook.close()
+        return 'xlsxwriter'
+
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    for sheet, df in frames.items():
+        worksheet = workbook.create_sheet(sheet)
+        for row in _rows(df):
+            worksheet.append(row)
+    workbook.save(path)
+    return 'openpyxl'
+
+
+def _write_csv(df, path):
+    df.to_csv(path, index=False, encoding='utf-8-sig')
+    return 'pandas'
+
+
+def _write_parquet(df, path):
+    df.to_parquet(path, index=False)
+    return 'pyarrow'
+
+
+def _timed(fmt, path, func, *args):
+    start = time.perf_counter()
+    writer = func(*args, path)
+    return {
+        '形式': fmt,
+        'ファイル': path.name,
+        '書き出し': writer,
+        '時間[s]': round(time.perf_counter() - start, 3),
+        'サイズ[KB]': round(path.stat().st_size / 1024, 1),
+    }
+
+
+def export_frames(frames, output_dir, formats=DEFAULT_FORMATS, basename='班分け結果', workers=None):
+    """frames（シート名 -> DataFrame）を formats の形式で output_dir に書き、ファイルごとの時間とサイズを返す"""
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        raise ValueError(f"formats には {FORMATS} から指定してください: {sorted(unknown)}")
+    if 'parquet' in formats and pyarrow is None:
+        raise ImportError("Parquet で書き出すには pyarrow が必要です")
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    tasks = []
+    if 'xlsx' in formats:
+        tasks.append(('xlsx', output_dir / f'{basename}.xlsx', write_xlsx, frames))
+    for fmt, func in (('csv', _write_csv), ('parquet', _write_parquet)):
+        if fmt in formats:
+            tasks += [(fmt, output_dir / f'{sheet}_{basename}.{fmt}', func, df) for sheet, df in frames.items()]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers or len(tasks) or 1) as pool:
+        futures = [pool.submit(_timed, fmt, path, func, data) for fmt, path, func, data in tasks]
+        report = pd.DataFrame([future.result() for future in futures])
+    report.attrs['合計時間[s]'] = round(time.perf_counter() - start, 3)
+    return report
@@ -1,49 +1,264 @@
+import argparse
 import csv
+import hashlib
+import hmac
+import io
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+
+SURNAMES = ['田中', '佐藤', '鈴木', '高橋', '渡辺', '伊藤', '山本', '中村', '小林', '加藤']
+FIRST_NAMES = ['太郎', '花子', '一郎', '次郎', '美咲', '健太', 'さくら', '大輔', '愛', '翔']
+SURNAMES_KANA = ['タナカ', 'サトウ', 'スズキ', 'タカハシ', 'ワタナベ', 'イトウ', 'ヤマモト', 'ナカムラ', 'コバヤシ', 'カトウ']
+FIRST_NAMES_KANA = ['タロウ', 'ハナコ', 'イチロウ', 'ジロウ', 'ミサキ', 'ケンタ', 'サクラ', 'ダイスケ', 'アイ', 'ショウ']
 
 def generate_random_name(index):
-    surnames = ['田中', '佐藤', '鈴木', '高橋', '渡辺', '伊藤', '山本', '中村', '小林', '加藤']
-    first_names = ['太郎', '花子', '一郎', '次郎', '美咲', '健太', 'さくら', '大輔', '愛', '翔']
-    return f"{surnames[index % len(surnames)]}{first_names[(index // len(surnames)) % len(first_names)]}"
+    return f"{SURNAMES[index % len(SURNAMES)]}{FIRST_NAMES[(index // len(SURNAMES)) % len(FIRST_NAMES)]}"
 
 def generate_random_kana(index):
-    surnames_kana = ['タナカ', 'サトウ', 'スズキ', 'タカハシ', 'ワタナベ', 'イトウ', 'ヤマモト', 'ナカムラ', 'コバヤシ', 'カトウ']
-    first_names_kana = ['タロウ', 'ハナコ', 'イチロウ', 'ジロウ', 'ミサキ', 'ケンタ', 'サクラ', 'ダイスケ', 'アイ', 'ショウ']
-    return f"{surnames_kana[index % len(surnames_kana)]}{first_names_kana[(index // len(surnames_kana)) % len(first_names_kana)]}"
+    return f"{SURNAMES_KANA[index % len(SURNAMES_KANA)]}{FIRST_NAMES_KANA[(index // len(SURNAMES_KANA)) % len(FIRST_NAMES_KANA)]}"
 
 def generate_random_email(index):
     return f"user{str(index + 1).zfill(3)}@example.com"
 
-def anonymize_csv(input_path, output_path):
-    with open(input_path, encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        rows = list(reader)
+# 鍵付きの仮名化: 元の値の HMAC で表を引くので、同じ人はファイルや実行が違っても同じ仮の値になる
+KEY_ENV = "MASK_KEY"
+# 並列版で 1 タスクに渡すおおよそのバイト数
+CHUNK_BYTES = 16 * 1024 * 1024
+
+def load_key(key_file=None):
+    """鍵をファイル（なければ環境変数 MASK_KEY）から読む。どちらもなければ None"""
+    if key_file:
+        with open(key_file, 'rb') as f:
+            return f.read().strip()
+    value = os.environ.get(KEY_ENV)
+    return value.encode('utf-8') if value else None
+
+def _keyed_index(key, value):
+    return int.from_bytes(hmac.new(key, value.encode('utf-8'), hashlib.sha256).digest()[:8], 'big')
+
+def keyed_name(key, value):
+    h = _keyed_index(key, value)
+    return f"{SURNAMES[h % len(SURNAMES)]}{FIRST_NAMES[(h // len(SURNAMES)) % len(FIRST_NAMES)]}"
+
+def keyed_kana(key, value):
+    # keyed_name と同じ値を渡せば、漢字とフリガナが対応した仮名になる
+    h = _keyed_index(key, value)
+    return f"{SURNAMES_KANA[h % len(SURNAMES_KANA)]}{FIRST_NAMES_KANA[(h // len(SURNAMES_KANA)) % len(FIRST_NAMES_KANA)]}"
 
-    anonymized = []
-    for i, row in enumerate(rows):
-        new_row = row.copy()
+def keyed_email(key, value):
+    return f"user-{_keyed_index(key, value.strip().lower()):016x}@example.com"
 
-        if "メールアドレス" in row:
-            new_row["メールアドレス"] = generate_random_email(i)
+def anonymize_row_keyed(row, key):
+    """1 行を鍵付きで書き換える（空欄は空欄のまま）
 
-        if "お名前(漢字)" in row:
-            new_row["お名前(漢字)"] = generate_random_name(i)
+    フリガナも漢字の名前から決めるので、同じ人の漢字とフリガナは対応する
+    """
+    name = row.get("お名前(漢字)") or row.get("お名前(フリガナ)")
+    if row.get("お名前(漢字)"):
+        row["お名前(漢字)"] = keyed_name(key, name)
+    if row.get("お名前(フリガナ)"):
+        row["お名前(フリガナ)"] = keyed_kana(key, name)
+    if row.get("メールアドレス"):
+        row["メールアドレス"] = keyed_email(key, row["メールアドレス"])
+    return row
 
-        if "お名前(フリガナ)" in row:
-            new_row["お名前(フリガナ)"] = generate_random_kana(i)
+# 匿名化する列 -> 行番号から仮の値を作る関数
+ANONYMIZERS = {
+    "メールアドレス": generate_random_email,
+    "お名前(漢字)": generate_random_name,
+    "お名前(フリガナ)": generate_random_kana,
+}
+# ストリーミング版で一度に書き出す行数（メモリに持つのはこの行数まで）
+BUFFER_ROWS = 1000
 
-        anonymized.append(new_row)
+def anonymize_stream(infile, outfile, buffer_rows=BUFFER_ROWS, key=None):
+    """CSV を 1 行ずつ読みながら匿名化して書き出す（ファイル全体をメモリに載せない）
 
-    with open(output_path, "w", encoding="utf-8-sig", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=anonymized[0].keys())
-        writer.writeheader()
-        writer.writerows(anonymized)
+    infile / outfile はテキストモードのファイル（newline='' で開いたもの）。書き出した件数を返す。
+    key を渡すと行番号ではなく元の値から仮の値を決める（anonymize_row_keyed）
+    """
+    reader = csv.DictReader(infile)
+    if reader.fieldnames is None:
+        return 0
+    columns = [(name, func) for name, func in ANONYMIZERS.items() if name in reader.fieldnames]
+    writer = csv.DictWriter(outfile, fieldnames=reader.fieldnames)
+    writer.writeheader()
 
-    print(f"✅ {len(anonymized)} 件のレコードを匿名化しました。")
+    buffer = []
+    count = 0
+    for count, row in enumerate(reader, start=1):
+        if key is not None:
+            anonymize_row_keyed(row, key)
+        else:
+            for name, func in columns:
+                row[name] = func(count - 1)
+        buffer.append(row)
+        if len(buffer) >= buffer_rows:
+            writer.writerows(buffer)
+            buffer.clear()
+    writer.writerows(buffer)
+    return count
+
+def anonymize_csv(input_path, output_path, key=None):
+    with open(input_path, encoding='utf-8-sig', newline='') as infile, \
+            open(output_path, "w", encoding="utf-8-sig", newline="") as outfile:
+        count = anonymize_stream(infile, outfile, key=key)
+
+    print(f"✅ {count} 件のレコードを匿名化しました。")
     print(f"📄 出力ファイル: {output_path}")
 
-if __name__ == "__main__":
+def anonymize_csv_chunked(input_path, output_path, chunksize=100000):
+    """pandas で chunksize 行ずつ読み、列ごとにまとめて匿名化する版（pandas が必要）"""
+    import numpy as np
+    import pandas as pd
+
+    tables = {
+        "お名前(漢字)": (SURNAMES, FIRST_NAMES),
+        "お名前(フリガナ)": (SURNAMES_KANA, FIRST_NAMES_KANA),
+    }
+    count = 0
+    chunks = pd.read_csv(input_path, encoding='utf-8-sig', dtype=str, keep_default_na=False, chunksize=chunksize)
+    for i, chunk in enumerate(chunks):
+        index = np.arange(count, count + len(chunk))
+        for name, (surnames, first_names) in tables.items():
+            if name in chunk.columns:
+                # generate_random_name / generate_random_kana と同じ並び
+                combined = np.array([s + f for f in first_names for s in surnames], dtype=object)
+                chunk[name] = combined[index % len(combined)]
+        if "メールアドレス" in chunk.columns:
+            chunk["メールアドレス"] = "user" + pd.Series(index + 1, index=chunk.index).astype(str).str.zfill(3) + "@example.com"
+        # 1 つ目のチャンクだけ BOM とヘッダーを書く
+        chunk.to_csv(output_path, mode='w' if i == 0 else 'a', header=(i == 0), index=False,
+                     encoding='utf-8-sig' if i == 0 else 'utf-8', lineterminator='\r\n')
+        count += len(chunk)
+    return count
+
+def _read_header(path):
+    """ヘッダー行のバイト列（引用符の中の改行も含める）"""
+    with open(path, 'rb') as f:
+        header = f.readline()
+        while header.count(b'"') % 2:
+            line = f.readline()
+            if not line:
+                break
+            header += line
+    return header
 
-    input_path = "data/名簿一覧_id.csv"
-    output_path = "data/名簿一覧_id_匿名化.csv"
-    anonymize_csv(input_path, output_path)
+def _chunk_ranges(path, start, chunk_bytes, block_size=1 << 20):
+    """start 以降を約 chunk_bytes ごとの (開始, 終了) バイト範囲に分ける
+
+    区切りは行末だけにし、引用符の中の改行では切らない（" の数が偶数なら引用符の外。
+    "" のエスケープは 2 個ずつなので偶奇は変わらない）
+    """
+    ranges = []
+    chunk_start = offset = start
+    quotes = 0
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            counted = 0
+            i = max(0, chunk_start + chunk_bytes - offset)
+            while i < len(block):
+                i = block.find(b'\n', i)
+                if i < 0:
+                    break
+                quotes += block.count(b'"', counted, i)
+                counted = i
+                if quotes % 2 == 0:
+                    ranges.append((chunk_start, offset + i + 1))
+                    chunk_start = offset + i + 1
+                    i = max(i + 1, chunk_start + chunk_bytes - offset)
+                else:
+                    i += 1
+            quotes += block.count(b'"', counted)
+            offset += len(block)
+    if chunk_start < offset:
+        ranges.append((chunk_start, offset))
+    return ranges
+
+def _anonymize_range(path, start, end, fieldnames, key):
+    """ワーカー: バイト範囲 [start, end) の行を鍵付きで匿名化し、(件数, 出力バイト列) を返す"""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start).decode('utf-8')
+    reader = csv.DictReader(io.StringIO(data, newline=''), fieldnames=fieldnames)
+    out = io.StringIO(newline='')
+    writer = csv.DictWriter(out, fieldnames=fieldnames)
+    count = 0
+    for count, row in enumerate(reader, start=1):
+        writer.writerow(anonymize_row_keyed(row, key))
+    return count, out.getvalue().encode('utf-8')
+
+def anonymize_csv_parallel(input_path, output_path, key, workers=None, chunk_bytes=CHUNK_BYTES):
+    """鍵付きの匿名化をバイト範囲ごとにプロセスプールで並列に行い、元の順番で書き出す
+
+    仮の値は行番号に依存しないので、各チャンクは独立に処理できる。
+    出力は anonymize_csv(input_path, output_path, key) と同じバイト列になる
+    """
+    header = _read_header(input_path)
+    if not header.strip():
+        open(output_path, 'wb').close()
+        return 0
+    fieldnames = next(csv.reader(io.StringIO(header.decode('utf-8-sig'), newline='')))
+    ranges = _chunk_ranges(input_path, len(header), chunk_bytes)
+    workers = workers or os.cpu_count() or 1
+
+    header_out = io.StringIO(newline='')
+    csv.DictWriter(header_out, fieldnames=fieldnames).writeheader()
+    count = 0
+    with open(output_path, 'wb') as out, ProcessPoolExecutor(max_workers=workers) as pool:
+        out.write(('\ufeff' + header_out.getvalue()).encode('utf-8'))
+        # 先に投げておくのは 2 * workers チャンクまで（メモリを抑えつつ、出来た順ではなく元の順に書く）
+        pending = []
+        for start, end in ranges:
+            pending.append(pool.submit(_anonymize_range, input_path, start, end, fieldnames, key))
+            if len(pending) >= 2 * workers:
+                n, data = pending.pop(0).result()
+                out.write(data)
+                count += n
+        for future in pending:
+            n, data = future.result()
+            out.write(data)
+            count += n
+    return count
+
+def main():
+    parser = argparse.ArgumentParser(description="名簿 CSV の名前・フリガナ・メールアドレスを仮の値に置き換える")
+    parser.add_argument("input", nargs="?", default="data/名簿一覧_id.csv", help="入力 CSV（- で標準入力）")
+    parser.add_argument("output", nargs="?", default="data/名簿一覧_id_匿名化.csv", help="出力 CSV（- で標準出力）")
+    parser.add_argument("--pandas", action="store_true", help="pandas でチャンクごとに処理する")
+    parser.add_argument("--chunksize", type=int, default=100000)
+    parser.add_argument("--key-file", help=f"鍵ファイル。指定すると（または環境変数 {KEY_ENV} があると）元の値から仮の値を決める")
+    parser.add_argument("--workers", type=int, help="鍵付きのとき、ファイルを分割してこのプロセス数で並列に処理する")
+    args = parser.parse_args()
+    key = load_key(args.key_file)
+
+    if args.workers:
+        if key is None:
+            parser.error(f"--workers には鍵（--key-file か {KEY_ENV}）が必要です")
+        if args.input == "-" or args.output == "-":
+            parser.error("--workers は標準入出力には使えません")
+        count = anonymize_csv_parallel(args.input, args.output, key, args.workers)
+        print(f"✅ {count} 件のレコードを匿名化しました。", file=sys.stderr)
+    elif args.pandas:
+        if key is not None:
+            parser.error("--pandas は鍵付きの匿名化に対応していません")
+        count = anonymize_csv_chunked(args.input, args.output, args.chunksize)
+        print(f"✅ {count} 件のレコードを匿名化しました。", file=sys.stderr)
+    elif args.input == "-" or args.output == "-":
+        infile = (io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8-sig", newline="") if args.input == "-"
+                  else open(args.input, encoding="utf-8-sig", newline=""))
+        outfile = (io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", newline="") if args.output == "-"
+                   else open(args.output, "w", encoding="utf-8-sig", newline=""))
+        with infile, outfile:
+            count = anonymize_stream(infile, outfile, key=key)
+        print(f"✅ {count} 件のレコードを匿名化しました。", file=sys.stderr)
+    else:
+        anonymize_csv(args.input, args.output, key)
+
+if __name__ == "__main__":
+    main()
@@ -1,253 +1,199 @@
+import argparse
+import numpy as np
 import pandas as pd
 import random
-from collections import defaultdict
+
+from company_names import company_abbr
+from export import DEFAULT_FORMATS, FORMATS, export_frames
+from roster import load_roster
+from team_optimizer import compare_r1
+
+ROSTER_PATH = '/mnt/user-data/uploads/名簿一覧_id_匿名化.csv'
+OUTPUT_DIR = '/mnt/user-data/outputs'
 
 def parse_company_name(company_full):
-    """会社名を略称に変換"""
-    if 'ソニーセミコンダクタソリューションズ' in company_full or company_full == 'SSS':
-        return 'SSS'
-    elif 'ソニーグループ' in company_full or company_full == 'SGC':
-        return 'SGC'
-    elif 'ソニー・インタラクティブエンタテインメント' in company_full or company_full == 'SIE':
-        return 'SIE'
-    elif 'ソニー株式会社' in company_full or company_full == 'SEC':
-        return 'SEC'
-    elif 'その他' in company_full or 'まだ決まってない' in company_full:
-        return '未定'
-    else:
-        return '未定'
+    """会社名を略称に変換（名簿の列をまとめて変換するときは normalize_company_names）"""
+    return company_abbr(company_full)
 
-def create_member_id(row, company_counts):
-    """メンバーIDを作成（例: SEC_社員_0001）"""
-    company = row['company_abbr']
-    status = row['内定者/社員']
-    
-    # 会社ごと、社員/内定者ごとのカウントを管理
-    key = f"{company}_{status}"
-    company_counts[key] += 1
-    count = company_counts[key]
-    
-    return f"{company}_{status}_{count:04d}"
+def _code_labels(values):
+    """値をコードと表示用の文字列に分ける（文字列化はユニークな値だけ。欠損は 'nan'）"""
+    codes, uniques = pd.factorize(values)
+    labels = [str(value) for value in uniques] + ['nan']
+    return np.where(codes < 0, len(uniques), codes), labels
+
+def create_member_ids(df, company_col='company_abbr', status_col='内定者/社員', width=4):
+    """メンバーIDをまとめて作成（例: SEC_社員_0001）
 
-def assign_r1_teams(participants_df):
-    """R1ラウンドの班分け（異なる会社を混ぜる）"""
-    # 社員と内定者を分ける
-    employees = participants_df[participants_df['内定者/社員'] == '社員'].copy()
-    candidates = participants_df[participants_df['内定者/社員'] == '内定者'].copy()
+    会社 × 区分ごとに、名簿の並び順で 1 から連番を振る
+    """
+    company_codes, companies = _code_labels(df[company_col])
+    status_codes, statuses = _code_labels(df[status_col])
+    keys = company_codes * len(statuses) + status_codes
+    prefixes = np.array([f"{company}_{status}_" for company in companies for status in statuses], dtype=object)
+    numbers = pd.Series(keys, index=df.index).groupby(keys).cumcount() + 1
+    return pd.Series(prefixes[keys], index=df.index, dtype=str) + numbers.astype(str).str.zfill(width)
+
+def _ids_by_group(df, key):
+    """key ごとの member_id の配列（元の並び順のまま）"""
+    ids = df['member_id'].to_numpy()
+    return {group: ids[positions] for group, positions in df.groupby(key).indices.items()}
+
+def assign_r1_teams(participants_df, seed=None):
+    """R1ラウンドの班分け（異なる会社を混ぜる）
+
+    seed を指定すると、シャッフルの順番も含めて毎回同じ班分けになる
+    （省略時は従来どおり random_state=42 と random モジュールの乱数）
+    """
+    shuffle = random.shuffle if seed is None else random.Random(seed).shuffle
+    random_state = 42 if seed is None else seed
     
-    # 各会社ごとにシャッフル
-    employees = employees.sample(frac=1, random_state=42).reset_index(drop=True)
-    candidates = candidates.sample(frac=1, random_state=42).reset_index(drop=True)
+    # 社員と内定者を分けてシャッフル
+    employees = participants_df[participants_df['内定者/社員'] == '社員'].sample(frac=1, random_state=random_state)
+    candidates = participants_df[participants_df['内定者/社員'] == '内定者'].sample(frac=1, random_state=random_state)
     
-    # 会社ごとにグループ化
-    employees_by_company = {company: group.reset_index(drop=True) 
-                           for company, group in employees.groupby('company_abbr')}
-    candidates_by_company = {company: group.reset_index(drop=True) 
-                            for company, group in candidates.groupby('company_abbr')}
+    # 会社ごとの member_id 配列（DataFrame を触るのはここまで）
+    employees_by_company = _ids_by_group(employees, 'company_abbr')
+    candidates_by_company = _ids_by_group(candidates, 'company_abbr')
     
     r1_teams = []
     team_id = 1
     
-    # 各社の社員と内定者のインデックスを追跡
-    emp_indices = {company: 0 for company in employees_by_company}
+    # 各社の内定者の次に使う位置
     cand_indices = {company: 0 for company in candidates_by_company}
     
-    # 優先順位: 社員がいる会社から順に班を作る
-    companies_with_employees = list(employees_by_company.keys())
+    def take(company, n):
+        """company の内定者を最大 n 名取り出す"""
+        ids = candidates_by_company.get(company)
+        if ids is None:
+            return []
+        start = cand_indices[company]
+        cand_indices[company] = min(start + n, len(ids))
+        return ids[start:cand_indices[company]].tolist()
     
-    # 社員を持つ班を作成
-    for company in companies_with_employees:
-        while emp_indices[company] < len(employees_by_company[company]):
-            team = {}
-            team['班ID'] = f'R1-{team_id:02d}'
-            team['社員'] = 1
-            team['members'] = []
-            
-            # 社員を追加
-            if emp_indices[company] < len(employees_by_company[company]):
-                team['members'].append(employees_by_company[company].iloc[emp_indices[company]]['member_id'])
-                emp_indices[company] += 1
-            
+    # 優先順位: 社員がいる会社から順に班を作る
+    for company, emp_ids in employees_by_company.items():
+        for member_id in emp_ids.tolist():
             # 内定者を5名追加（できるだけ異なる会社から）
-            # 戦略: 主要会社から2名ずつ、残りは少数会社から
-            added_count = 0
+            # 戦略: まず現在の社員の会社から2名、残りは他の会社から2名ずつ
+            members = [member_id] + take(company, 2)
             
-            # まず現在の社員の会社から内定者を2名追加
-            for _ in range(2):
-                if cand_indices.get(company, 0) < len(candidates_by_company.get(company, [])):
-                    team['members'].append(candidates_by_company[company].iloc[cand_indices[company]]['member_id'])
-                    cand_indices[company] += 1
-                    added_count += 1
-            
-            # 他の会社から追加
             other_companies = [c for c in candidates_by_company.keys() if c != company]
-            random.shuffle(other_companies)
+            shuffle(other_companies)
             
             for other_company in other_companies:
-                if added_count >= 5:
+                if len(members) - 1 >= 5:
                     break
-                if cand_indices.get(other_company, 0) < len(candidates_by_company.get(other_company, [])):
-                    num_to_add = min(2, 5 - added_count)
-                    for _ in range(num_to_add):
-                        if cand_indices[other_company] < len(candidates_by_company[other_company]):
-                            team['members'].append(candidates_by_company[other_company].iloc[cand_indices[other_company]]['member_id'])
-                            cand_indices[other_company] += 1
-                            added_count += 1
-                            if added_count >= 5:
-                                break
+                members += take(other_company, min(2, 6 - len(members)))
             
-            if added_count >= 5:
-                r1_teams.append(team)
+            if len(members) - 1 >= 5:
+                r1_teams.append({'班ID': f'R1-{team_id:02d}', '社員': 1, 'members': members})
                 team_id += 1
     
     # 社員がいない班（内定者のみ）
-    # 残った内定者を使って班を作成
-    remaining_candidates = []
-    for company in candidates_by_company:
-        while cand_indices.get(company, 0) < len(candidates_by_company[company]):
-            remaining_candidates.append(candidates_by_company[company].iloc[cand_indices[company]])
-            cand_indices[company] += 1
-    
-    # 6人ずつの班を作成
-    for i in range(0, len(remaining_candidates), 6):
-        if i + 6 <= len(remaining_candidates):
-            team = {}
-            team['班ID'] = f'R1-{team_id:02d}'
-            team['社員'] = 0
-            team['members'] = [remaining_candidates[j]['member_id'] for j in range(i, i + 6)]
-            r1_teams.append(team)
-            team_id += 1
+    # 残った内定者を使って6人ずつの班を作成（6人に満たない余りは作らない）
+    remaining = [ids[cand_indices[company]:] for company, ids in candidates_by_company.items()]
+    remaining_candidates = np.concatenate(remaining).tolist() if remaining else []
+    for i in range(0, len(remaining_candidates) - 5, 6):
+        r1_teams.append({'班ID': f'R1-{team_id:02d}', '社員': 0, 'members': remaining_candidates[i:i + 6]})
+        team_id += 1
     
     return r1_teams
 
-def assign_r2_teams(participants_df):
-    """R2ラウンドの班分け（同じ会社ごと）"""
+def assign_r2_teams(participants_df, seed=None):
+    """R2ラウンドの班分け（同じ会社ごと。seed を省略したときは random_state=42）"""
+    random_state = 42 if seed is None else seed
     r2_teams = []
-    
-    # 会社ごとにグループ化
-    for company, group in participants_df.groupby('company_abbr'):
-        group = group.sample(frac=1, random_state=42).reset_index(drop=True)
-        
-        # 社員を先に配置
-        employees = group[group['内定者/社員'] == '社員'].reset_index(drop=True)
-        candidates = group[group['内定者/社員'] == '内定者'].reset_index(drop=True)
+    ids = participants_df['member_id'].to_numpy()
+    is_employee = (participants_df['内定者/社員'] == '社員').to_numpy()
+    
+    # 会社ごとに、シャッフルした順で社員・内定者の member_id 配列を作る
+    for company, positions in participants_df.groupby('company_abbr').indices.items():
+        # group.sample(frac=1, random_state=random_state) と同じ並び
+        positions = positions[np.random.RandomState(random_state).choice(len(positions), size=len(positions), replace=False)]
+        employees = ids[positions[is_employee[positions]]].tolist()
+        candidates = ids[positions[~is_employee[positions]]].tolist()
         
-        team_count = 1
-        
-        # 社員がいる班を作成（社員1名+内定者6名）
-        for i in range(len(employees)):
-            team = {}
-            team['班ID'] = f'R2-{company}{team_count}'
-            team['会社'] = company
-            team['members'] = [employees.iloc[i]['member_id']]
-            
-            # 内定者を追加
-            start_idx = i * 6
-            end_idx = min(start_idx + 6, len(candidates))
-            for j in range(start_idx, end_idx):
-                team['members'].append(candidates.iloc[j]['member_id'])
-            
-            r2_teams.append(team)
-            team_count += 1
-        
-        # 残った内定者のみの班を作成
-        remaining_start = len(employees) * 6
-        for i in range(remaining_start, len(candidates), 6):
-            team = {}
-            team['班ID'] = f'R2-{company}{team_count}'
-            team['会社'] = company
-            team['members'] = []
-            
-            end_idx = min(i + 6, len(candidates))
-            for j in range(i, end_idx):
-                team['members'].append(candidates.iloc[j]['member_id'])
-            
-            r2_teams.append(team)
-            team_count += 1
+        # 社員がいる班（社員1名+内定者6名）のあとに、残った内定者のみの班（6名ずつ）
+        n_teams = len(employees) + max(0, -(-(len(candidates) - len(employees) * 6) // 6))
+        for i in range(n_teams):
+            members = ([employees[i]] if i < len(employees) else []) + candidates[i * 6:i * 6 + 6]
+            r2_teams.append({'班ID': f'R2-{company}{i + 1}', '会社': company, 'members': members})
     
     return r2_teams
 
+R1_COMPANIES = ['SEC', 'SGC', 'SSS', 'SIE', '未定']
+
+def _team_table(teams, participants_df, team_keys, n_slots):
+    """班のリストを 1 回なめて、班ごとの値・メンバー欄の表示・各メンバーの名簿上の位置を作る"""
+    team_values = {key: [] for key in team_keys}
+    team_idx, slots, member_ids = [], [], []
+    for t, team in enumerate(teams):
+        for key in team_keys:
+            team_values[key].append(team[key])
+        members = team['members'][:n_slots]
+        team_idx += [t] * len(members)
+        slots += range(len(members))
+        member_ids += members
+    
+    # member_id -> 名簿の行（同じ ID が複数あれば後の行）
+    roster = participants_df.drop_duplicates('member_id', keep='last')
+    positions = pd.Index(roster['member_id']).get_indexer(member_ids)
+    names = roster['お名前(漢字)'].to_numpy(dtype=object)
+    labels = np.full((len(teams), n_slots), '', dtype=object)
+    labels[team_idx, slots] = [
+        f"{member_id} ({names[pos] if pos >= 0 else ''})" for member_id, pos in zip(member_ids, positions)
+    ]
+    return team_values, labels, np.asarray(team_idx, dtype=np.int64), positions, roster
+
 def create_r1_output_df(r1_teams, participants_df):
     """R1班分け結果をDataFrameに変換（名前付き）"""
-    # member_idから名前を引けるようにマッピング作成
-    id_to_name = dict(zip(participants_df['member_id'], participants_df['お名前(漢字)']))
-    
-    rows = []
-    for team in r1_teams:
-        row = {
-            '班ID (R1)': team['班ID'],
-            '社員': team['社員']
-        }
-        for i in range(6):
-            if i < len(team['members']):
-                member_id = team['members'][i]
-                member_name = id_to_name.get(member_id, '')
-                row[f'メンバー{i+1}'] = f"{member_id} ({member_name})"
-            else:
-                row[f'メンバー{i+1}'] = ''
-        rows.append(row)
-    
-    df = pd.DataFrame(rows)
-    
-    # 各会社の人数をカウント
-    company_list = ['SEC', 'SGC', 'SSS', 'SIE', '未定']
-    for company in company_list:
-        df[company] = df[[f'メンバー{i+1}' for i in range(6)]].apply(
-            lambda x: sum(1 for v in x if company in str(v)), axis=1
-        )
-    
-    # 会社数をカウント
-    df['会社数'] = df[company_list].apply(lambda x: sum(1 for v in x if v > 0), axis=1)
-    
-    return df
+    team_values, labels, team_idx, positions, roster = _team_table(r1_teams, participants_df, ['班ID', '社員'], 6)
+    
+    # 班 × 会社の人数（名簿の company_abbr から数える）
+    company_codes = pd.Categorical(roster['company_abbr'], categories=R1_COMPANIES).codes
+    member_codes = np.where(positions >= 0, company_codes[positions], -1)
+    valid = member_codes >= 0
+    counts = np.bincount(team_idx[valid] * len(R1_COMPANIES) + member_codes[valid],
+                         minlength=len(r1_teams) * len(R1_COMPANIES)).reshape(len(r1_teams), len(R1_COMPANIES))
+    
+    df = pd.DataFrame({
+        '班ID (R1)': team_values['班ID'],
+        '社員': team_values['社員'],
+        **{f'メンバー{i+1}': labels[:, i] for i in range(6)},
+        **{company: counts[:, j] for j, company in enumerate(R1_COMPANIES)},
+        # 会社数をカウント
+        '会社数': (counts > 0).sum(axis=1),
+    })
+    return df.infer_objects()
 
 def create_r2_output_df(r2_teams, participants_df):
     """R2班分け結果をDataFrameに変換（名前付き）"""
-    # member_idから名前を引けるようにマッピング作成
-    id_to_name = dict(zip(participants_df['member_id'], participants_df['お名前(漢字)']))
-    
-    rows = []
-    for team in r2_teams:
-        row = {
-            '班ID (R2)': team['班ID'],
-            '会社': team['会社']
-        }
-        for i in range(7):
-            if i < len(team['members']):
-                member_id = team['members'][i]
-                member_name = id_to_name.get(member_id, '')
-                row[f'メンバー{i+1}'] = f"{member_id} ({member_name})"
-            else:
-                row[f'メンバー{i+1}'] = ''
-        rows.append(row)
-    
-    return pd.DataFrame(rows)
+    team_values, labels, _, _, _ = _team_table(r2_teams, participants_df, ['班ID', '会社'], 7)
+    df = pd.DataFrame({
+        '班ID (R2)': team_values['班ID'],
+        '会社': team_values['会社'],
+        **{f'メンバー{i+1}': labels[:, i] for i in range(7)},
+    })
+    return df.infer_objects()
 
-def main():
-    # CSVファイルを読み込む
-    roster_df = pd.read_csv('/mnt/user-data/uploads/名簿一覧_id_匿名化.csv', encoding='utf-8-sig')
+def main(roster_path=ROSTER_PATH, output_dir=OUTPUT_DIR, formats=DEFAULT_FORMATS):
+    # 名簿を読み込む（会社略称・メンバーIDの列は roster.py で作成・キャッシュ済み）
+    roster = load_roster(roster_path)
     
     # 参加者のみをフィルタリング
-    participants = roster_df[roster_df['Bridge2026の参加可否'] == '参加'].copy()
+    participants = roster.participants()
     
     print(f"参加者数: {len(participants)}名")
     
-    # 会社名を略称に変換
-    participants['company_abbr'] = participants['所属会社(内定先会社)'].apply(parse_company_name)
-    
     # 会社ごとの人数を表示
     print("\n会社別参加者数:")
     print(participants.groupby(['company_abbr', '内定者/社員']).size())
     
-    # メンバーIDを作成
-    company_counts = defaultdict(int)
-    participants['member_id'] = participants.apply(
-        lambda row: create_member_id(row, company_counts), axis=1
-    )
-    
     # R1班分け
     print("\n\nR1班分けを実行中...")
-    r1_teams = assign_r1_teams(participants)
+    # 会社数の合計が最大になるよう最適化（従来の貪欲法の結果と比べて表示）
+    r1_teams, r1_report = compare_r1(participants, assign_r1_teams(participants))
+    print(r1_report)
     r1_df = create_r1_output_df(r1_teams, participants)
     
     # R2班分け
@@ -260,24 +206,19 @@ def main():
     print(f"R1: {len(r1_teams)}班")
     print(f"R2: {len(r2_teams)}班")
     
-    # 出力ファイルを作成
-    with pd.ExcelWriter('/mnt/user-data/outputs/班分け結果.xlsx', engine='openpyxl') as writer:
-        # R1シート
-        r1_df.to_excel(writer, sheet_name='R1', index=False)
-        # R2シート
-        r2_df.to_excel(writer, sheet_name='R2', index=False)
-        # 参加者リスト
-        output_participants = participants[['Bridge ID', 'お名前(漢字)', '内定者/社員', 
-                                           'company_abbr', 'member_id']].copy()
-        output_participants.to_excel(writer, sheet_name='参加者一覧', index=False)
-    
-    print("\n結果を 班分け結果.xlsx に保存しました")
-    
-    # CSVでも出力
-    r1_df.to_csv('/mnt/user-data/outputs/R1_班分け結果.csv', index=False, encoding='utf-8-sig')
-    r2_df.to_csv('/mnt/user-data/outputs/R2_班分け結果.csv', index=False, encoding='utf-8-sig')
+    # 出力ファイルを作成（xlsx / CSV / Parquet を同時に書き出す）
+    output_participants = participants[['Bridge ID', 'お名前(漢字)', '内定者/社員',
+                                       'company_abbr', 'member_id']].copy()
+    report = export_frames({'R1': r1_df, 'R2': r2_df, '参加者一覧': output_participants}, output_dir, formats)
+    print(f"\n結果を {output_dir} に保存しました（{report.attrs['合計時間[s]']} 秒）")
+    print(report.to_string(index=False))
     
     return r1_df, r2_df, participants
 
 if __name__ == "__main__":
-    r1_df, r2_df, participants_df = main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="名簿から R1 / R2 の班分けを作って書き出す")
+    parser.add_argument("roster", nargs="?", default=ROSTER_PATH, help="名簿一覧_*.csv")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(DEFAULT_FORMATS))
+    args = parser.parse_args()
+    r1_df, r2_df, participants_df = main(args.roster, args.output_dir, args.formats)
@@ -0,0 +1,228 @@
+"""複数ラウンドの班分けをまとめて決める（同じ人同士がなるべく再会しないように）
+
+R1（会社を混ぜる）と R2（同じ会社ごと）を別々に作ると、同じ 2 人が両方の
+ラウンドで同じ班になることがある。ここでは K ラウンド分の班分けを同時に持ち、
+
+1. 各ラウンドをそのルールどおりに作る（mixed は会社数の最適化まで済ませる）
+2. ラウンドを 1 つずつ順に、「他のラウンドですでに同じ班になった回数」の合計が
+   減るよう、ルールを崩さない入れ替え（mixed は同じ区分同士、company は同じ会社の
+   同じ区分同士）を焼きなまし法で探す。mixed では会社数も落とさないようにする
+
+を passes 回繰り返す。誰と何回同じ班になったかは、人ごとの疎な dict
+（会った相手 → 回数）で持つので、入れ替え 1 回の評価は班の人数分の参照で済む。
+
+    rounds = schedule_rounds(participants, rules=('mixed', 'company', 'mixed', 'mixed', 'mixed'))
+    print(repeat_report(rounds))
+"""
+import math
+import time
+
+import numpy as np
+
+from team_optimizer import TEAM_SIZE, _anneal, _initial_assignment, team_sizes, upper_bound
+
+# 会社数 1 つ分を、再会何回分と同じ重さにするか
+DIVERSITY_WEIGHT = 2
+# R2 と同じ「社員 1 名 + 内定者 6 名」
+COMPANY_TEAM_CANDIDATES = 6
+BLOCK_SIZE = 10000
+START_TEMPERATURE = 1.0
+END_TEMPERATURE = 0.05
+
+
+def _mixed_round(codes, is_employee, rng, team_size):
+    """R1 と同じルールの班分け（会社数を最適化した状態から始める）"""
+    sizes = team_sizes(len(codes), team_size)
+    team_of = _initial_assignment(codes, is_employee, sizes, rng)
+    iterations = min(max(20000, 50 * len(codes)), 500000)
+    return _anneal(codes, is_employee, team_of, len(sizes), rng, iterations, upper_bound(codes, sizes))
+
+
+def _company_round(codes, is_employee, rng):
+    """R2 と同じルールの班分け（会社ごとに社員 1 名 + 内定者 6 名、残りの内定者は 6 名ずつ）"""
+    team_of = np.empty(len(codes), dtype=np.int64)
+    team_company = []
+    for company in np.unique(codes):
+        employees = rng.permutation(np.flatnonzero((codes == company) & is_employee))
+        candidates = rng.permutation(np.flatnonzero((codes == company) & ~is_employee))
+        n_teams = len(employees) + max(0, -(-(len(candidates) - len(employees) * COMPANY_TEAM_CANDIDATES)
+                                           // COMPANY_TEAM_CANDIDATES))
+        first = len(team_company)
+        team_of[employees] = first + np.arange(len(employees))
+        team_of[candidates] = first + np.arange(len(candidates)) // COMPANY_TEAM_CANDIDATES
+        team_company += [company] * n_teams
+    return team_of, team_company
+
+
+def _improve_round(team, teams, codes, swap_groups, met, rng, iterations, diversity):
+    """1 ラウンド分の入れ替え探索（他のラウンドでの同席回数の合計を減らす）"""
+    code = codes.tolist()
+    counts = None
+    if diversity:
+        counts = [[0] * (max(code) + 1) for _ in teams]
+        for t, members in enumerate(teams):
+            for member in members:
+                counts[t][code[member]] += 1
+
+    groups = [group for group in swap_groups if len(group) >= 2]
+    if not groups:
+        return
+    pool = np.concatenate(groups)
+    group_len = np.repeat([len(group) for group in groups], [len(group) for group in groups])
+    group_start = np.repeat(np.cumsum([0] + [len(group) for group in groups[:-1]]), [len(group) for group in groups])
+
+    n_blocks = max(1, math.ceil(iterations / BLOCK_SIZE))
+    cooling = (END_TEMPERATURE / START_TEMPERATURE) ** (1 / max(1, n_blocks - 1))
+    temperature = START_TEMPERATURE
+    for _ in range(n_blocks):
+        pos_a = rng.integers(len(pool), size=BLOCK_SIZE)
+        pos_b = group_start[pos_a] + (rng.random(BLOCK_SIZE) * group_len[pos_a]).astype(np.int64)
+        thresholds = (np.log(rng.random(BLOCK_SIZE)) * temperature).tolist()
+        for a, b, threshold in zip(pool[pos_a].tolist(), pool[pos_b].tolist(), thresholds):
+            ti, tj = team[a], team[b]
+            if ti == tj:
+                continue
+            met_a, met_b = met[a], met[b]
+            team_i, team_j = teams[ti], teams[tj]
+            # 他のラウンドで会った回数（同じ班の相手は今回の 1 回を引く）
+            delta = 0
+            for x in team_i:
+                if x != a:
+                    delta += met_b.get(x, 0) - met_a[x] + 1
+            for y in team_j:
+                if y != b:
+                    delta += met_a.get(y, 0) - met_b[y] + 1
+            ca, cb = code[a], code[b]
+            if counts is not None and ca != cb:
+                ci, cj = counts[ti], counts[tj]
+                d_distinct = (ci[cb] == 0) - (ci[ca] == 1) + (cj[ca] == 0) - (cj[cb] == 1)
+                delta -= DIVERSITY_WEIGHT * d_distinct
+            # exp(-delta / T) > u  ⇔  -delta > T * log(u)
+            if delta <= 0 or -delta > threshold:
+                team_i.remove(a)
+                team_j.remove(b)
+                _add_pairs_with(met, a, team_i, -1)
+                _add_pairs_with(met, b, team_j, -1)
+                _add_pairs_with(met, a, team_j, 1)
+                _add_pairs_with(met, b, team_i, 1)
+                team_i.append(b)
+                team_j.append(a)
+                team[a], team[b] = tj, ti
+                if counts is not None and ca != cb:
+                    ci[ca] -= 1
+                    ci[cb] += 1
+                    cj[cb] -= 1
+                    cj[ca] += 1
+        temperature *= cooling
+
+
+def _add_pairs_with(met, a, members, step):
+    met_a = met[a]
+    for x in members:
+        count = met_a.get(x, 0) + step
+        if count:
+            met_a[x] = met[x][a] = count
+        else:
+            del met_a[x], met[x][a]
+
+
+def _round_teams(k, rule, team, member_ids, is_employee, team_company, companies):
+    """ラウンド k の班分けを assign_r1_teams / assign_r2_teams と同じ形にする"""
+    n_teams = max(team) + 1 if team else 0
+    members = [[] for _ in range(n_teams)]
+    # 班の中は社員 → 内定者、名簿順
+    for member in sorted(range(len(team)), key=lambda m: (not is_employee[m], m)):
+        members[team[member]].append(member)
+    if rule == 'mixed':
+        employees = [sum(is_employee[m] for m in team_members) for team_members in members]
+        order = sorted(range(n_teams), key=lambda t: -employees[t])
+        return [{'班ID': f'R{k}-{i:02d}', '社員': int(employees[t]), 'members': [member_ids[m] for m in members[t]]}
+                for i, t in enumerate(order, start=1)]
+    teams, numbers = [], {}
+    for t in range(n_teams):
+        company = companies[team_company[t]]
+        numbers[company] = numbers.get(company, 0) + 1
+        teams.append({'班ID': f'R{k}-{company}{numbers[company]}', '会社': company,
+                      'members': [member_ids[m] for m in members[t]]})
+    return teams
+
+
+def schedule_rounds(participants_df, rules=('mixed', 'company'), seed=42, passes=2, iterations=None,
+                    team_size=TEAM_SIZE):
+    """K ラウンド分の班分けをまとめて作る
+
+    rules はラウンドごとのルール（'mixed' = R1 と同じく会社を混ぜる、'company' = R2 と同じく会社ごと）。
+    戻り値は {'R1': 班のリスト, 'R2': ...}（班の形は assign_r1_teams / assign_r2_teams と同じ）
+    """
+    rng = np.random.default_rng(seed)
+    codes, companies = participants_df['company_abbr'].factorize(sort=True)
+    codes = codes.astype(np.int64)
+    is_employee = (participants_df['内定者/社員'] == '社員').to_numpy()
+    member_ids = participants_df['member_id'].tolist()
+    if iterations is None:
+        iterations = min(max(20000, 50 * len(codes)), 500000)
+
+    # 1. ラウンドごとにルールどおりの班分けを作る
+    rounds = []
+    for rule in rules:
+        if rule == 'mixed':
+            team_of, team_company = _mixed_round(codes, is_employee, rng, team_size), None
+            swap_keys = is_employee.astype(np.int64)
+        elif rule == 'company':
+            team_of, team_company = _company_round(codes, is_employee, rng)
+            swap_keys = codes * 2 + is_employee
+        else:
+            raise ValueError(f"rules には 'mixed' か 'company' を指定してください: {rule}")
+        team = team_of.tolist()
+        teams = [[] for _ in range(max(team) + 1 if team else 0)]
+        for member, t in enumerate(team):
+            teams[t].append(member)
+        swap_groups = [np.flatnonzero(swap_keys == key) for key in np.unique(swap_keys)]
+        rounds.append((rule, team, teams, team_company, swap_groups))
+
+    # 誰と何回同じ班になったか（相手 → 回数）
+    met = [{} for _ in member_ids]
+    for _, _, teams, _, _ in rounds:
+        for members in teams:
+            for i, a in enumerate(members):
+                _add_pairs_with(met, a, members[i + 1:], 1)
+
+    # 2. ラウンドを 1 つずつ、他のラウンドとの再会が減るように入れ替える
+    for _ in range(passes):
+        for rule, team, teams, _, swap_groups in rounds:
+            _improve_round(team, teams, codes, swap_groups, met, rng, iterations, diversity=(rule == 'mixed'))
+
+    return {
+        f'R{k}': _round_teams(k, rule, team, member_ids, is_employee, team_company, companies)
+        for k, (rule, team, _, team_company, _) in enumerate(rounds, start=1)
+    }
+
+
+def repeat_report(rounds):
+    """同じ 2 人が 2 回以上同じ班になった組の数などを数える"""
+    met = {}
+    for teams in rounds.values():
+        for team in teams:
+            members = team['members']
+            for i, a in enumerate(members):
+                for b in members[i + 1:]:
+                    pair = (a, b) if a < b else (b, a)
+                    met[pair] = met.get(pair, 0) + 1
+    counts = np.fromiter(met.values(), dtype=np.int64, count=len(met))
+    return {
+        'ラウンド数': len(rounds),
+        '同席ペア数': len(met),
+        '再会ペア数': int((counts >= 2).sum()),
+        '延べ再会回数': int(np.maximum(counts - 1, 0).sum()),
+        '最大同席回数': int(counts.max()) if len(counts) else 0,
+    }
+
+
+def compare_schedules(participants_df, rules=('mixed', 'company'), seed=42, passes=2):
+    """ラウンドを別々に作った場合（passes=0）と、まとめて最適化した場合の再会の比較"""
+    report = {}
+    for label, n_passes in (('別々', 0), ('まとめて', passes)):
+        start = time.perf_counter()
+        rounds = schedule_rounds(participants_df, rules=rules, seed=seed, passes=n_passes)
+        report[label] = {**repeat_report(rounds), '時間[s]': round(time.perf_counter() - start, 2)}
+    return rounds, report
@@ -0,0 +1,169 @@
+"""名前の読み仮名と 50 音順の並べ替えキー
+
+csv_analysis2.ipynb で R1 / R2 ごとに pykakasi を 1 行ずつ呼んでいたのをまとめたもの。
+
+- 読みは名簿の「お名前(フリガナ)」があればそれを使い、なければ pykakasi で変換する
+  （pykakasi がなければ、かなはひらがなにそろえ、漢字はそのまま）
+- 変換するのはユニークな名前だけ。結果はリポジトリ直下の .reading_cache/<変換器のバージョン>.json
+  （READING_CACHE_DIR で変更可。書き込めなければ保存しない）に保存し、
+  次からはそれを使う（変換器が変わればファイルも変わる）。並べ替えキーも同じファイルに保存し、
+  キーの作り方を変えたときは COLLATION_VERSION を上げて作り直させる
+- 並べ替えは collation_keys を sort_values の key に渡す。清音 → 濁音・半濁音、
+  小書き → 普通の大きさ、の順に比べる辞書式の 50 音順になる
+
+    combined['読み仮名'] = readings(combined['メンバー名'], roster)
+    combined = combined.sort_values(by='読み仮名', key=collation_keys)
+"""
+import json
+import os
+import unicodedata
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pykakasi
+except ImportError:
+    pykakasi = None
+
+# 実行したディレクトリではなくリポジトリ直下に置く（notebook をどこから開いても同じキャッシュを使う）
+CACHE_DIR = Path(os.environ.get('READING_CACHE_DIR', Path(__file__).resolve().parent.parent / '.reading_cache'))
+# collation_key の作り方を変えたら上げる（保存済みの並べ替えキーを使わないように）
+COLLATION_VERSION = 1
+FURIGANA = 'お名前(フリガナ)'
+# カタカナ → ひらがな（ァ..ヶ は ぁ..ゖ の 0x60 後ろ）
+_TO_HIRAGANA = {code: code - 0x60 for code in range(ord('ァ'), ord('ヶ') + 1)}
+# 1 段目の比較: 濁点・半濁点と小書きをはずす
+_BASE = str.maketrans(
+    'がぎぐげござじずぜぞだぢづでどばびぶべぼぱぴぷぺぽゔぁぃぅぇぉっゃゅょゎゕゖ',
+    'かきくけこさしすせそたちつてとはひふへほはひふへほうあいうえおつやゆよわかけ',
+)
+# 長音は直前の母音として比べる（直前の文字は清音にしたもの）
+_VOWELS = {
+    char: vowel
+    for vowel, chars in (('あ', 'あかさたなはまやらわ'), ('い', 'いきしちにひみり'), ('う', 'うくすつぬふむゆる'),
+                         ('え', 'えけせてねへめれ'), ('お', 'おこそとのほもよろを'))
+    for char in chars
+}
+
+# 同じプロセス内で読み込んだキャッシュ（パス -> {'names': {名前: 読み}, 'furigana': {フリガナ: 読み}, 'keys': {読み: 比較キー}, 'collation': COLLATION_VERSION}）
+_caches = {}
+_kakasi = None
+
+
+def converter_version():
+    """キャッシュのキーにする変換器の名前とバージョン"""
+    return f'pykakasi-{pykakasi.__version__}' if pykakasi is not None else 'kana-only'
+
+
+def to_hiragana(text):
+    """全角半角をそろえ、カタカナをひらがなにして空白を除く"""
+    if not unicodedata.is_normalized('NFKC', text):
+        text = unicodedata.normalize('NFKC', text)
+    return ''.join(text.split()).translate(_TO_HIRAGANA)
+
+
+def _convert(name):
+    global _kakasi
+    if pykakasi is None:
+        return to_hiragana(name)
+    if _kakasi is None:
+        _kakasi = pykakasi.kakasi()
+    return to_hiragana(''.join(item['hira'] for item in _kakasi.convert(name)))
+
+
+def _cache_path(cache_dir):
+    return Path(cache_dir or CACHE_DIR) / f'{converter_version()}.json'
+
+
+def _load_cache(path):
+    if path not in _caches:
+        try:
+            _caches[path] = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            _caches[path] = {}
+        for table in ('names', 'furigana', 'keys'):
+            _caches[path].setdefault(table, {})
+        if _caches[path].get('collation') != COLLATION_VERSION:
+            _caches[path]['keys'] = {}
+            _caches[path]['collation'] = COLLATION_VERSION
+    return _caches[path]
+
+
+def _save_cache(path, cache):
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.json.tmp')
+        tmp_path.write_text(json.dumps(cache, ensure_ascii=False), encoding='utf-8')
+        os.replace(tmp_path, path)
+    except OSError:
+        pass  # 書き込めない場所ではキャッシュしない（同じプロセス内では _caches を使う）
+
+
+def _lookup(table, values, func):
+    """table を引き、なければ func で作って足す。(結果のリスト, 足したか) を返す"""
+    result = []
+    added = False
+    for value in values:
+        found = table.get(value)
+        if found is None:
+            found = table[value] = func(value)
+            added = True
+        result.append(found)
+    return result, added
+
+
+def readings(names, roster=None, cache_dir=None):
+    """名前の列をひらがなの読みにする（欠損は ''）
+
+    roster（roster.load_roster の戻り値）を渡すと、名簿で 1 人に決まる名前はフリガナ列を使う
+    """
+    names = pd.Series(names)
+    codes, uniques = pd.factorize(names)
+    uniques = pd.Series(uniques, dtype=object)
+    if roster is not None and FURIGANA in roster.df.columns:
+        furigana = roster.map('name', uniques, FURIGANA)
+        has_furigana = furigana.notna().to_numpy()
+    else:
+        furigana, has_furigana = None, pd.Series(False, index=uniques.index).to_numpy()
+
+    path = _cache_path(cache_dir)
+    cache = _load_cache(path)
+    result = pd.Series('', index=uniques.index, dtype=object)
+    added = False
+    if has_furigana.any():
+        result[has_furigana], added_furigana = _lookup(cache['furigana'], furigana[has_furigana].tolist(), to_hiragana)
+        added |= added_furigana
+    if not has_furigana.all():
+        others = [str(name) for name in uniques[~has_furigana].tolist()]
+        result[~has_furigana], added_names = _lookup(cache['names'], others, _convert)
+        added |= added_names
+    if added:
+        _save_cache(path, cache)
+
+    # 欠損（コード -1）は末尾の '' を引く
+    values = pd.array(result.tolist() + [''], dtype=str)
+    return pd.Series(values.take(codes), index=names.index)
+
+
+def collation_key(reading):
+    """読み 1 件の 50 音順の比較キー（清音にした読み → 元の読み の順に比べる）"""
+    base = []
+    for char in reading:
+        if char == 'ー' and base:
+            char = _VOWELS.get(base[-1], char)
+        base.append(char.translate(_BASE))
+    # '\0' で区切ると、文字列の比較がタプル (清音, 元の読み) の比較と同じになる
+    return ''.join(base) + '\0' + reading
+
+
+def collation_keys(values, cache_dir=None):
+    """読みの列の 50 音順キー（sort_values(key=collation_keys) に渡す。計算済みのキーはキャッシュから引く）"""
+    codes, uniques = pd.factorize(values)
+    path = _cache_path(cache_dir)
+    cache = _load_cache(path)
+    keys, added = _lookup(cache['keys'], [str(value) for value in uniques.tolist()], collation_key)
+    if added:
+        _save_cache(path, cache)
+    keys = pd.array(keys + [''], dtype=str)
+    return pd.Series(keys.take(codes), index=values.index)
@@ -0,0 +1,243 @@
+"""名簿（名簿一覧_*.csv）の読み込みと検索
+
+notebook や member_divide.py がそれぞれ CSV を読み直して dict(zip(...)) を作っていたのを
+ここにまとめたもの。
+
+- CSV は 1 回だけ読み、型をそろえて会社略称・member_id・氏名キーの列を足したものを
+  Parquet（pyarrow がなければキャッシュなし）で元ファイルの隣の .roster_cache/ に保存する。
+  元ファイルの更新日時とサイズが変わっていたら中身のハッシュを比べ、違えば作り直す。
+  会社の別名表（company_names.py）を変えたときも作り直す。書き込めない場所ならキャッシュなしで読む
+- 同じプロセス内では読み込んだ名簿を使い回す
+- Bridge ID / member_id / 氏名（空白や全角半角の違いをならしたもの）から 1 行を O(1) で引く。
+  同じキーが複数行にある場合は黙ってどれかを返さず、duplicate_report() で一覧にする
+
+    roster = load_roster('../data/名簿一覧_Bridge_ID割当済_最終版.csv')
+    roster.get('bridge_id', 12)['お名前(漢字)']
+    df['名前'] = roster.map('member_id', df['メンバー1'], 'お名前(漢字)')
+    print(roster.duplicate_report())
+"""
+import hashlib
+import json
+import os
+import unicodedata
+from pathlib import Path
+
+import pandas as pd
+
+from company_names import COMPANY_ALIASES, UNDECIDED, normalize_company_names
+
+try:
+    import pyarrow  # noqa: F401  Parquet キャッシュに使う
+except ImportError:
+    pyarrow = None
+
+# 足す列を変えたら上げる（古いキャッシュを読まないように）
+CACHE_VERSION = 2
+CACHE_DIR = '.roster_cache'
+NAME_KEY = '氏名キー'
+# 索引の名前 -> 列
+INDEXES = {
+    'bridge_id': 'Bridge ID',
+    'member_id': 'member_id',
+    'name': NAME_KEY,
+}
+# member_id として使う既存の列（なければ create_member_ids で作る）
+MEMBER_ID_COLUMNS = ['member_id', '新Bridge ID']
+
+# 同じプロセス内で読み込んだ名簿（パス -> (更新日時, サイズ, Roster)）
+_loaded = {}
+
+
+class DuplicateKeyError(KeyError):
+    """同じキーの行が複数あって 1 行に決まらない"""
+
+
+def normalize_name(value):
+    """氏名の照合用キー（全角半角をそろえ、空白を取り除く）。文字列以外は None"""
+    if not isinstance(value, str):
+        return None
+    if not unicodedata.is_normalized('NFKC', value):
+        value = unicodedata.normalize('NFKC', value)
+    return ''.join(value.split()) or None
+
+
+def _bridge_id_key(value):
+    """Bridge ID の照合用キー（12 / '12' / '0012' を同じものとみなす）"""
+    if value is None or (isinstance(value, float) and value != value) or value is pd.NA:
+        return None
+    text = str(value).strip()
+    if text.endswith('.0'):
+        text = text[:-2]
+    return int(text) if text.isdigit() else text or None
+
+
+def _member_id_key(value):
+    return (value.strip() or None) if isinstance(value, str) else None
+
+
+_KEY_FUNCS = {'bridge_id': _bridge_id_key, 'member_id': _member_id_key, 'name': normalize_name}
+
+
+def _apply_unique(func, values):
+    """値の列に func をユニークな値だけ適用する"""
+    codes, uniques = pd.factorize(pd.Series(values))
+    keys = pd.Series([func(value) for value in uniques.tolist()] + [None], dtype=object)
+    return keys.take(codes).reset_index(drop=True)
+
+
+def build_roster_frame(df):
+    """CSV から読んだ名簿に型をそろえ、会社略称・member_id・氏名キーの列を足す"""
+    from member_divide import create_member_ids  # member_divide がこのモジュールを読むので、ここで読む
+
+    df = df.reset_index(drop=True)
+    for column in ('内定者/社員', 'Bridge2026の参加可否'):
+        if column in df.columns:
+            df[column] = df[column].str.strip()
+    if 'Bridge ID' in df.columns:
+        numbers = pd.to_numeric(df['Bridge ID'], errors='coerce')
+        # 全部数字なら整数列に（数字でない ID が混ざっていたら文字列のまま）
+        if numbers.notna().sum() == df['Bridge ID'].notna().sum():
+            df['Bridge ID'] = numbers.astype('Int64')
+    if '所属会社(内定先会社)' in df.columns:
+        df['company_abbr'] = normalize_company_names(df['所属会社(内定先会社)'])
+    existing = [column for column in MEMBER_ID_COLUMNS if column in df.columns]
+    if existing and existing[0] != 'member_id':
+        df['member_id'] = df[existing[0]]
+    elif not existing and {'company_abbr', '内定者/社員', 'Bridge2026の参加可否'} <= set(df.columns):
+        # member_divide.py と同じく参加者だけに振る
+        participants = df['Bridge2026の参加可否'] == '参加'
+        df['member_id'] = pd.Series(pd.NA, index=df.index, dtype=str)
+        df.loc[participants, 'member_id'] = create_member_ids(df[participants])
+    if 'お名前(漢字)' in df.columns:
+        # 名前が空欄の行は NA のまま（'None' という文字列にすると重複扱いになる）
+        df[NAME_KEY] = _apply_unique(normalize_name, df['お名前(漢字)']).astype('string')
+    return df
+
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _aliases_hash():
+    """会社の別名表のハッシュ（変わったら company_abbr を作り直す）"""
+    return hashlib.sha256(json.dumps([COMPANY_ALIASES, UNDECIDED], ensure_ascii=False).encode()).hexdigest()[:16]
+
+
+def _read_cached(path, cache_dir):
+    """キャッシュを読む（使えなければ CSV から作り直して保存する）"""
+    stat = path.stat()
+    cache_dir = Path(cache_dir) if cache_dir else path.parent / CACHE_DIR
+    data_path = cache_dir / f'{path.name}.parquet'
+    meta_path = cache_dir / f'{path.name}.json'
+    source = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'version': CACHE_VERSION,
+              'aliases': _aliases_hash()}
+    try:
+        meta = json.loads(meta_path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        meta = {}
+
+    if (meta.get('version'), meta.get('aliases')) == (CACHE_VERSION, source['aliases']) and data_path.exists():
+        unchanged = meta.get('mtime_ns') == stat.st_mtime_ns and meta.get('size') == stat.st_size
+        # 更新日時だけ変わった（コピーし直した等）なら中身のハッシュで判断する
+        if unchanged or meta.get('sha256') == _file_hash(path):
+            df = pd.read_parquet(data_path)
+            if not unchanged:
+                try:
+                    meta_path.write_text(json.dumps({**meta, **source}), encoding='utf-8')
+                except OSError:
+                    pass  # 次回もハッシュを比べるだけ
+            return df
+
+    df = build_roster_frame(pd.read_csv(path, encoding='utf-8-sig'))
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = data_path.with_suffix('.parquet.tmp')
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, data_path)
+        meta_path.write_text(json.dumps({**source, 'sha256': _file_hash(path)}), encoding='utf-8')
+    except OSError:
+        pass  # 読み取り専用の場所（/mnt/user-data/uploads など）ではキャッシュしない
+    return df
+
+
+def load_roster(path, cache_dir=None, use_cache=True):
+    """名簿 CSV を読み込む（同じプロセス内・ディスクのキャッシュを使う）"""
+    path = Path(path).resolve()
+    stat = path.stat()
+    loaded = _loaded.get(path)
+    if loaded and loaded[:2] == (stat.st_mtime_ns, stat.st_size):
+        return loaded[2]
+    if use_cache and pyarrow is not None:
+        df = _read_cached(path, cache_dir)
+    else:
+        df = build_roster_frame(pd.read_csv(path, encoding='utf-8-sig'))
+    roster = Roster(df)
+    _loaded[path] = (stat.st_mtime_ns, stat.st_size, roster)
+    return roster
+
+
+class Roster:
+    """名簿の DataFrame と、キー -> 行番号の索引"""
+
+    def __init__(self, df):
+        self.df = df
+        self._indexes = {}
+
+    def __len__(self):
+        return len(self.df)
+
+    def participants(self):
+        """「参加」の行だけ（member_divide.py などの入力）"""
+        return self.df[self.df['Bridge2026の参加可否'] == '参加'].copy()
+
+    def _index(self, name):
+        """(一意なキー -> 行番号, 重複しているキー -> 行番号のリスト)。初めて使うときに作る"""
+        if name not in self._indexes:
+            keys = _apply_unique(_KEY_FUNCS[name], self.df[INDEXES[name]])
+            present = keys.notna().to_numpy()
+            duplicated = keys.duplicated(keep=False).to_numpy() & present
+            unique = dict(zip(keys[present & ~duplicated], (present & ~duplicated).nonzero()[0].tolist()))
+            duplicates = {}
+            for key, pos in zip(keys[duplicated], duplicated.nonzero()[0].tolist()):
+                duplicates.setdefault(key, []).append(pos)
+            self._indexes[name] = (unique, duplicates)
+        return self._indexes[name]
+
+    def get(self, name, key):
+        """索引 name（'bridge_id' / 'member_id' / 'name'）で 1 行を引く
+
+        見つからなければ KeyError、複数行あれば DuplicateKeyError
+        """
+        unique, duplicates = self._index(name)
+        key = _KEY_FUNCS[name](key)
+        if key in duplicates:
+            raise DuplicateKeyError(f"{INDEXES[name]} が {key!r} の行が {len(duplicates[key])} 件あります")
+        return self.df.iloc[unique[key]]
+
+    def map(self, name, values, column):
+        """値の列を索引 name で引いて column の値に置き換える（見つからない・重複しているキーは欠損）"""
+        unique, _ = self._index(name)
+        keys = _apply_unique(_KEY_FUNCS[name], values)
+        positions = keys.map(unique)
+        result = self.df[column].reindex(positions.fillna(-1).astype(int).to_numpy())
+        return pd.Series(result.to_numpy(), index=values.index if isinstance(values, pd.Series) else None,
+                         dtype=self.df[column].dtype)
+
+    def duplicates(self, name):
+        """索引 name のキーが重複している行"""
+        _, duplicates = self._index(name)
+        return self.df.iloc[sorted(pos for positions in duplicates.values() for pos in positions)]
+
+    def duplicate_report(self):
+        """全索引の重複キーの一覧（索引 / キー / 件数 / 行番号）"""
+        rows = []
+        for name, column in INDEXES.items():
+            if column not in self.df.columns:
+                continue
+            for key, positions in self._index(name)[1].items():
+                rows.append({'索引': name, 'キー': key, '件数': len(positions), '行': positions})
+        return pd.DataFrame(rows, columns=['索引', 'キー', '件数', '行'])
@@ -0,0 +1,91 @@
+"""乱数の種を変えた R1 班分けを並列に何通りも試して、一番良いものを選ぶ
+
+assign_r1_teams の結果はシャッフルの順番しだいで大きく変わるので、
+種を変えた試行をプロセスプールで全コアに配って評価する。
+
+- 名簿（member_id / company_abbr / 内定者/社員 の 3 列だけ）は initializer で
+  ワーカーごとに 1 回だけ渡し、タスクとしては種だけを送る
+- ワーカーは評価値だけを返し、一番良かった種の班分けは親プロセスで
+  同じ種から作り直す（＝その種を控えておけばいつでも同じ班分けを再現できる）
+
+    uv run python src/seed_search.py ../data/名簿一覧_id.csv --attempts 64 --method greedy
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from member_divide import assign_r1_teams
+from roster import load_roster
+from team_optimizer import optimize_r1_teams, r1_report
+
+METHODS = {
+    'greedy': lambda df, seed: assign_r1_teams(df, seed=seed),
+    'optimize': lambda df, seed: optimize_r1_teams(df, seed=seed),
+}
+COLUMNS = ['member_id', 'company_abbr', '内定者/社員']
+
+# ワーカープロセスごとの名簿（initializer で 1 回だけ受け取る）
+_participants = None
+
+
+def _init_worker(participants):
+    global _participants
+    _participants = participants
+
+
+def _attempt(method, seed):
+    report = r1_report(METHODS[method](_participants, seed), _participants)
+    return {'seed': seed, **report}
+
+
+def attempt_score(report):
+    """試行の良さ（大きいほど良い）: 班から漏れた人数 → 会社数合計 → 人数差 → 社員数差 の順で比べる"""
+    return (-report['未割当'], report['会社数合計'], -report['人数差'], -report['社員数差'])
+
+
+def search_r1_seeds(participants_df, attempts=32, method='greedy', base_seed=0, workers=None):
+    """種 base_seed, base_seed + 1, ... の試行を並列に評価し、(一番良い種, 班分け, 全試行の評価) を返す"""
+    if attempts < 1:
+        raise ValueError(f"attempts には 1 以上を指定してください: {attempts}")
+    participants = participants_df[COLUMNS].reset_index(drop=True)
+    seeds = list(range(base_seed, base_seed + attempts))
+    workers = max(1, min(workers or os.cpu_count() or 1, attempts))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(participants,)) as pool:
+        results = list(pool.map(_attempt, [method] * len(seeds), seeds, chunksize=max(1, len(seeds) // (workers * 4))))
+
+    best = max(results, key=attempt_score)
+    # 一番良かった種から作り直す（ワーカーと同じ結果になることを確かめる）
+    teams = METHODS[method](participants, best['seed'])
+    expected = {k: v for k, v in best.items() if k != 'seed'}
+    if r1_report(teams, participants) != expected:
+        # python -O でも確かめる（班分けが種以外の状態に依存していると、出力する班分けが評価と食い違う）
+        raise RuntimeError(f"種 {best['seed']} の班分けを作り直すとワーカーでの評価と一致しません（method={method}）")
+    return best['seed'], teams, pd.DataFrame(results).set_index('seed')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="種を変えた R1 班分けを並列に試して一番良いものを選ぶ")
+    parser.add_argument("roster", help="名簿一覧_*.csv")
+    parser.add_argument("--attempts", type=int, default=64)
+    parser.add_argument("--method", choices=sorted(METHODS), default='greedy')
+    parser.add_argument("--base-seed", type=int, default=0)
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+    if args.attempts < 1:
+        parser.error("--attempts には 1 以上を指定してください")
+
+    participants = load_roster(args.roster).participants()
+
+    start = time.perf_counter()
+    seed, _, scores = search_r1_seeds(participants, args.attempts, args.method, args.base_seed, args.workers)
+    print(f"{args.attempts} 通りを {time.perf_counter() - start:.1f} 秒で評価しました")
+    print(scores[['未割当', '会社数合計', '人数差', '社員数差']].describe().round(2))
+    print(f"\n一番良かった種: {seed}")
+    print(scores.loc[seed])
+
+
+if __name__ == "__main__":
+    main()
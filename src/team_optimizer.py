@@ -0,0 +1,194 @@
+"""R1 班分けの最適化（焼きなまし法）
+
+assign_r1_teams は貪欲法なので、内定者が 5 名集まらない班や 6 名に満たない
+余りの内定者はそのまま班から漏れてしまう。ここでは全員をどこかの班に入れ、
+
+- 班の人数はそろえる（team_size 人、割り切れない分は 1 人少ない班にする）
+- 社員はできるだけ 1 班 1 名（社員が班の数より多ければ均等に）
+
+を守ったうえで、各班の会社数（create_r1_output_df の「会社数」）の合計が
+最大になるように、同じ区分（社員/内定者）のメンバー同士を入れ替える
+焼きなまし法で探索する。入れ替えによるスコアの変化は
+班 × 会社の人数表から差分で計算するので、1 回の試行は O(1)。
+同じ seed なら同じ班分けになる。
+"""
+import math
+import time
+
+import numpy as np
+import pandas as pd
+
+TEAM_SIZE = 6
+# 会社数が同じなら同じ会社の人数が偏っていない方を良しとする重み
+# （入れ替え 1 回で会社数 1 つ分を超えないよう小さくしておく）
+BALANCE_WEIGHT = 0.02
+BLOCK_SIZE = 10000
+START_TEMPERATURE = 0.6
+END_TEMPERATURE = 0.02
+
+
+def _interleave(members, codes, rng):
+    """メンバーを会社ごとに 1 人ずつ順番に並べる（同じ会社内の順番は乱数）"""
+    members = rng.permutation(members)
+    order = np.argsort(codes[members], kind='stable')
+    sorted_codes = codes[members][order]
+    # 会社内での順位（0, 1, 2, ...）で並べ直すと会社が順番に出てくる
+    starts = np.r_[0, np.flatnonzero(np.diff(sorted_codes)) + 1]
+    rank = np.arange(len(order)) - np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+    return members[order][np.lexsort((sorted_codes, rank))]
+
+
+def _initial_assignment(codes, is_employee, sizes, rng):
+    """社員 → 内定者の順に、会社が偏らないよう班へ 1 人ずつ配る"""
+    team_of = np.empty(len(codes), dtype=np.int64)
+    remaining = list(sizes)
+    team = 0
+    for group in (np.flatnonzero(is_employee), np.flatnonzero(~is_employee)):
+        for member in _interleave(group, codes, rng):
+            while remaining[team] == 0:
+                team = (team + 1) % len(sizes)
+            team_of[member] = team
+            remaining[team] -= 1
+            team = (team + 1) % len(sizes)
+    return team_of
+
+
+def team_sizes(n_members, team_size=TEAM_SIZE):
+    """全員を入れるときの各班の人数（team_size 人、割り切れない分は 1 人少ない班）"""
+    n_teams = max(1, math.ceil(n_members / team_size))
+    base, extra = divmod(n_members, n_teams)
+    return [base + 1] * extra + [base] * (n_teams - extra)
+
+
+def upper_bound(codes, sizes):
+    """会社数の合計の上限（班の人数と、各社の人数の両方で頭打ちになる）"""
+    n_companies = len(np.unique(codes))
+    by_team = sum(min(size, n_companies) for size in sizes)
+    by_company = int(np.minimum(np.bincount(codes), len(sizes)).sum())
+    return min(by_team, by_company)
+
+
+def _anneal(codes, is_employee, team_of, n_teams, rng, iterations, bound):
+    """同じ区分のメンバー同士を入れ替えて会社数の合計を増やす"""
+    n_companies = int(codes.max()) + 1
+    counts = np.zeros((n_teams, n_companies), dtype=np.int64)
+    np.add.at(counts, (team_of, codes), 1)
+    counts = counts.tolist()
+    distinct = sum(c > 0 for row in counts for c in row)
+    balance = sum(c * c for row in counts for c in row)
+
+    # 入れ替え候補: 社員同士 / 内定者同士（班の人数と社員の配分が変わらない）
+    pool = np.r_[np.flatnonzero(is_employee), np.flatnonzero(~is_employee)]
+    n_employees = int(is_employee.sum())
+    group_start = np.array([0, n_employees])
+    group_len = np.array([n_employees, len(pool) - n_employees])
+
+    team = team_of.tolist()
+    code = codes.tolist()
+    best = (distinct - BALANCE_WEIGHT * balance, list(team))
+    n_blocks = max(1, math.ceil(iterations / BLOCK_SIZE))
+    cooling = (END_TEMPERATURE / START_TEMPERATURE) ** (1 / max(1, n_blocks - 1))
+    temperature = START_TEMPERATURE
+    for _ in range(n_blocks):
+        pos_a = rng.integers(len(pool), size=BLOCK_SIZE)
+        group = (pos_a >= n_employees).astype(np.int64)
+        pos_b = group_start[group] + (rng.random(BLOCK_SIZE) * group_len[group]).astype(np.int64)
+        members_a = pool[pos_a].tolist()
+        members_b = pool[pos_b].tolist()
+        thresholds = (np.log(rng.random(BLOCK_SIZE)) * temperature).tolist()
+
+        for a, b, threshold in zip(members_a, members_b, thresholds):
+            ti, tj = team[a], team[b]
+            ca, cb = code[a], code[b]
+            if ti == tj or ca == cb:
+                continue
+            ci, cj = counts[ti], counts[tj]
+            d_distinct = (ci[cb] == 0) - (ci[ca] == 1) + (cj[ca] == 0) - (cj[cb] == 1)
+            d_balance = 2 * (ci[cb] - ci[ca] + cj[ca] - cj[cb]) + 4
+            delta = d_distinct - BALANCE_WEIGHT * d_balance
+            # exp(delta / T) > u  ⇔  delta > T * log(u)
+            if delta >= 0 or delta > threshold:
+                ci[ca] -= 1
+                ci[cb] += 1
+                cj[cb] -= 1
+                cj[ca] += 1
+                team[a], team[b] = tj, ti
+                distinct += d_distinct
+                balance += d_balance
+
+        score = distinct - BALANCE_WEIGHT * balance
+        if score > best[0]:
+            best = (score, list(team))
+        if distinct >= bound and temperature < START_TEMPERATURE * 0.1:
+            break
+        temperature *= cooling
+    return np.asarray(best[1], dtype=np.int64)
+
+
+def optimize_r1_teams(participants_df, team_size=TEAM_SIZE, seed=42, iterations=None):
+    """R1ラウンドの班分け（会社数の合計が最大になるよう探索、全員をどこかの班に入れる）
+
+    戻り値は assign_r1_teams と同じ形（班ID / 社員 / members のリスト）
+    """
+    if len(participants_df) == 0:
+        return []
+    rng = np.random.default_rng(seed)
+    codes = participants_df['company_abbr'].factorize(sort=True)[0].astype(np.int64)
+    is_employee = (participants_df['内定者/社員'] == '社員').to_numpy()
+    member_ids = participants_df['member_id'].to_numpy()
+
+    sizes = team_sizes(len(codes), team_size)
+    n_teams = len(sizes)
+    if iterations is None:
+        iterations = min(max(20000, 200 * len(codes)), 2000000)
+
+    team_of = _initial_assignment(codes, is_employee, sizes, rng)
+    team_of = _anneal(codes, is_employee, team_of, n_teams, rng, iterations, upper_bound(codes, sizes))
+
+    # 社員が多い班から順に班IDを振る。班の中は社員 → 内定者、名簿順
+    employees_per_team = np.bincount(team_of, weights=is_employee, minlength=n_teams).astype(int)
+    order = np.lexsort((np.arange(len(codes)), ~is_employee, team_of))
+    members_by_team = np.split(member_ids[order], np.cumsum(np.bincount(team_of, minlength=n_teams))[:-1])
+    r1_teams = []
+    for team_id, team in enumerate(np.argsort(-employees_per_team, kind='stable'), start=1):
+        r1_teams.append({
+            '班ID': f'R1-{team_id:02d}',
+            '社員': int(employees_per_team[team]),
+            'members': members_by_team[team].tolist(),
+        })
+    return r1_teams
+
+
+def r1_report(r1_teams, participants_df, team_size=TEAM_SIZE):
+    """班分けの評価（会社数の合計が目的関数。班から漏れた人数も数える）"""
+    company_of = dict(zip(participants_df['member_id'], participants_df['company_abbr']))
+    diversity = [len({company_of[m] for m in team['members']}) for team in r1_teams]
+    sizes = [len(team['members']) for team in r1_teams] or [0]
+    employees = [team['社員'] for team in r1_teams] or [0]
+    assigned = sum(sizes)
+    codes = participants_df['company_abbr'].factorize()[0]
+    return {
+        '班数': len(r1_teams),
+        '割当人数': assigned,
+        '未割当': len(participants_df) - assigned,
+        '会社数合計': sum(diversity),
+        '会社数平均': round(sum(diversity) / len(diversity), 2) if diversity else 0.0,
+        '会社数最小': min(diversity) if diversity else 0,
+        # 班ごとの人数・社員数の偏り（最大 - 最小）
+        '人数差': max(sizes) - min(sizes),
+        '社員数差': max(employees) - min(employees),
+        # 全員を入れた場合の会社数合計の上限（目安）
+        '上限': upper_bound(codes, team_sizes(len(codes), team_size)) if len(codes) else 0,
+    }
+
+
+def compare_r1(participants_df, greedy_teams, seed=42, team_size=TEAM_SIZE):
+    """貪欲法（assign_r1_teams）の結果と最適化の結果を並べて返す"""
+    start = time.perf_counter()
+    optimized = optimize_r1_teams(participants_df, team_size=team_size, seed=seed)
+    elapsed = time.perf_counter() - start
+    report = pd.DataFrame({
+        '貪欲法': r1_report(greedy_teams, participants_df, team_size),
+        '最適化': {**r1_report(optimized, participants_df, team_size), '時間[s]': round(elapsed, 2)},
+    }).T
+    return optimized, report